@@ -0,0 +1,67 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 encode and decode time and bytes per entity
+of lobbies and games stored in JSON and binary formats,
+including conversion with the common retort. Entities are
+taken in turn from a pool of distinct ones, so that their ids
+are not all served from caches of the binary format:
+
+    python -m benchmarks.codec
+"""
+
+import time
+
+from connection_hub.infrastructure import (
+    common_retort_factory,
+    converters_factory,
+    StorageFormat,
+    EntityCodecConfig,
+    EntityCodec,
+)
+from .common import report_latencies, sample_lobby, sample_game
+
+
+_ITERATIONS = 20_000
+_DISTINCT_ENTITIES = 5_000
+
+
+def main() -> None:
+    converters = converters_factory(common_retort_factory())
+
+    for entity_factory in (sample_lobby, sample_game):
+        entities = [entity_factory() for _ in range(_DISTINCT_ENTITIES)]
+        entity_type = type(entities[0])
+        load = converters.loader(entity_type)
+        dump = converters.dumper(entity_type)
+
+        for storage_format in StorageFormat:
+            codec = EntityCodec(EntityCodecConfig(storage_format))
+            encode_latencies = []
+            decode_latencies = []
+
+            for iteration in range(_ITERATIONS):
+                entity = entities[iteration % _DISTINCT_ENTITIES]
+
+                started_at = time.perf_counter()
+                encoded_entity = codec.encode(dump(entity), version=1)
+                encode_latencies.append(time.perf_counter() - started_at)
+
+                started_at = time.perf_counter()
+                entity_as_dict, _ = codec.decode(encoded_entity)
+                load(entity_as_dict)
+                decode_latencies.append(time.perf_counter() - started_at)
+
+            name = f"{entity_type.__name__} ({storage_format})"
+            report_latencies(f"{name} encode", encode_latencies)
+            report_latencies(f"{name} decode", decode_latencies)
+
+            if isinstance(encoded_entity, str):
+                encoded_entity = encoded_entity.encode()
+            print(f"{name}: {len(encoded_entity)} bytes")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "report_latencies",
+    "sample_lobby",
+    "sample_game",
+    "NullEventPublisher",
+    "NullPresenceTracker",
+    "NullCentrifugoClient",
+    "StaticIdentityProvider",
+)
+
+import statistics
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    LobbyId,
+    GameId,
+    PlayerStateId,
+    UserId,
+    UserRole,
+    PlayerStatus,
+    ConnectFourLobby,
+    PlayerState,
+    ConnectFourGame,
+)
+from connection_hub.application import (
+    Event,
+    EventPublisher,
+    PresenceTracker,
+    Serializable,
+    CentrifugoCommand,
+    CentrifugoClient,
+    IdentityProvider,
+)
+
+
+def report_latencies(name: str, latencies: list[float]) -> None:
+    """
+    Prints p50 and p99 of the provided latencies,
+    which are expected to be in seconds.
+    """
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(  # noqa: T201
+        f"{name}: n={len(latencies)} "
+        f"p50={quantiles[49] * 1000:.3f}ms "
+        f"p99={quantiles[98] * 1000:.3f}ms",
+    )
+
+
+def sample_lobby() -> ConnectFourLobby:
+    admin_id = UserId(uuid7())
+    member_id = UserId(uuid7())
+
+    return ConnectFourLobby(
+        id=LobbyId(uuid7()),
+        name="benchmark",
+        users={
+            admin_id: UserRole.ADMIN,
+            member_id: UserRole.REGULAR_MEMBER,
+        },
+        admin_role_transfer_queue=[member_id],
+        password=None,
+        time_for_each_player=timedelta(minutes=1),
+    )
+
+
+def sample_game() -> ConnectFourGame:
+    return ConnectFourGame(
+        id=GameId(uuid7()),
+        players={
+            UserId(uuid7()): PlayerState(
+                id=PlayerStateId(uuid7()),
+                status=PlayerStatus.CONNECTED,
+                time_left=timedelta(minutes=1),
+            )
+            for _ in range(2)
+        },
+        created_at=datetime.now(timezone.utc),
+        time_for_each_player=timedelta(minutes=1),
+    )
+
+
+class NullEventPublisher(EventPublisher):
+    async def publish(self, event: Event) -> None:
+        return
+
+
+class NullPresenceTracker(PresenceTracker):
+    async def acknowledge(self, user_id: UserId, *, at: datetime) -> None:
+        return
+
+    async def acknowledge_many(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        at: datetime,
+    ) -> None:
+        return
+
+    async def claim_absent(
+        self,
+        *,
+        seen_before: datetime,
+        limit: int,
+        claimed_until: datetime,
+    ) -> list[UserId]:
+        return []
+
+    async def forget(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        claimed_until: datetime,
+    ) -> None:
+        return
+
+
+class NullCentrifugoClient(CentrifugoClient):
+    async def publish(
+        self,
+        *,
+        channel: str,
+        data: Serializable,
+    ) -> None:
+        return
+
+    async def batch(
+        self,
+        *,
+        commands: Iterable[CentrifugoCommand],
+        parallel: bool = True,
+    ) -> None:
+        return
+
+
+class StaticIdentityProvider(IdentityProvider):
+    __slots__ = ("user_id_",)
+
+    def __init__(self, user_id: UserId):
+        self.user_id_ = user_id
+
+    async def user_id(self) -> UserId:
+        return self.user_id_
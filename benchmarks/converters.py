@@ -0,0 +1,82 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 per-call cost of converting lobbies, games
+and events with `Retort.load`/`Retort.dump` and with loaders
+and dumpers built in advance by `converters_factory`:
+
+    python -m benchmarks.converters
+"""
+
+import time
+from typing import Any, Callable
+
+from uuid_extensions import uuid7
+
+from connection_hub.domain import LobbyId, UserId
+from connection_hub.application import UserJoinedLobbyEvent
+from connection_hub.infrastructure import (
+    CommonRetort,
+    common_retort_factory,
+    Converters,
+    converters_factory,
+)
+from .common import report_latencies, sample_lobby, sample_game
+
+
+_ITERATIONS = 100_000
+
+
+def _measure(name: str, call: Callable[[], Any]) -> None:
+    latencies = []
+    for _ in range(_ITERATIONS):
+        started_at = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started_at)
+
+    report_latencies(name, latencies)
+
+
+def _benchmark(
+    common_retort: CommonRetort,
+    converters: Converters,
+    value: object,
+) -> None:
+    type_ = type(value)
+    name = type_.__name__
+    value_as_dict = common_retort.dump(value)
+
+    _measure(
+        f"{name} retort dump",
+        lambda: common_retort.dump(value),
+    )
+    _measure(
+        f"{name} converters dump",
+        lambda: converters.dumper(type_)(value),
+    )
+    _measure(
+        f"{name} retort load",
+        lambda: common_retort.load(value_as_dict, type_),
+    )
+    _measure(
+        f"{name} converters load",
+        lambda: converters.loader(type_)(value_as_dict),
+    )
+
+
+def main() -> None:
+    common_retort = common_retort_factory()
+    converters = converters_factory(common_retort)
+
+    event = UserJoinedLobbyEvent(
+        lobby_id=LobbyId(uuid7()),
+        user_id=UserId(uuid7()),
+    )
+    for value in (sample_lobby(), sample_game(), event):
+        _benchmark(common_retort, converters, value)
+
+
+if __name__ == "__main__":
+    main()
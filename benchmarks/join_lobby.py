@@ -0,0 +1,258 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 latency of `JoinLobbyProcessor` against
+a local redis, with a lobby lock acquired and the lobby
+loaded in a single round trip (current behaviour), the way
+it was done before (SCAN to find the key of the lobby, a
+`SET NX` loop to acquire its lock and GET to read it) and
+without locks in optimistic concurrency mode.
+
+Before each join the database is filled with
+`_OTHER_KEYS` unrelated keys, so that SCAN walks a keyspace
+of the same size in every iteration.
+
+The redis database is flushed, so a dedicated one must be used:
+
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 \\
+        python -m benchmarks.join_lobby
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    LobbyId,
+    UserId,
+    UserRole,
+    ConnectFourLobby,
+    JoinLobby,
+    Lobby,
+)
+from connection_hub.application import JoinLobbyCommand, JoinLobbyProcessor
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    common_retort_factory,
+    converters_factory,
+    ReplicaRouter,
+    NearCacheConfig,
+    NearCache,
+    EntityCodecConfig,
+    EntityCodec,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    ConcurrencyMode,
+    VersionTracker,
+    LobbyMapperConfig,
+    LobbyMapper,
+    GameMapperConfig,
+    GameMapper,
+    MembershipMapper,
+    RedisTransactionManager,
+)
+from connection_hub.infrastructure.database.keys import lobby_key_factory
+from .common import (
+    report_latencies,
+    NullEventPublisher,
+    NullPresenceTracker,
+    NullCentrifugoClient,
+    StaticIdentityProvider,
+)
+
+
+_ITERATIONS = 1000
+_OTHER_KEYS = 1000
+
+
+class _SetNXLockManager(LockManager):
+    """
+    Acquires locks the way `LockManager.acquire` did before
+    locks were acquired with a script.
+    """
+
+    async def acquire(self, lock_id: str) -> None:
+        lock_name = self._lock_name_factory(lock_id)
+        if lock_name in self._acquired_locks:
+            return
+
+        # Fence token is not incremented, but the value still
+        # has the current format, so that the lock is checked
+        # and released on commit as usual.
+        lock_value = f"{self._owner_token}:0"
+        while not await self._redis.set(
+            name=lock_name,
+            value=lock_value,
+            ex=self._config.lock_expires_in,
+            nx=True,
+        ):
+            await asyncio.sleep(0.1)
+
+        self._acquired_locks[lock_name] = lock_value
+
+
+class _ScanLobbyMapper(LobbyMapper):
+    """
+    Loads lobbies the way `LobbyMapper.by_id` did before
+    the lock was acquired and the lobby was read in a single
+    round trip: the key is found with SCAN, then the lock
+    is acquired and the lobby is read with GET.
+    """
+
+    async def by_id(
+        self,
+        lobby_id: LobbyId,
+        *,
+        acquire: bool = False,
+    ) -> Lobby | None:
+        keys = await self._keys_by_pattern(
+            pattern=lobby_key_factory(lobby_id),
+            limit=1,
+        )
+        if not keys:
+            return None
+
+        if acquire:
+            await self._lock_manager.acquire(keys[0])
+
+        encoded_lobby = await self._redis.get(keys[0])  # type: ignore
+        if encoded_lobby:
+            return self._load(encoded_lobby)
+
+        return None
+
+
+async def _fill_keyspace(redis: Redis) -> None:
+    await redis.flushdb()
+    await redis.mset({
+        f"benchmark:other:{index}": "" for index in range(_OTHER_KEYS)
+    })
+
+
+async def _run(
+    redis: Redis,
+    *,
+    name: str,
+    lobby_mapper_type: type[LobbyMapper] = LobbyMapper,
+    lock_manager_type: type[LockManager] = LockManager,
+    concurrency_mode: ConcurrencyMode = ConcurrencyMode.PESSIMISTIC,
+) -> None:
+    converters = converters_factory(common_retort_factory())
+    codec = EntityCodec(EntityCodecConfig())
+    latencies = []
+
+    for _ in range(_ITERATIONS):
+        lobby = ConnectFourLobby(
+            id=LobbyId(uuid7()),
+            name="benchmark",
+            users={UserId(uuid7()): UserRole.ADMIN},
+            admin_role_transfer_queue=[],
+            password=None,
+            time_for_each_player=timedelta(minutes=1),
+        )
+        await _fill_keyspace(redis)
+
+        async for redis_pipeline in redis_pipeline_factory(redis):
+            lock_manager = lock_manager_type(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=5)),
+            )
+            version_tracker = VersionTracker()
+            lobby_mapper_config = LobbyMapperConfig(
+                lobby_expires_in=timedelta(minutes=5),
+                concurrency_mode=concurrency_mode,
+            )
+            lobby_mapper = lobby_mapper_type(
+                redis=redis,
+                redis_pipeline=redis_pipeline,
+                replica_router=ReplicaRouter(redis),
+                near_cache=NearCache(redis, NearCacheConfig()),
+                converters=converters,
+                codec=codec,
+                lock_manager=lock_manager,
+                version_tracker=version_tracker,
+                config=lobby_mapper_config,
+            )
+            game_mapper_config = GameMapperConfig(
+                game_expires_in=timedelta(minutes=5),
+                concurrency_mode=concurrency_mode,
+            )
+            game_mapper = GameMapper(
+                redis=redis,
+                redis_pipeline=redis_pipeline,
+                near_cache=NearCache(redis, NearCacheConfig()),
+                converters=converters,
+                codec=codec,
+                lock_manager=lock_manager,
+                version_tracker=version_tracker,
+                config=game_mapper_config,
+            )
+            await lobby_mapper.save(lobby)
+            await redis_pipeline.execute()
+
+            processor = JoinLobbyProcessor(
+                join_lobby=JoinLobby(),
+                lobby_gateway=lobby_mapper,
+                membership_gateway=MembershipMapper(
+                    redis=redis,
+                    lobby_gateway=lobby_mapper,
+                    game_gateway=game_mapper,
+                    lobby_mapper_config=lobby_mapper_config,
+                    game_mapper_config=game_mapper_config,
+                ),
+                event_publisher=NullEventPublisher(),
+                presence_tracker=NullPresenceTracker(),
+                centrifugo_client=NullCentrifugoClient(),
+                transaction_manager=RedisTransactionManager(
+                    redis=redis,
+                    redis_pipeline=redis_pipeline,
+                    lock_manager=lock_manager,
+                    version_tracker=version_tracker,
+                ),
+                identity_provider=StaticIdentityProvider(UserId(uuid7())),
+            )
+            command = JoinLobbyCommand(lobby_id=lobby.id, password=None)
+
+            started_at = time.perf_counter()
+            await processor.process(command)
+            latencies.append(time.perf_counter() - started_at)
+
+    report_latencies(name, latencies)
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            await _run(
+                redis,
+                name="SCAN + SET NX + GET",
+                lobby_mapper_type=_ScanLobbyMapper,
+                lock_manager_type=_SetNXLockManager,
+            )
+            await _run(redis, name="acquire-and-get script")
+            await _run(
+                redis,
+                name="optimistic",
+                concurrency_mode=ConcurrencyMode.OPTIMISTIC,
+            )
+            await redis.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 latency of reading a hot lobby without
+locking it, with the near cache disabled and enabled:
+
+    python -m benchmarks.lobby_reads
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from redis.asyncio.client import Redis
+
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    common_retort_factory,
+    converters_factory,
+    ReplicaRouter,
+    NearCacheConfig,
+    NearCache,
+    EntityCodecConfig,
+    EntityCodec,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    VersionTracker,
+    LobbyMapperConfig,
+    LobbyMapper,
+)
+from .common import report_latencies, sample_lobby
+
+
+_ITERATIONS = 10_000
+
+
+async def _run(redis: Redis, near_cache_config: NearCacheConfig) -> None:
+    converters = converters_factory(common_retort_factory())
+    codec = EntityCodec(EntityCodecConfig())
+    replica_router = ReplicaRouter(redis)
+    lobby_mapper_config = LobbyMapperConfig(
+        lobby_expires_in=timedelta(minutes=5),
+    )
+    lobby = sample_lobby()
+    latencies = []
+
+    near_cache = NearCache(redis=redis, config=near_cache_config)
+    await near_cache.start()
+    while near_cache_config.enabled and not near_cache.active:
+        await asyncio.sleep(0.01)
+
+    for iteration in range(_ITERATIONS + 1):
+        async for redis_pipeline in redis_pipeline_factory(redis):
+            # Every request has its own identity map, so each
+            # read starts with a new mapper.
+            lobby_mapper = LobbyMapper(
+                redis=redis,
+                redis_pipeline=redis_pipeline,
+                replica_router=replica_router,
+                near_cache=near_cache,
+                converters=converters,
+                codec=codec,
+                lock_manager=LockManager(
+                    redis=redis,
+                    release_listener=LockReleaseListener(redis),
+                    config=LockManagerConfig(timedelta(seconds=5)),
+                ),
+                version_tracker=VersionTracker(),
+                config=lobby_mapper_config,
+            )
+
+            if iteration == 0:
+                await lobby_mapper.save(lobby)
+                await redis_pipeline.execute()
+                continue
+
+            started_at = time.perf_counter()
+            await lobby_mapper.by_id(lobby.id)
+            latencies.append(time.perf_counter() - started_at)
+
+    await near_cache.stop()
+
+    state = "enabled" if near_cache_config.enabled else "disabled"
+    report_latencies(f"LobbyMapper.by_id (near cache {state})", latencies)
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            await redis.flushdb()
+            await _run(redis, NearCacheConfig())
+            await _run(redis, NearCacheConfig(enabled=True))
+            await redis.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,199 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures how fast `MatchPlayersProcessor` drains matchmaking
+queues of different depths against a local redis, reporting
+p50/p99 latency of a round and matched players per second.
+
+The redis database is flushed, so a dedicated one must be used:
+
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 \\
+        python -m benchmarks.matchmaking
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    UserId,
+    ConnectFourRuleSet,
+    CreateLobby,
+    JoinLobby,
+)
+from connection_hub.application import (
+    MatchmakingTicket,
+    MatchPlayersCommand,
+    MatchPlayersProcessor,
+)
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    common_retort_factory,
+    converters_factory,
+    ReplicaRouter,
+    NearCacheConfig,
+    NearCache,
+    EntityCodecConfig,
+    EntityCodec,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    VersionTracker,
+    LobbyMapperConfig,
+    LobbyMapper,
+    GameMapperConfig,
+    GameMapper,
+    MatchmakingQueueConfig,
+    RedisMatchmakingQueue,
+    RedisTransactionManager,
+)
+from .common import (
+    report_latencies,
+    NullEventPublisher,
+    NullPresenceTracker,
+    NullCentrifugoClient,
+)
+
+
+_QUEUE_DEPTHS = (1_000, 10_000, 50_000)
+_RULE_SETS = tuple(
+    ConnectFourRuleSet(time_for_each_player=timedelta(seconds=seconds))
+    for seconds in (30, 60, 180)
+)
+_MAX_PAIRS_PER_RULE_SET = 500
+
+
+async def _fill_queues(redis: Redis, queue_depth: int) -> None:
+    async for redis_pipeline in redis_pipeline_factory(redis):
+        matchmaking_queue = RedisMatchmakingQueue(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=5)),
+            ),
+            config=MatchmakingQueueConfig(),
+        )
+        for index in range(queue_depth):
+            ticket = MatchmakingTicket(
+                user_id=UserId(uuid7()),
+                rule_set=_RULE_SETS[index % len(_RULE_SETS)],
+                enqueued_at=datetime.now(timezone.utc),
+            )
+            await matchmaking_queue.add(ticket)
+        await redis_pipeline.execute()
+
+
+async def _run(redis: Redis, queue_depth: int) -> None:
+    converters = converters_factory(common_retort_factory())
+    codec = EntityCodec(EntityCodecConfig())
+    command = MatchPlayersCommand(
+        max_pairs_per_rule_set=_MAX_PAIRS_PER_RULE_SET,
+    )
+
+    await redis.flushdb()
+    await _fill_queues(redis, queue_depth)
+
+    latencies = []
+    matched_pairs = 0
+    started_at = time.perf_counter()
+
+    while True:
+        async for redis_pipeline in redis_pipeline_factory(redis):
+            lock_manager = LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=5)),
+            )
+            version_tracker = VersionTracker()
+            lobby_mapper = LobbyMapper(
+                redis=redis,
+                redis_pipeline=redis_pipeline,
+                replica_router=ReplicaRouter(redis),
+                near_cache=NearCache(redis, NearCacheConfig()),
+                converters=converters,
+                codec=codec,
+                lock_manager=lock_manager,
+                version_tracker=version_tracker,
+                config=LobbyMapperConfig(
+                    lobby_expires_in=timedelta(minutes=5),
+                ),
+            )
+            game_mapper = GameMapper(
+                redis=redis,
+                redis_pipeline=redis_pipeline,
+                near_cache=NearCache(redis, NearCacheConfig()),
+                converters=converters,
+                codec=codec,
+                lock_manager=lock_manager,
+                version_tracker=version_tracker,
+                config=GameMapperConfig(game_expires_in=timedelta(minutes=5)),
+            )
+            processor = MatchPlayersProcessor(
+                create_lobby=CreateLobby(),
+                join_lobby=JoinLobby(),
+                matchmaking_queue=RedisMatchmakingQueue(
+                    redis=redis,
+                    redis_pipeline=redis_pipeline,
+                    lock_manager=lock_manager,
+                    config=MatchmakingQueueConfig(),
+                ),
+                lobby_gateway=lobby_mapper,
+                game_gateway=game_mapper,
+                event_publisher=NullEventPublisher(),
+                presence_tracker=NullPresenceTracker(),
+                centrifugo_client=NullCentrifugoClient(),
+                transaction_manager=RedisTransactionManager(
+                    redis=redis,
+                    redis_pipeline=redis_pipeline,
+                    lock_manager=lock_manager,
+                    version_tracker=version_tracker,
+                ),
+            )
+
+            round_started_at = time.perf_counter()
+            round_matched_pairs = await processor.process(command)
+            latencies.append(time.perf_counter() - round_started_at)
+
+            await lock_manager.release_all()
+
+        matched_pairs += round_matched_pairs
+        if not round_matched_pairs:
+            break
+
+    elapsed = time.perf_counter() - started_at
+    report_latencies(
+        f"MatchPlayersProcessor (queue depth {queue_depth})",
+        latencies,
+    )
+    print(  # noqa: T201
+        f"  matched {matched_pairs * 2} players in {elapsed:.3f}s, "
+        f"{matched_pairs * 2 / elapsed:.0f} players/s",
+    )
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            for queue_depth in _QUEUE_DEPTHS:
+                await _run(redis, queue_depth)
+            await redis.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 latency of `AcknowledgePresenceProcessor`,
+which costs a single ZADD, and of claiming a round of
+absent users with `RedisPresenceTracker.claim_absent` while
+10k and 100k users are tracked, a tenth of which are absent.
+
+The redis database is flushed, so a dedicated one must be used:
+
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 \\
+        python -m benchmarks.presence
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import UserId
+from connection_hub.application import AcknowledgePresenceProcessor
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    RedisPresenceTracker,
+)
+from .common import report_latencies, StaticIdentityProvider
+
+
+_ACKNOWLEDGEMENTS = 10_000
+_TRACKED_USER_COUNTS = (10_000, 100_000)
+_ABSENT_SHARE = 0.1
+_MAX_USERS_PER_ROUND = 1000
+_PRESENCE_WINDOW = timedelta(seconds=15)
+_CLAIM_EXPIRES_IN = timedelta(seconds=30)
+
+
+async def _acknowledge(redis: Redis) -> None:
+    presence_tracker = RedisPresenceTracker(redis)
+    user_ids = [UserId(uuid7()) for _ in range(100)]
+
+    latencies = []
+    for index in range(_ACKNOWLEDGEMENTS):
+        processor = AcknowledgePresenceProcessor(
+            presence_tracker=presence_tracker,
+            identity_provider=StaticIdentityProvider(
+                user_ids[index % len(user_ids)],
+            ),
+        )
+
+        started_at = time.perf_counter()
+        await processor.process()
+        latencies.append(time.perf_counter() - started_at)
+
+    report_latencies("acknowledge presence", latencies)
+
+
+async def _claim_absent(redis: Redis, tracked_user_count: int) -> None:
+    presence_tracker = RedisPresenceTracker(redis)
+    now = datetime.now(timezone.utc)
+    absent_user_count = int(tracked_user_count * _ABSENT_SHARE)
+
+    await presence_tracker.acknowledge_many(
+        (UserId(uuid7()) for _ in range(absent_user_count)),
+        at=now - _PRESENCE_WINDOW * 2,
+    )
+    await presence_tracker.acknowledge_many(
+        (UserId(uuid7()) for _ in range(tracked_user_count)),
+        at=now,
+    )
+
+    latencies = []
+    while True:
+        started_at = time.perf_counter()
+        absent_user_ids = await presence_tracker.claim_absent(
+            seen_before=now - _PRESENCE_WINDOW,
+            limit=_MAX_USERS_PER_ROUND,
+            claimed_until=now - _PRESENCE_WINDOW + _CLAIM_EXPIRES_IN,
+        )
+        latencies.append(time.perf_counter() - started_at)
+
+        if len(absent_user_ids) < _MAX_USERS_PER_ROUND:
+            break
+
+    report_latencies(
+        f"claim {_MAX_USERS_PER_ROUND} absent of {tracked_user_count} users",
+        latencies,
+    )
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            await redis.flushdb()
+            await _acknowledge(redis)
+
+            for tracked_user_count in _TRACKED_USER_COUNTS:
+                await redis.flushdb()
+                await _claim_absent(redis, tracked_user_count)
+
+            await redis.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
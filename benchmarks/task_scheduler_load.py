@@ -0,0 +1,173 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures how long the task scheduler takes to find due tasks
+among 10k and 100k schedules, a tenth of which are due: the
+scheduler loop of taskiq reads every schedule each tick,
+while `SortedSetScheduler` reads only due ones. Idle ticks,
+i.e. ones finding no due schedules, are measured as well:
+
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 \\
+        python -m benchmarks.task_scheduler_load
+"""
+
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio.client import Redis
+from taskiq import BrokerMessage, InMemoryBroker, ScheduledTask
+from taskiq_redis import RedisScheduleSource
+from uuid_extensions import uuid7
+
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    taskiq_redis_schedule_source_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    RedisPipelineScheduleSource,
+    SortedSetSchedulerConfig,
+    SortedSetScheduler,
+)
+from .common import report_latencies
+
+
+_ITERATIONS = 20
+_SCHEDULE_COUNTS = (10_000, 100_000)
+_DUE_SHARE = 0.1
+_WRITE_BATCH_SIZE = 1000
+
+
+class _NullBroker(InMemoryBroker):
+    async def kick(self, message: BrokerMessage) -> None:
+        return
+
+
+def _schedules(count: int) -> list[ScheduledTask]:
+    now = datetime.now(timezone.utc)
+    due_count = int(count * _DUE_SHARE)
+
+    return [
+        ScheduledTask(
+            task_name="disconnect_from_game",
+            labels={},
+            args=[],
+            kwargs={"game_id": uuid7().hex},
+            schedule_id=f"disconnect_from_game:{uuid7().hex}",
+            time=(
+                now - timedelta(seconds=1)
+                if index < due_count
+                else now + timedelta(hours=1)
+            ),
+        )
+        for index in range(count)
+    ]
+
+
+async def _write(
+    redis: Redis,
+    schedule_source: RedisScheduleSource,
+    schedules: list[ScheduledTask],
+) -> None:
+    async for redis_pipeline in redis_pipeline_factory(redis):
+        pipeline_schedule_source = RedisPipelineScheduleSource(
+            schedule_source=schedule_source,
+            redis_pipeline=redis_pipeline,
+        )
+        for batch in itertools.batched(
+            schedules,
+            _WRITE_BATCH_SIZE,
+            strict=False,
+        ):
+            await pipeline_schedule_source.add_schedules(batch)
+            await redis_pipeline.execute()
+
+
+async def _run(
+    redis: Redis,
+    schedule_source: RedisScheduleSource,
+    reading_schedule_source: RedisScheduleSource,
+    scheduler: SortedSetScheduler,
+    schedule_count: int,
+) -> None:
+    scan_latencies = []
+    dispatch_latencies = []
+    idle_latencies = []
+
+    for _ in range(_ITERATIONS):
+        await redis.flushdb()
+        await _write(redis, schedule_source, _schedules(schedule_count))
+
+        started_at = time.perf_counter()
+        await reading_schedule_source.get_schedules()
+        scan_latencies.append(time.perf_counter() - started_at)
+
+        started_at = time.perf_counter()
+        while await scheduler.dispatch_due():
+            pass
+        dispatch_latencies.append(time.perf_counter() - started_at)
+
+        started_at = time.perf_counter()
+        await scheduler.dispatch_due()
+        idle_latencies.append(time.perf_counter() - started_at)
+
+    report_latencies(
+        f"read all of {schedule_count} schedules (taskiq)",
+        scan_latencies,
+    )
+    report_latencies(
+        f"dispatch due of {schedule_count} schedules (sorted set)",
+        dispatch_latencies,
+    )
+    report_latencies(
+        f"idle tick at {schedule_count} schedules (sorted set)",
+        idle_latencies,
+    )
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    # Schedules are read with a source of its own, since
+    # responses of the shared pool are decoded.
+    reading_schedule_source = taskiq_redis_schedule_source_factory(
+        redis_config,
+    )
+    scheduler = SortedSetScheduler(
+        broker=_NullBroker(),
+        schedule_source=taskiq_redis_schedule_source_factory(redis_config),
+        config=SortedSetSchedulerConfig(),
+    )
+
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            schedule_source = shared_taskiq_redis_schedule_source_factory(
+                redis_config=redis_config,
+                connection_pool=connection_pool,
+            )
+            for schedule_count in _SCHEDULE_COUNTS:
+                await _run(
+                    redis,
+                    schedule_source,
+                    reading_schedule_source,
+                    scheduler,
+                    schedule_count,
+                )
+
+            await redis.flushdb()
+
+    await reading_schedule_source.shutdown()
+    await scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
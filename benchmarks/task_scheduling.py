@@ -0,0 +1,166 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+"""
+Measures p50/p99 latency of scheduling and unscheduling tasks
+of a whole game, i.e. two tasks per player as scheduled by
+`TryToDisqualifyPlayerProcessor` and unscheduled by
+`EndGameProcessor`, one by one with a round trip per task
+and in bulk with a single one, at games of 2, 8 and 64
+players:
+
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 \\
+        python -m benchmarks.task_scheduling
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio.client import Redis
+from taskiq_redis import RedisScheduleSource
+from uuid_extensions import uuid7
+
+from connection_hub.domain import GameId, UserId, PlayerStateId
+from connection_hub.application import (
+    disconnect_from_game_task_id_factory,
+    try_to_disqualify_player_task_id_factory,
+    DisconnectFromGameTask,
+    TryToDisqualifyPlayerTask,
+    Task,
+)
+from connection_hub.infrastructure import (
+    get_env_var,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    RedisPipelineScheduleSource,
+    TaskiqTaskScheduler,
+    default_operation_id_factory,
+)
+from .common import report_latencies
+
+
+_ITERATIONS = 500
+_PLAYER_COUNTS = (2, 8, 64)
+
+
+def _game_tasks(player_count: int) -> list[Task]:
+    game_id = GameId(uuid7())
+    execute_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    tasks: list[Task] = []
+    for _ in range(player_count):
+        player_id = UserId(uuid7())
+        player_state_id = PlayerStateId(uuid7())
+        tasks.append(
+            DisconnectFromGameTask(
+                id=disconnect_from_game_task_id_factory(
+                    game_id=game_id,
+                    player_id=player_id,
+                ),
+                execute_at=execute_at,
+                game_id=game_id,
+                player_id=player_id,
+            ),
+        )
+        tasks.append(
+            TryToDisqualifyPlayerTask(
+                id=try_to_disqualify_player_task_id_factory(
+                    player_state_id,
+                ),
+                execute_at=execute_at,
+                game_id=game_id,
+                player_id=player_id,
+                player_state_id=player_state_id,
+            ),
+        )
+
+    return tasks
+
+
+async def _run(
+    redis: Redis,
+    schedule_source: RedisScheduleSource,
+    player_count: int,
+    *,
+    bulk: bool,
+) -> None:
+    schedule_latencies = []
+    unschedule_latencies = []
+
+    for _ in range(_ITERATIONS):
+        tasks = _game_tasks(player_count)
+        task_ids = [task.id for task in tasks]
+
+        async for redis_pipeline in redis_pipeline_factory(redis):
+            task_scheduler = TaskiqTaskScheduler(
+                schedule_source=RedisPipelineScheduleSource(
+                    schedule_source=schedule_source,
+                    redis_pipeline=redis_pipeline,
+                ),
+                operation_id=default_operation_id_factory(),
+            )
+
+            started_at = time.perf_counter()
+            if bulk:
+                await task_scheduler.schedule_many(tasks)
+                await redis_pipeline.execute()
+            else:
+                for task in tasks:
+                    await task_scheduler.schedule(task)
+                    await redis_pipeline.execute()
+            schedule_latencies.append(time.perf_counter() - started_at)
+
+            started_at = time.perf_counter()
+            if bulk:
+                await task_scheduler.unschedule_many(task_ids)
+                await redis_pipeline.execute()
+            else:
+                for task_id in task_ids:
+                    await task_scheduler.unschedule(task_id)
+                    await redis_pipeline.execute()
+            unschedule_latencies.append(time.perf_counter() - started_at)
+
+    mode = "bulk" if bulk else "one by one"
+    report_latencies(
+        f"schedule {player_count * 2} tasks ({mode})",
+        schedule_latencies,
+    )
+    report_latencies(
+        f"unschedule {player_count * 2} tasks ({mode})",
+        unschedule_latencies,
+    )
+
+
+async def main() -> None:
+    redis_url = get_env_var(
+        "BENCHMARK_REDIS_URL",
+        default="redis://localhost:6379/15",
+    )
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            await redis.flushdb()
+
+            schedule_source = shared_taskiq_redis_schedule_source_factory(
+                redis_config=redis_config,
+                connection_pool=connection_pool,
+            )
+            for player_count in _PLAYER_COUNTS:
+                for bulk in (False, True):
+                    await _run(
+                        redis,
+                        schedule_source,
+                        player_count,
+                        bulk=bulk,
+                    )
+
+            await redis.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
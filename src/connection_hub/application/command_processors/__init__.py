@@ -7,9 +7,13 @@ from .join_lobby import *
 from .leave_lobby import *
 from .remove_from_lobby import *
 from .kick_from_lobby import *
+from .list_open_lobbies import *
+from .enter_matchmaking import *
+from .match_players import *
 from .create_game import *
 from .start_game import *
 from .acknowledge_presence import *
+from .evict_absent_users import *
 from .disconnect_from_game import *
 from .reconnect_to_game import *
 from .try_to_disqualify_player import *
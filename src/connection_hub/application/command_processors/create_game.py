@@ -19,6 +19,7 @@ from connection_hub.application.common import (
     EventPublisher,
     TransactionManager,
     IdentityProvider,
+    TimeoutPolicy,
     LobbyDoesNotExistError,
     CurrentUserNotInLobbyError,
 )
@@ -37,6 +38,7 @@ class CreateGameProcessor:
         "_event_publisher",
         "_transaction_manager",
         "_identity_provider",
+        "_timeout_policy",
     )
 
     def __init__(
@@ -47,6 +49,7 @@ class CreateGameProcessor:
         event_publisher: EventPublisher,
         transaction_manager: TransactionManager,
         identity_provider: IdentityProvider,
+        timeout_policy: TimeoutPolicy,
     ):
         self._create_game = create_game
         self._lobby_gateway = lobby_gateway
@@ -54,6 +57,7 @@ class CreateGameProcessor:
         self._event_publisher = event_publisher
         self._transaction_manager = transaction_manager
         self._identity_provider = identity_provider
+        self._timeout_policy = timeout_policy
 
     async def process(self, command: CreateGameCommand) -> None:
         current_user_id = await self._identity_provider.user_id()
@@ -71,6 +75,7 @@ class CreateGameProcessor:
         new_game = self._create_game(
             lobby=lobby,
             current_user_id=current_user_id,
+            time_for_reconnect=self._timeout_policy.time_for_reconnect(lobby),
         )
         await self._game_gateway.save(new_game)
 
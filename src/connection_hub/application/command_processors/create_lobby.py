@@ -18,12 +18,10 @@ from connection_hub.domain import (
 )
 from connection_hub.application.common import (
     LobbyGateway,
-    GameGateway,
+    MembershipGateway,
     LobbyCreatedEvent,
     EventPublisher,
-    RemoveFromLobbyTask,
-    remove_from_lobby_task_id_factory,
-    TaskScheduler,
+    PresenceTracker,
     Serializable,
     CENTRIFUGO_LOBBY_BROWSER_CHANNEL,
     CentrifugoPublishCommand,
@@ -60,9 +58,9 @@ class CreateLobbyProcessor:
     __slots__ = (
         "_create_lobby",
         "_lobby_gateway",
-        "_game_gateway",
+        "_membership_gateway",
         "_event_publisher",
-        "_task_scheduler",
+        "_presence_tracker",
         "_centrifugo_client",
         "_transaction_manager",
         "_identity_provider",
@@ -72,18 +70,18 @@ class CreateLobbyProcessor:
         self,
         create_lobby: CreateLobby,
         lobby_gateway: LobbyGateway,
-        game_gateway: GameGateway,
+        membership_gateway: MembershipGateway,
         event_publisher: EventPublisher,
-        task_scheduler: TaskScheduler,
+        presence_tracker: PresenceTracker,
         centrifugo_client: CentrifugoClient,
         transaction_manager: TransactionManager,
         identity_provider: IdentityProvider,
     ):
         self._create_lobby = create_lobby
         self._lobby_gateway = lobby_gateway
-        self._game_gateway = game_gateway
+        self._membership_gateway = membership_gateway
         self._event_publisher = event_publisher
-        self._task_scheduler = task_scheduler
+        self._presence_tracker = presence_tracker
         self._centrifugo_client = centrifugo_client
         self._transaction_manager = transaction_manager
         self._identity_provider = identity_provider
@@ -91,16 +89,12 @@ class CreateLobbyProcessor:
     async def process(self, command: CreateLobbyCommand) -> LobbyId:
         current_user_id = await self._identity_provider.user_id()
 
-        lobby = await self._lobby_gateway.by_user_id(
+        membership = await self._membership_gateway.membership(
             current_user_id,
         )
-        if lobby:
+        if membership.lobby_id:
             raise CurrentUserInLobbyError()
-
-        game = await self._game_gateway.by_player_id(
-            current_user_id,
-        )
-        if game:
+        if membership.game_id:
             raise CurrentUserInGameError()
 
         self._validate_name(command.name)
@@ -117,20 +111,10 @@ class CreateLobbyProcessor:
         )
         await self._lobby_gateway.save(new_lobby)
 
-        task_id = remove_from_lobby_task_id_factory(
-            lobby_id=new_lobby.id,
-            user_id=current_user_id,
-        )
-        execute_task_at = datetime.now(timezone.utc) + timedelta(
-            seconds=15,
-        )
-        task = RemoveFromLobbyTask(
-            id=task_id,
-            execute_at=execute_task_at,
-            lobby_id=new_lobby.id,
-            user_id=current_user_id,
+        await self._presence_tracker.acknowledge(
+            current_user_id,
+            at=datetime.now(timezone.utc),
         )
-        await self._task_scheduler.schedule(task)
 
         event = LobbyCreatedEvent(
             lobby_id=new_lobby.id,
@@ -10,7 +10,6 @@ from connection_hub.domain import GameId
 from connection_hub.application.common import (
     GameGateway,
     TaskScheduler,
-    disconnect_from_game_task_id_factory,
     try_to_disqualify_player_task_id_factory,
     TransactionManager,
     GameDoesNotExistError,
@@ -49,18 +48,12 @@ class EndGameProcessor:
 
         await self._game_gateway.delete(game)
 
-        task_ids = []
-        for player_id, player_state in game.players.items():
-            task_id = disconnect_from_game_task_id_factory(
-                game_id=game.id,
-                player_id=player_id,
-            )
-            task_ids.append(task_id)
-
-            task_id = try_to_disqualify_player_task_id_factory(
+        task_ids = [
+            try_to_disqualify_player_task_id_factory(
                 player_state_id=player_state.id,
             )
-            task_ids.append(task_id)
+            for player_state in game.players.values()
+        ]
 
         await self._task_scheduler.unschedule_many(task_ids)
 
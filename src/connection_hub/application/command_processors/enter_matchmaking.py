@@ -0,0 +1,88 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("EnterMatchmakingCommand", "EnterMatchmakingProcessor")
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+from connection_hub.domain import ConnectFourRuleSet, RuleSet
+from connection_hub.application.common import (
+    MembershipGateway,
+    MatchmakingTicket,
+    MatchmakingQueue,
+    TransactionManager,
+    IdentityProvider,
+    InvalidLobbyRuleSetError,
+    CurrentUserInLobbyError,
+    CurrentUserInGameError,
+)
+
+
+_MIN_CONNECT_FOUR_TIME_FOR_EACH_PLAYER: Final = timedelta(seconds=30)
+_MAX_CONNECT_FOUR_TIME_FOR_EACH_PLAYER: Final = timedelta(minutes=3)
+
+
+@dataclass(frozen=True, slots=True)
+class EnterMatchmakingCommand:
+    rule_set: RuleSet
+
+
+class EnterMatchmakingProcessor:
+    """
+    Puts the current user into the queue of users waiting
+    to play with the provided rule set. Users are taken from
+    the queue in pairs by `MatchPlayersProcessor`.
+    """
+
+    __slots__ = (
+        "_membership_gateway",
+        "_matchmaking_queue",
+        "_transaction_manager",
+        "_identity_provider",
+    )
+
+    def __init__(
+        self,
+        membership_gateway: MembershipGateway,
+        matchmaking_queue: MatchmakingQueue,
+        transaction_manager: TransactionManager,
+        identity_provider: IdentityProvider,
+    ):
+        self._membership_gateway = membership_gateway
+        self._matchmaking_queue = matchmaking_queue
+        self._transaction_manager = transaction_manager
+        self._identity_provider = identity_provider
+
+    async def process(self, command: EnterMatchmakingCommand) -> None:
+        current_user_id = await self._identity_provider.user_id()
+
+        membership = await self._membership_gateway.membership(
+            current_user_id,
+        )
+        if membership.lobby_id:
+            raise CurrentUserInLobbyError()
+        if membership.game_id:
+            raise CurrentUserInGameError()
+
+        self._validate_rule_set(command.rule_set)
+
+        ticket = MatchmakingTicket(
+            user_id=current_user_id,
+            rule_set=command.rule_set,
+            enqueued_at=datetime.now(timezone.utc),
+        )
+        await self._matchmaking_queue.add(ticket)
+
+        await self._transaction_manager.commit()
+
+    def _validate_rule_set(self, rule_set: RuleSet) -> None:
+        if isinstance(rule_set, ConnectFourRuleSet):
+            if not (
+                _MIN_CONNECT_FOUR_TIME_FOR_EACH_PLAYER
+                <= rule_set.time_for_each_player
+                <= _MAX_CONNECT_FOUR_TIME_FOR_EACH_PLAYER
+            ):
+                raise InvalidLobbyRuleSetError()
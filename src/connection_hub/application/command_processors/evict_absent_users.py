@@ -0,0 +1,110 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("EvictAbsentUsersCommand", "EvictAbsentUsersProcessor")
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from connection_hub.domain import PlayerStatus
+from connection_hub.application.common import (
+    LobbyGateway,
+    GameGateway,
+    PresenceTracker,
+    TimeoutPolicy,
+)
+from .remove_from_lobby import RemoveFromLobbyCommand
+from .disconnect_from_game import DisconnectFromGameCommand
+
+
+@dataclass(frozen=True, slots=True)
+class EvictAbsentUsersCommand:
+    max_users: int
+
+    # Users, whose eviction has not completed within this
+    # time, are taken again by a later round.
+    claim_expires_in: timedelta
+
+
+class EvictAbsentUsersProcessor:
+    """
+    Takes users, who have not acknowledged presence within
+    the presence window, and returns commands removing them from
+    their lobbies and disconnecting them from their games.
+    Lobbies and games are looked up for all users at once.
+
+    Users are claimed rather than dropped, and are taken
+    again once their claim expires. Users, who are neither in
+    a lobby nor connected to a game, are forgotten without a
+    command. Evicted users are forgotten this way by a later
+    round, so users, whose eviction has failed, are evicted
+    again instead of being lost.
+    """
+
+    __slots__ = (
+        "_lobby_gateway",
+        "_game_gateway",
+        "_presence_tracker",
+        "_timeout_policy",
+    )
+
+    def __init__(
+        self,
+        lobby_gateway: LobbyGateway,
+        game_gateway: GameGateway,
+        presence_tracker: PresenceTracker,
+        timeout_policy: TimeoutPolicy,
+    ):
+        self._lobby_gateway = lobby_gateway
+        self._game_gateway = game_gateway
+        self._presence_tracker = presence_tracker
+        self._timeout_policy = timeout_policy
+
+    async def process(
+        self,
+        command: EvictAbsentUsersCommand,
+    ) -> list[RemoveFromLobbyCommand | DisconnectFromGameCommand]:
+        seen_before = (
+            datetime.now(timezone.utc) - self._timeout_policy.presence_window
+        )
+        claimed_until = seen_before + command.claim_expires_in
+
+        absent_user_ids = await self._presence_tracker.claim_absent(
+            seen_before=seen_before,
+            limit=command.max_users,
+            claimed_until=claimed_until,
+        )
+        if not absent_user_ids:
+            return []
+
+        absent_user_id_set = set(absent_user_ids)
+        commands: list[RemoveFromLobbyCommand | DisconnectFromGameCommand] = []
+
+        for lobby in await self._lobby_gateway.by_user_ids(absent_user_ids):
+            for user_id in lobby.users.keys() & absent_user_id_set:
+                remove_from_lobby_command = RemoveFromLobbyCommand(
+                    lobby_id=lobby.id,
+                    user_id=user_id,
+                )
+                commands.append(remove_from_lobby_command)
+
+        for game in await self._game_gateway.by_player_ids(absent_user_ids):
+            for user_id in game.players.keys() & absent_user_id_set:
+                if game.players[user_id].status != PlayerStatus.CONNECTED:
+                    continue
+
+                disconnect_from_game_command = DisconnectFromGameCommand(
+                    game_id=game.id,
+                    user_id=user_id,
+                )
+                commands.append(disconnect_from_game_command)
+
+        await self._presence_tracker.forget(
+            absent_user_id_set.difference(
+                eviction_command.user_id for eviction_command in commands
+            ),
+            claimed_until=claimed_until,
+        )
+
+        return commands
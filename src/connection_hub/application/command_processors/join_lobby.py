@@ -5,17 +5,15 @@
 __all__ = ("JoinLobbyCommand", "JoinLobbyProcessor")
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 from connection_hub.domain import LobbyId, UserId, Lobby, JoinLobby
 from connection_hub.application.common import (
     LobbyGateway,
-    GameGateway,
+    MembershipGateway,
     UserJoinedLobbyEvent,
     EventPublisher,
-    RemoveFromLobbyTask,
-    remove_from_lobby_task_id_factory,
-    TaskScheduler,
+    PresenceTracker,
     Serializable,
     CentrifugoPublishCommand,
     CentrifugoClient,
@@ -39,9 +37,9 @@ class JoinLobbyProcessor:
     __slots__ = (
         "_join_lobby",
         "_lobby_gateway",
-        "_game_gateway",
+        "_membership_gateway",
         "_event_publisher",
-        "_task_scheduler",
+        "_presence_tracker",
         "_centrifugo_client",
         "_transaction_manager",
         "_identity_provider",
@@ -51,18 +49,18 @@ class JoinLobbyProcessor:
         self,
         join_lobby: JoinLobby,
         lobby_gateway: LobbyGateway,
-        game_gateway: GameGateway,
+        membership_gateway: MembershipGateway,
         event_publisher: EventPublisher,
-        task_scheduler: TaskScheduler,
+        presence_tracker: PresenceTracker,
         centrifugo_client: CentrifugoClient,
         transaction_manager: TransactionManager,
         identity_provider: IdentityProvider,
     ):
         self._join_lobby = join_lobby
         self._lobby_gateway = lobby_gateway
-        self._game_gateway = game_gateway
+        self._membership_gateway = membership_gateway
         self._event_publisher = event_publisher
-        self._task_scheduler = task_scheduler
+        self._presence_tracker = presence_tracker
         self._centrifugo_client = centrifugo_client
         self._transaction_manager = transaction_manager
         self._identity_provider = identity_provider
@@ -70,16 +68,12 @@ class JoinLobbyProcessor:
     async def process(self, command: JoinLobbyCommand) -> None:
         current_user_id = await self._identity_provider.user_id()
 
-        lobby = await self._lobby_gateway.by_user_id(
+        membership = await self._membership_gateway.membership(
             current_user_id,
         )
-        if lobby:
+        if membership.lobby_id:
             raise CurrentUserInLobbyError()
-
-        game = await self._game_gateway.by_player_id(
-            current_user_id,
-        )
-        if game:
+        if membership.game_id:
             raise CurrentUserInGameError()
 
         lobby_to_join = await self._lobby_gateway.by_id(
@@ -96,20 +90,10 @@ class JoinLobbyProcessor:
         )
         await self._lobby_gateway.update(lobby_to_join)
 
-        task_id = remove_from_lobby_task_id_factory(
-            lobby_id=lobby_to_join.id,
-            user_id=current_user_id,
-        )
-        execute_task_at = datetime.now(timezone.utc) + timedelta(
-            seconds=15,
-        )
-        task = RemoveFromLobbyTask(
-            id=task_id,
-            execute_at=execute_task_at,
-            lobby_id=lobby_to_join.id,
-            user_id=current_user_id,
+        await self._presence_tracker.acknowledge(
+            current_user_id,
+            at=datetime.now(timezone.utc),
         )
-        await self._task_scheduler.schedule(task)
 
         event = UserJoinedLobbyEvent(
             lobby_id=command.lobby_id,
@@ -11,8 +11,6 @@ from connection_hub.application.common import (
     LobbyGateway,
     UserKickedFromLobbyEvent,
     EventPublisher,
-    remove_from_lobby_task_id_factory,
-    TaskScheduler,
     CentrifugoPublishCommand,
     CentrifugoUnsubscribeCommand,
     Serializable,
@@ -35,7 +33,6 @@ class KickFromLobbyProcessor:
         "_kick_from_lobby",
         "_lobby_gateway",
         "_event_publisher",
-        "_task_scheduler",
         "_centrifugo_client",
         "_transation_manager",
         "_identity_provider",
@@ -46,7 +43,6 @@ class KickFromLobbyProcessor:
         kick_from_lobby: KickFromLobby,
         lobby_gateway: LobbyGateway,
         event_publisher: EventPublisher,
-        task_scheduler: TaskScheduler,
         centrifugo_client: CentrifugoClient,
         tranaction_manager: TransactionManager,
         identity_provider: IdentityProvider,
@@ -54,7 +50,6 @@ class KickFromLobbyProcessor:
         self._kick_from_lobby = kick_from_lobby
         self._lobby_gateway = lobby_gateway
         self._event_publisher = event_publisher
-        self._task_scheduler = task_scheduler
         self._centrifugo_client = centrifugo_client
         self._transation_manager = tranaction_manager
         self._identity_provider = identity_provider
@@ -79,12 +74,6 @@ class KickFromLobbyProcessor:
         )
         await self._lobby_gateway.update(lobby)
 
-        task_id = remove_from_lobby_task_id_factory(
-            lobby_id=lobby.id,
-            user_id=current_user_id,
-        )
-        await self._task_scheduler.unschedule(task_id)
-
         event = UserKickedFromLobbyEvent(
             lobby_id=lobby.id,
             user_id=command.user_id,
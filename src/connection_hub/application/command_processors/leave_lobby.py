@@ -16,8 +16,6 @@ from connection_hub.application.common import (
     LobbyGateway,
     UserLeftLobbyEvent,
     EventPublisher,
-    remove_from_lobby_task_id_factory,
-    TaskScheduler,
     Serializable,
     CentrifugoPublishCommand,
     CentrifugoUnsubscribeCommand,
@@ -41,7 +39,6 @@ class LeaveLobbyProcessor:
         "_remove_from_lobby",
         "_lobby_gateway",
         "_event_publisher",
-        "_task_scheduler",
         "_centrifugo_client",
         "_transaction_manager",
         "_identity_provider",
@@ -52,7 +49,6 @@ class LeaveLobbyProcessor:
         remove_from_lobby: RemoveFromLobby,
         lobby_gateway: LobbyGateway,
         event_publisher: EventPublisher,
-        task_scheduler: TaskScheduler,
         centrifugo_client: CentrifugoClient,
         transaction_manager: TransactionManager,
         identity_provider: IdentityProvider,
@@ -60,7 +56,6 @@ class LeaveLobbyProcessor:
         self._remove_from_lobby = remove_from_lobby
         self._lobby_gateway = lobby_gateway
         self._event_publisher = event_publisher
-        self._task_scheduler = task_scheduler
         self._centrifugo_client = centrifugo_client
         self._transaction_manager = transaction_manager
         self._identity_provider = identity_provider
@@ -87,12 +82,6 @@ class LeaveLobbyProcessor:
         else:
             await self._lobby_gateway.update(lobby)
 
-        task_id = remove_from_lobby_task_id_factory(
-            lobby_id=lobby.id,
-            user_id=current_user_id,
-        )
-        await self._task_scheduler.unschedule(task_id)
-
         event = UserLeftLobbyEvent(
             lobby_id=lobby.id,
             user_id=current_user_id,
@@ -0,0 +1,75 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("ListOpenLobbiesQuery", "ListOpenLobbiesProcessor")
+
+from dataclasses import dataclass
+from typing import Final
+
+from connection_hub.domain import LobbyId, ConnectFourLobby, Lobby
+from connection_hub.application.common import (
+    RuleSetType,
+    OpenLobbyFilters,
+    LobbyGateway,
+    Serializable,
+)
+
+
+_DEFAULT_LIMIT: Final = 20
+_MAX_LIMIT: Final = 100
+
+
+@dataclass(slots=True, kw_only=True)
+class ListOpenLobbiesQuery:
+    cursor: LobbyId | None = None
+    limit: int = _DEFAULT_LIMIT
+    rule_set_type: RuleSetType | None = None
+    has_password: bool | None = None
+
+
+class ListOpenLobbiesProcessor:
+    """
+    Returns a page of lobbies shown in the lobby browser,
+    so that a freshly connected client can get a snapshot
+    before receiving publications on the lobby browser
+    channel. Lobbies are described the same way as in those
+    publications.
+    """
+
+    __slots__ = ("_lobby_gateway",)
+
+    def __init__(self, lobby_gateway: LobbyGateway):
+        self._lobby_gateway = lobby_gateway
+
+    async def process(self, query: ListOpenLobbiesQuery) -> Serializable:
+        filters = OpenLobbyFilters(
+            rule_set_type=query.rule_set_type,
+            has_password=query.has_password,
+        )
+        page = await self._lobby_gateway.list_open(
+            cursor=query.cursor,
+            limit=min(max(query.limit, 1), _MAX_LIMIT),
+            filters=filters,
+        )
+
+        return {
+            "lobbies": [self._lobby_as_dict(lobby) for lobby in page.lobbies],
+            "next_cursor": page.next_cursor.hex if page.next_cursor else None,
+        }
+
+    def _lobby_as_dict(self, lobby: Lobby) -> Serializable:
+        if isinstance(lobby, ConnectFourLobby):
+            rule_set_as_dict: Serializable = {
+                "type": "connect_four",
+                "time_for_each_player": (
+                    lobby.time_for_each_player.total_seconds()
+                ),
+            }
+
+        return {
+            "lobby_id": lobby.id.hex,
+            "name": lobby.name,
+            "has_password": lobby.password is not None,
+            "rule_set": rule_set_as_dict,
+        }
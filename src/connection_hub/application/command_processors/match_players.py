@@ -0,0 +1,257 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("MatchPlayersCommand", "MatchPlayersProcessor")
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Final, Iterable
+
+from connection_hub.domain import (
+    UserId,
+    ConnectFourRuleSet,
+    RuleSet,
+    Lobby,
+    CreateLobby,
+    JoinLobby,
+)
+from connection_hub.application.common import (
+    LobbyGateway,
+    GameGateway,
+    MatchmakingQueue,
+    PresenceTracker,
+    LobbyCreatedEvent,
+    UserJoinedLobbyEvent,
+    EventPublisher,
+    Serializable,
+    CentrifugoPublishCommand,
+    CentrifugoCommand,
+    CentrifugoClient,
+    centrifugo_user_channel_factory,
+    TransactionManager,
+)
+
+
+_LOBBY_NAME: Final = "Quick match"
+
+
+@dataclass(frozen=True, slots=True)
+class MatchPlayersCommand:
+    max_pairs_per_rule_set: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class _Match:
+    lobby: Lobby
+    rule_set: RuleSet
+    first_user_id: UserId
+    second_user_id: UserId
+
+
+class MatchPlayersProcessor:
+    """
+    Takes users waiting in matchmaking queues in pairs and
+    creates a lobby for each pair, the user waiting longer
+    becoming its admin. All lobbies are created and their
+    users are removed from the queues in a single
+    transaction.
+
+    Tickets of users, who have got into a lobby or a game
+    after entering a queue, are removed without matching.
+    Returns the number of created lobbies.
+    """
+
+    __slots__ = (
+        "_create_lobby",
+        "_join_lobby",
+        "_matchmaking_queue",
+        "_lobby_gateway",
+        "_game_gateway",
+        "_event_publisher",
+        "_presence_tracker",
+        "_centrifugo_client",
+        "_transaction_manager",
+    )
+
+    def __init__(
+        self,
+        create_lobby: CreateLobby,
+        join_lobby: JoinLobby,
+        matchmaking_queue: MatchmakingQueue,
+        lobby_gateway: LobbyGateway,
+        game_gateway: GameGateway,
+        event_publisher: EventPublisher,
+        presence_tracker: PresenceTracker,
+        centrifugo_client: CentrifugoClient,
+        transaction_manager: TransactionManager,
+    ):
+        self._create_lobby = create_lobby
+        self._join_lobby = join_lobby
+        self._matchmaking_queue = matchmaking_queue
+        self._lobby_gateway = lobby_gateway
+        self._game_gateway = game_gateway
+        self._event_publisher = event_publisher
+        self._presence_tracker = presence_tracker
+        self._centrifugo_client = centrifugo_client
+        self._transaction_manager = transaction_manager
+
+    async def process(self, command: MatchPlayersCommand) -> int:
+        matches: list[_Match] = []
+        matched_user_ids: set[UserId] = set()
+
+        for rule_set in await self._matchmaking_queue.rule_sets():
+            tickets = await self._matchmaking_queue.oldest(
+                rule_set=rule_set,
+                limit=command.max_pairs_per_rule_set * 2,
+                acquire=True,
+            )
+            if not tickets:
+                continue
+
+            # User may wait in several queues, so they are not
+            # matched again once matched in one of them.
+            unavailable_user_ids = matched_user_ids | (
+                await self._busy_user_ids(ticket.user_id for ticket in tickets)
+            )
+            available_tickets = [
+                ticket
+                for ticket in tickets
+                if ticket.user_id not in unavailable_user_ids
+            ]
+
+            # The last user is left in the queue if there is
+            # no one to pair them with.
+            pair_count = len(available_tickets) // 2
+            tickets_to_remove = [
+                ticket
+                for ticket in tickets
+                if ticket.user_id in unavailable_user_ids
+            ]
+            tickets_to_remove.extend(available_tickets[: pair_count * 2])
+            await self._matchmaking_queue.remove_many(tickets_to_remove)
+
+            for first_ticket, second_ticket in zip(
+                available_tickets[0 : pair_count * 2 : 2],
+                available_tickets[1 : pair_count * 2 : 2],
+                strict=True,
+            ):
+                match = self._match(
+                    rule_set=rule_set,
+                    first_user_id=first_ticket.user_id,
+                    second_user_id=second_ticket.user_id,
+                )
+                matches.append(match)
+                matched_user_ids.add(first_ticket.user_id)
+                matched_user_ids.add(second_ticket.user_id)
+
+        if matches:
+            await self._lobby_gateway.save_many(
+                match.lobby for match in matches
+            )
+            await self._presence_tracker.acknowledge_many(
+                matched_user_ids,
+                at=datetime.now(timezone.utc),
+            )
+            for match in matches:
+                await self._publish_events(match)
+            await self._centrifugo_client.batch(
+                commands=self._centrifugo_commands(matches),
+            )
+
+        await self._transaction_manager.commit()
+
+        return len(matches)
+
+    async def _busy_user_ids(
+        self,
+        user_ids: Iterable[UserId],
+    ) -> set[UserId]:
+        """
+        Returns ids of users from `user_ids`, who are already
+        in a lobby or a game.
+        """
+        user_ids = set(user_ids)
+        busy_user_ids: set[UserId] = set()
+
+        for lobby in await self._lobby_gateway.by_user_ids(user_ids):
+            busy_user_ids.update(lobby.users)
+        for game in await self._game_gateway.by_player_ids(user_ids):
+            busy_user_ids.update(game.players)
+
+        return busy_user_ids & user_ids
+
+    def _match(
+        self,
+        *,
+        rule_set: RuleSet,
+        first_user_id: UserId,
+        second_user_id: UserId,
+    ) -> _Match:
+        lobby = self._create_lobby(
+            name=_LOBBY_NAME,
+            current_user_id=first_user_id,
+            rule_set=rule_set,
+        )
+        self._join_lobby(
+            lobby=lobby,
+            current_user_id=second_user_id,
+            password=None,
+        )
+        return _Match(
+            lobby=lobby,
+            rule_set=rule_set,
+            first_user_id=first_user_id,
+            second_user_id=second_user_id,
+        )
+
+    async def _publish_events(self, match: _Match) -> None:
+        lobby_created_event = LobbyCreatedEvent(
+            lobby_id=match.lobby.id,
+            name=match.lobby.name,
+            admin_id=match.first_user_id,
+            has_password=False,
+            rule_set=match.rule_set,
+        )
+        await self._event_publisher.publish(lobby_created_event)
+
+        user_joined_lobby_event = UserJoinedLobbyEvent(
+            lobby_id=match.lobby.id,
+            user_id=match.second_user_id,
+        )
+        await self._event_publisher.publish(user_joined_lobby_event)
+
+    def _centrifugo_commands(
+        self,
+        matches: list[_Match],
+    ) -> list[CentrifugoCommand]:
+        commands: list[CentrifugoCommand] = []
+
+        for match in matches:
+            if isinstance(match.rule_set, ConnectFourRuleSet):
+                rule_set_as_dict: Serializable = {
+                    "type": "connect_four",
+                    "time_for_each_player": (
+                        match.rule_set.time_for_each_player.total_seconds()
+                    ),
+                }
+
+            raw_users: Serializable = {
+                user_id.hex: user_role
+                for user_id, user_role in match.lobby.users.items()
+            }
+            centrifugo_publication: Serializable = {
+                "type": "matched",
+                "lobby_id": match.lobby.id.hex,
+                "name": match.lobby.name,
+                "users": raw_users,
+                "rule_set": rule_set_as_dict,
+            }
+            for user_id in match.lobby.users:
+                command = CentrifugoPublishCommand(
+                    channel=centrifugo_user_channel_factory(user_id),
+                    data=centrifugo_publication,
+                )
+                commands.append(command)
+
+        return commands
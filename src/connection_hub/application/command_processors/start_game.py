@@ -5,16 +5,13 @@
 __all__ = ("StartGameCommand", "StartGameProcessor")
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 from connection_hub.domain import GameId, LobbyId
 from connection_hub.application.common import (
     LobbyGateway,
     GameGateway,
-    remove_from_lobby_task_id_factory,
-    disconnect_from_game_task_id_factory,
-    DisconnectFromGameTask,
-    TaskScheduler,
+    PresenceTracker,
     Serializable,
     CENTRIFUGO_LOBBY_BROWSER_CHANNEL,
     CentrifugoClient,
@@ -34,7 +31,7 @@ class StartGameProcessor:
     __slots__ = (
         "_lobby_gateway",
         "_game_gateway",
-        "_task_scheduler",
+        "_presence_tracker",
         "_centrifugo_client",
         "_transaction_manager",
     )
@@ -43,13 +40,13 @@ class StartGameProcessor:
         self,
         lobby_gateway: LobbyGateway,
         game_gateway: GameGateway,
-        task_scheduler: TaskScheduler,
+        presence_tracker: PresenceTracker,
         centrifugo_client: CentrifugoClient,
         transaction_manager: TransactionManager,
     ):
         self._lobby_gateway = lobby_gateway
         self._game_gateway = game_gateway
-        self._task_scheduler = task_scheduler
+        self._presence_tracker = presence_tracker
         self._centrifugo_client = centrifugo_client
         self._transaction_manager = transaction_manager
 
@@ -64,34 +61,13 @@ class StartGameProcessor:
 
         await self._lobby_gateway.delete(lobby)
 
-        execute_tasks_at = datetime.now(timezone.utc) + timedelta(
-            seconds=15,
+        # Players get as much time to acknowledge presence in
+        # the game as they have got after joining the lobby.
+        await self._presence_tracker.acknowledge_many(
+            game.players,
+            at=datetime.now(timezone.utc),
         )
 
-        ids_of_tasks_to_unchedule = []
-        tasks_to_schedule = []
-        for user_id in game.players:
-            id_of_task_to_unschedule = remove_from_lobby_task_id_factory(
-                lobby_id=lobby.id,
-                user_id=user_id,
-            )
-            ids_of_tasks_to_unchedule.append(id_of_task_to_unschedule)
-
-            task_id = disconnect_from_game_task_id_factory(
-                game_id=game.id,
-                player_id=user_id,
-            )
-            task = DisconnectFromGameTask(
-                id=task_id,
-                execute_at=execute_tasks_at,
-                game_id=game.id,
-                player_id=user_id,
-            )
-            tasks_to_schedule.append(task)
-
-        await self._task_scheduler.unschedule_many(ids_of_tasks_to_unchedule)
-        await self._task_scheduler.schedule_many(tasks_to_schedule)
-
         centrifugo_publication: Serializable = {
             "type": "lobby_removed",
             "lobby_id": lobby.id.hex,
@@ -9,3 +9,6 @@ from .task_scheduler import *
 from .centrifugo_client import *
 from .transaction_manager import *
 from .identity_provider import *
+from .matchmaking_queue import *
+from .presence_tracker import *
+from .timeout_policy import *
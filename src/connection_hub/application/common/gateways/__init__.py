@@ -4,3 +4,4 @@
 
 from .lobby import *
 from .game import *
+from .membership import *
@@ -4,7 +4,7 @@
 
 __all__ = ("GameGateway",)
 
-from typing import Protocol
+from typing import Iterable, Protocol
 
 from connection_hub.domain import UserId, GameId, Game
 
@@ -44,6 +44,42 @@ class GameGateway(Protocol):
         """
         raise NotImplementedError
 
+    async def by_ids(
+        self,
+        game_ids: Iterable[GameId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        """
+        Returns games by specified `game_ids`, skipping ones
+        that do not exist.
+
+        Parameters:
+
+            `acquire`: Locks the returned games, preventing them
+                from being accessed via methods with this flag
+                until the current transaction is completed.
+        """
+        raise NotImplementedError
+
+    async def by_player_ids(
+        self,
+        player_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        """
+        Returns games, which any of specified `player_ids` is in,
+        each of them once.
+
+        Parameters:
+
+            `acquire`: Locks the returned games, preventing them
+                from being accessed via methods with this flag
+                until the current transaction is completed.
+        """
+        raise NotImplementedError
+
     async def save(self, game: Game) -> None:
         raise NotImplementedError
 
@@ -52,3 +88,9 @@ class GameGateway(Protocol):
 
     async def delete(self, game: Game) -> None:
         raise NotImplementedError
+
+    async def save_many(self, games: Iterable[Game]) -> None:
+        raise NotImplementedError
+
+    async def delete_many(self, games: Iterable[Game]) -> None:
+        raise NotImplementedError
@@ -2,13 +2,39 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("LobbyGateway",)
+__all__ = (
+    "RuleSetType",
+    "OpenLobbyFilters",
+    "OpenLobbiesPage",
+    "LobbyGateway",
+)
 
-from typing import Protocol
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Iterable, Protocol
 
 from connection_hub.domain import LobbyId, UserId, Lobby
 
 
+class RuleSetType(StrEnum):
+    CONNECT_FOUR = "connect_four"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OpenLobbyFilters:
+    rule_set_type: RuleSetType | None = None
+    has_password: bool | None = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class OpenLobbiesPage:
+    lobbies: list[Lobby]
+
+    # Cursor to pass to get the next page, None if there
+    # are no more lobbies.
+    next_cursor: LobbyId | None
+
+
 class LobbyGateway(Protocol):
     async def by_id(
         self,
@@ -44,6 +70,56 @@ class LobbyGateway(Protocol):
         """
         raise NotImplementedError
 
+    async def by_ids(
+        self,
+        lobby_ids: Iterable[LobbyId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        """
+        Returns lobbies by specified `lobby_ids`, skipping ones
+        that do not exist.
+
+        Parameters:
+
+            `acquire`: Locks the returned lobbies, preventing them
+                from being accessed via methods with this flag
+                until the current transaction is completed.
+        """
+        raise NotImplementedError
+
+    async def by_user_ids(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        """
+        Returns lobbies, which any of specified `user_ids` is in,
+        each of them once.
+
+        Parameters:
+
+            `acquire`: Locks the returned lobbies, preventing them
+                from being accessed via methods with this flag
+                until the current transaction is completed.
+        """
+        raise NotImplementedError
+
+    async def list_open(
+        self,
+        cursor: LobbyId | None,
+        limit: int,
+        filters: OpenLobbyFilters,
+    ) -> OpenLobbiesPage:
+        """
+        Returns up to `limit` lobbies matching `filters` from
+        the newest to the oldest, starting after the lobby
+        with id `cursor`, or from the newest one if it is None.
+        Lobbies are not locked.
+        """
+        raise NotImplementedError
+
     async def save(self, lobby: Lobby) -> None:
         raise NotImplementedError
 
@@ -52,3 +128,9 @@ class LobbyGateway(Protocol):
 
     async def delete(self, lobby: Lobby) -> None:
         raise NotImplementedError
+
+    async def save_many(self, lobbies: Iterable[Lobby]) -> None:
+        raise NotImplementedError
+
+    async def delete_many(self, lobbies: Iterable[Lobby]) -> None:
+        raise NotImplementedError
@@ -0,0 +1,25 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("Membership", "MembershipGateway")
+
+from dataclasses import dataclass
+from typing import Protocol
+
+from connection_hub.domain import LobbyId, GameId, UserId
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Membership:
+    lobby_id: LobbyId | None = None
+    game_id: GameId | None = None
+
+
+class MembershipGateway(Protocol):
+    async def membership(self, user_id: UserId) -> Membership:
+        """
+        Returns ids of a lobby and a game, which user with
+        specified `user_id` is in, resolved together.
+        """
+        raise NotImplementedError
@@ -0,0 +1,62 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("MatchmakingTicket", "MatchmakingQueue")
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Protocol
+
+from connection_hub.domain import UserId, RuleSet
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class MatchmakingTicket:
+    user_id: UserId
+    rule_set: RuleSet
+    enqueued_at: datetime
+
+
+class MatchmakingQueue(Protocol):
+    """
+    Keeps users waiting to be matched with other users,
+    separately for each rule set.
+    """
+
+    async def add(self, ticket: MatchmakingTicket) -> None:
+        """
+        Adds a ticket to the queue of its rule set. If the
+        user is already waiting in that queue, their place
+        in it is kept.
+        """
+        raise NotImplementedError
+
+    async def rule_sets(self) -> list[RuleSet]:
+        """
+        Returns rule sets, queues of which may contain tickets.
+        """
+        raise NotImplementedError
+
+    async def oldest(
+        self,
+        *,
+        rule_set: RuleSet,
+        limit: int,
+        acquire: bool = False,
+    ) -> list[MatchmakingTicket]:
+        """
+        Returns up to `limit` tickets waiting the longest
+        in the queue of the provided rule set, oldest first.
+
+        If `acquire` is True, the queue is locked, so that
+        no one else can take the same tickets until the
+        current transaction is completed.
+        """
+        raise NotImplementedError
+
+    async def remove_many(
+        self,
+        tickets: Iterable[MatchmakingTicket],
+    ) -> None:
+        raise NotImplementedError
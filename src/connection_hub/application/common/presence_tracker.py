@@ -0,0 +1,59 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("PresenceTracker",)
+
+from datetime import datetime
+from typing import Iterable, Protocol
+
+from connection_hub.domain import UserId
+
+
+class PresenceTracker(Protocol):
+    """
+    Keeps the time each user has last been seen at, so that
+    users, who have gone away, are removed from lobbies and
+    disconnected from games.
+    """
+
+    async def acknowledge(self, user_id: UserId, *, at: datetime) -> None:
+        raise NotImplementedError
+
+    async def acknowledge_many(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        at: datetime,
+    ) -> None:
+        raise NotImplementedError
+
+    async def claim_absent(
+        self,
+        *,
+        seen_before: datetime,
+        limit: int,
+        claimed_until: datetime,
+    ) -> list[UserId]:
+        """
+        Returns up to `limit` users last seen before
+        `seen_before` and moves the time they have last been
+        seen at to `claimed_until`, so that no one else gets
+        the same users until then. Users, who have not been
+        forgotten meanwhile, are returned again once they are
+        seen before `claimed_until`.
+        """
+        raise NotImplementedError
+
+    async def forget(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        claimed_until: datetime,
+    ) -> None:
+        """
+        Stops tracking users claimed until `claimed_until`,
+        unless they have been seen after it. Users are
+        tracked again once they are acknowledged.
+        """
+        raise NotImplementedError
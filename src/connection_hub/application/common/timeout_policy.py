@@ -0,0 +1,32 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("TimeoutPolicy",)
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from connection_hub.domain import ConnectFourLobby, Lobby
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class TimeoutPolicy:
+    # Users, who have not acknowledged presence for this
+    # long, are removed from lobbies and disconnected from
+    # games. The window is the same for all rule sets, since
+    # absent users are taken before their lobbies and games
+    # are known.
+    presence_window: timedelta = timedelta(seconds=15)
+
+    # Time a player of a Connect Four game has to reconnect
+    # to it over the whole game before being disqualified.
+    connect_four_time_for_reconnect: timedelta = timedelta(seconds=40)
+
+    def time_for_reconnect(self, lobby: Lobby) -> timedelta:
+        """
+        Returns time each player of a game created from the
+        provided lobby has to reconnect to it.
+        """
+        if isinstance(lobby, ConnectFourLobby):
+            return self.connect_four_time_for_reconnect
@@ -2,10 +2,11 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("ConnectFourLobby", "Lobby")
+__all__ = ("ConnectFourLobby", "Lobby", "LOBBY_TO_MAX_PLAYERS_MAP")
 
 from dataclasses import dataclass
 from datetime import timedelta
+from typing import Final
 
 from connection_hub.domain.identitifiers import LobbyId, UserId
 from connection_hub.domain.constants import UserRole
@@ -26,3 +27,8 @@ class ConnectFourLobby(BaseLobby):
 
 
 type Lobby = ConnectFourLobby
+
+
+LOBBY_TO_MAX_PLAYERS_MAP: Final[dict[type[Lobby], int]] = {
+    ConnectFourLobby: 2,
+}
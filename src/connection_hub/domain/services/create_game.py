@@ -5,7 +5,6 @@
 __all__ = ("CreateGame",)
 
 from datetime import datetime, timedelta, timezone
-from typing import Final
 
 from uuid_extensions import uuid7
 
@@ -25,11 +24,14 @@ from connection_hub.domain.models import (
 from connection_hub.domain.exceptions import UserIsNotAdminError
 
 
-_TIME_FOR_RECONNECT: Final = timedelta(seconds=40)
-
-
 class CreateGame:
-    def __call__(self, *, lobby: Lobby, current_user_id: UserId) -> Game:
+    def __call__(
+        self,
+        *,
+        lobby: Lobby,
+        current_user_id: UserId,
+        time_for_reconnect: timedelta,
+    ) -> Game:
         if lobby.users[current_user_id] != UserRole.ADMIN:
             raise UserIsNotAdminError()
 
@@ -37,7 +39,7 @@ class CreateGame:
             player_id: PlayerState(
                 id=PlayerStateId(uuid7()),
                 status=PlayerStatus.CONNECTED,
-                time_left=_TIME_FOR_RECONNECT,
+                time_left=time_for_reconnect,
             )
             for player_id in lobby.users
         }
@@ -4,11 +4,9 @@
 
 __all__ = ("JoinLobby",)
 
-from typing import Final
-
 from connection_hub.domain.identitifiers import UserId
 from connection_hub.domain.constants import UserRole
-from connection_hub.domain.models import ConnectFourLobby, Lobby
+from connection_hub.domain.models import Lobby, LOBBY_TO_MAX_PLAYERS_MAP
 from connection_hub.domain.exceptions import (
     UserLimitReachedError,
     PasswordRequiredError,
@@ -16,11 +14,6 @@ from connection_hub.domain.exceptions import (
 )
 
 
-_LOBBY_TO_MAX_PLAYERS_MAP: Final = {
-    ConnectFourLobby: 2,
-}
-
-
 class JoinLobby:
     def __call__(
         self,
@@ -29,7 +22,7 @@ class JoinLobby:
         current_user_id: UserId,
         password: str | None,
     ) -> None:
-        max_players = _LOBBY_TO_MAX_PLAYERS_MAP[type(lobby)]
+        max_players = LOBBY_TO_MAX_PLAYERS_MAP[type(lobby)]
         if len(lobby.users) == max_players:
             raise UserLimitReachedError()
 
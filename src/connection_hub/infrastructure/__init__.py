@@ -7,6 +7,7 @@ from .common_retort import *
 from .operation_id import *
 from .log import *
 from .redis_config import *
+from .timeout_policy import *
 from .clients import *
 from .database import *
 from .scheduling import *
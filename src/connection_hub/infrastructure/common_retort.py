@@ -2,13 +2,21 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("CommonRetort", "common_retort_factory")
+__all__ = (
+    "CommonRetort",
+    "common_retort_factory",
+    "Converters",
+    "converters_factory",
+)
 
 from datetime import timedelta
-from typing import NewType
+from typing import Any, Callable, Iterable, NewType, TypeAliasType, get_args
 
 from adaptix import Retort, loader, dumper
 
+from connection_hub.domain import Lobby, Game
+from connection_hub.application import Event
+
 
 CommonRetort = NewType("CommonRetort", Retort)  # type: ignore
 
@@ -30,3 +38,61 @@ def common_retort_factory() -> CommonRetort:
     retort = Retort(recipe=recipe)
 
     return CommonRetort(retort)
+
+
+def converters_factory(common_retort: CommonRetort) -> "Converters":
+    """
+    Returns converters with loaders and dumpers of every
+    lobby, game and event type built in advance.
+    """
+    types = [
+        *_alias_members(Lobby),
+        *_alias_members(Game),
+        *_alias_members(Event),
+    ]
+    return Converters(common_retort=common_retort, types=types)
+
+
+class Converters:
+    """
+    Holds loaders and dumpers built by the common retort,
+    so that types converted on every request do not require
+    a retort lookup on each call.
+    """
+
+    __slots__ = ("_common_retort", "_loaders", "_dumpers")
+
+    def __init__(
+        self,
+        *,
+        common_retort: CommonRetort,
+        types: Iterable[type],
+    ):
+        self._common_retort = common_retort
+        self._loaders: dict[type, Callable[[Any], Any]] = {}
+        self._dumpers: dict[type, Callable[[Any], Any]] = {}
+
+        for type_ in types:
+            self._loaders[type_] = common_retort.get_loader(type_)
+            self._dumpers[type_] = common_retort.get_dumper(type_)
+
+    def loader[T](self, type_: type[T]) -> Callable[[Any], T]:
+        loader_ = self._loaders.get(type_)
+        if not loader_:
+            loader_ = self._common_retort.get_loader(type_)
+            self._loaders[type_] = loader_
+
+        return loader_
+
+    def dumper[T](self, type_: type[T]) -> Callable[[T], Any]:
+        dumper_ = self._dumpers.get(type_)
+        if not dumper_:
+            dumper_ = self._common_retort.get_dumper(type_)
+            self._dumpers[type_] = dumper_
+
+        return dumper_
+
+
+def _alias_members(type_alias: TypeAliasType) -> tuple[type, ...]:
+    value = type_alias.__value__
+    return get_args(value) or (value,)
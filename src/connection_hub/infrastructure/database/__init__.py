@@ -2,7 +2,16 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
+from .exceptions import *
 from .redis_ import *
+from .replicas import *
+from .near_cache import *
+from .codec import *
 from .data_mappers import *
 from .lock_manager import *
+from .concurrency import *
 from .transaction_manager import *
+from .storage_migrator import *
+from .reaper import *
+from .matchmaking_queue import *
+from .presence_tracker import *
@@ -0,0 +1,336 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "StorageFormat",
+    "EntityCodecConfig",
+    "load_entity_codec_config",
+    "EntityCodec",
+)
+
+import json
+import re
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from enum import StrEnum
+from typing import Any, Callable, Final
+
+from connection_hub.infrastructure.utils import get_env_var
+
+
+# Values encoded with the binary format start with a header,
+# consisting of the format version and the entity version.
+# JSON values always start with `{`, so they cannot be
+# confused with them.
+_BINARY_FORMAT_VERSION: Final = 1
+_BINARY_HEADER: Final = struct.Struct(">BI")
+
+# Tags preceding every value in the binary format.
+_NONE_TAG: Final = 0
+_FALSE_TAG: Final = 1
+_TRUE_TAG: Final = 2
+_INT_TAG: Final = 3
+_FLOAT_TAG: Final = 4
+_SHORT_STR_TAG: Final = 5
+_STR_TAG: Final = 6
+_UUID_TAG: Final = 7
+_LIST_TAG: Final = 8
+_DICT_TAG: Final = 9
+
+# Layouts of tags together with values or lengths following
+# them, so that both are packed with a single call.
+_LENGTH: Final = struct.Struct(">BI")
+_SHORT_LENGTH: Final = struct.Struct(">BB")
+_INT: Final = struct.Struct(">Bq")
+_FLOAT: Final = struct.Struct(">Bd")
+
+_LENGTH_VALUE: Final = struct.Struct(">I")
+_INT_VALUE: Final = struct.Struct(">q")
+_FLOAT_VALUE: Final = struct.Struct(">d")
+
+_STR_CACHE_SIZE: Final = 4096
+
+# Canonical form of UUIDs, which they are dumped in.
+_UUID_PATTERN: Final = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+)
+
+
+def load_entity_codec_config() -> "EntityCodecConfig":
+    return EntityCodecConfig(
+        storage_format=get_env_var(
+            key="STORAGE_FORMAT",
+            value_factory=StorageFormat,
+            default=StorageFormat.JSON,
+        ),
+    )
+
+
+class StorageFormat(StrEnum):
+    JSON = "json"
+    BINARY = "binary"
+
+
+@dataclass(frozen=True, slots=True)
+class EntityCodecConfig:
+    # Format, which entities are written with. Entities
+    # are read regardless of the format they were written
+    # with, so it can be changed without migrating them.
+    storage_format: StorageFormat = StorageFormat.JSON
+
+
+class EntityCodec:
+    """
+    Converts dicts, representing entities, together with
+    their versions to values stored in redis and back.
+    """
+
+    __slots__ = ("_config",)
+
+    def __init__(self, config: EntityCodecConfig):
+        self._config = config
+
+    def encode(self, data: dict, *, version: int) -> str | bytes:
+        if self._config.storage_format == StorageFormat.BINARY:
+            buffer = bytearray(
+                _BINARY_HEADER.pack(_BINARY_FORMAT_VERSION, version),
+            )
+            _encode_value(data, buffer)
+            return bytes(buffer)
+
+        return json.dumps({**data, "version": version})
+
+    def decode(self, value: str | bytes) -> tuple[dict, int]:
+        """
+        Returns an entity as a dict and its version. Entities
+        written before versioning was introduced have
+        version 0.
+        """
+        if isinstance(value, str):
+            # Redis client decodes responses with the
+            # `surrogateescape` error handler, so arbitrary
+            # bytes can be restored.
+            value = value.encode("utf-8", "surrogateescape")
+
+        if value[:1] == bytes([_BINARY_FORMAT_VERSION]):
+            _, version = _BINARY_HEADER.unpack_from(value)
+            data, _ = _decode_value(value, _BINARY_HEADER.size)
+            return data, version  # type: ignore[return-value]
+
+        data = json.loads(value)
+        version = data.pop("version", 0)
+
+        return data, version
+
+    def encode_field(self, value: object) -> str | bytes:
+        """
+        Encodes a value of a single field of an entity stored
+        as a hash.
+        """
+        if self._config.storage_format == StorageFormat.BINARY:
+            buffer = bytearray([_BINARY_FORMAT_VERSION])
+            _encode_value(value, buffer)
+            return bytes(buffer)
+
+        return json.dumps(value)
+
+    def decode_field(self, value: str | bytes) -> object:
+        if isinstance(value, str):
+            value = value.encode("utf-8", "surrogateescape")
+
+        if value[:1] == bytes([_BINARY_FORMAT_VERSION]):
+            field_value, _ = _decode_value(value, 1)
+            return field_value
+
+        return json.loads(value)
+
+
+def _encode_value(value: object, buffer: bytearray) -> None:
+    """
+    Appends a JSON-compatible value to the buffer. Strings,
+    representing UUIDs in their canonical form, are stored
+    as 16 raw bytes.
+    """
+    _ENCODERS[type(value)](value, buffer)
+
+
+def _encode_none(value: None, buffer: bytearray) -> None:
+    buffer.append(_NONE_TAG)
+
+
+def _encode_bool(value: bool, buffer: bytearray) -> None:
+    buffer.append(_TRUE_TAG if value else _FALSE_TAG)
+
+
+def _encode_int(value: int, buffer: bytearray) -> None:
+    buffer += _INT.pack(_INT_TAG, value)
+
+
+def _encode_float(value: float, buffer: bytearray) -> None:
+    buffer += _FLOAT.pack(_FLOAT_TAG, value)
+
+
+def _encode_str(value: str, buffer: bytearray) -> None:
+    buffer += _encoded_str(value)
+
+
+# Field names, statuses and ids of hot entities are encoded
+# over and over again.
+@lru_cache(maxsize=_STR_CACHE_SIZE)
+def _encoded_str(value: str) -> bytes:
+    if len(value) == 36 and _UUID_PATTERN.fullmatch(value):
+        return bytes([_UUID_TAG]) + bytes.fromhex(value.replace("-", ""))
+
+    encoded_value = value.encode()
+    if len(encoded_value) <= 0xFF:
+        header = _SHORT_LENGTH.pack(_SHORT_STR_TAG, len(encoded_value))
+    else:
+        header = _LENGTH.pack(_STR_TAG, len(encoded_value))
+
+    return header + encoded_value
+
+
+def _encode_list(value: list, buffer: bytearray) -> None:
+    buffer += _LENGTH.pack(_LIST_TAG, len(value))
+    for item in value:
+        _ENCODERS[type(item)](item, buffer)
+
+
+def _encode_dict(value: dict, buffer: bytearray) -> None:
+    buffer += _LENGTH.pack(_DICT_TAG, len(value))
+    for key, item in value.items():
+        _ENCODERS[type(key)](key, buffer)
+        _ENCODERS[type(item)](item, buffer)
+
+
+class _Encoders(dict[type, Callable[[Any, bytearray], None]]):
+    """
+    Encoders by exact types of values. Encoders of subclasses,
+    such as string enums, are looked up on first use.
+    """
+
+    def __missing__(
+        self,
+        type_: type,
+    ) -> Callable[[Any, bytearray], None]:
+        for base in type_.__mro__[1:]:
+            encoder = self.get(base)
+            if encoder:
+                self[type_] = encoder
+                return encoder
+
+        raise Exception(f"Cannot encode value of type {type_.__name__}.")
+
+
+_ENCODERS: Final = _Encoders(
+    {
+        type(None): _encode_none,
+        bool: _encode_bool,
+        int: _encode_int,
+        float: _encode_float,
+        str: _encode_str,
+        list: _encode_list,
+        dict: _encode_dict,
+    },
+)
+
+
+def _decode_value(data: bytes, offset: int) -> tuple[object, int]:
+    """
+    Returns a value starting at the offset and the offset
+    of the next value.
+    """
+    tag = data[offset]
+    if tag >= len(_DECODERS):
+        raise Exception(f"Cannot decode value with unknown tag {tag}.")
+
+    return _DECODERS[tag](data, offset + 1)
+
+
+def _decode_none(data: bytes, offset: int) -> tuple[None, int]:
+    return None, offset
+
+
+def _decode_false(data: bytes, offset: int) -> tuple[bool, int]:
+    return False, offset
+
+
+def _decode_true(data: bytes, offset: int) -> tuple[bool, int]:
+    return True, offset
+
+
+def _decode_int(data: bytes, offset: int) -> tuple[int, int]:
+    (int_,) = _INT_VALUE.unpack_from(data, offset)
+    return int_, offset + _INT_VALUE.size
+
+
+def _decode_float(data: bytes, offset: int) -> tuple[float, int]:
+    (float_,) = _FLOAT_VALUE.unpack_from(data, offset)
+    return float_, offset + _FLOAT_VALUE.size
+
+
+def _decode_short_str(data: bytes, offset: int) -> tuple[str, int]:
+    end = offset + 1 + data[offset]
+    return _decoded_str(data[offset + 1 : end]), end
+
+
+def _decode_str(data: bytes, offset: int) -> tuple[str, int]:
+    (length,) = _LENGTH_VALUE.unpack_from(data, offset)
+    offset += _LENGTH_VALUE.size
+    return data[offset : offset + length].decode(), offset + length
+
+
+def _decode_uuid(data: bytes, offset: int) -> tuple[str, int]:
+    return _decoded_uuid(data[offset : offset + 16]), offset + 16
+
+
+@lru_cache(maxsize=_STR_CACHE_SIZE)
+def _decoded_str(value: bytes) -> str:
+    return value.decode()
+
+
+@lru_cache(maxsize=_STR_CACHE_SIZE)
+def _decoded_uuid(value: bytes) -> str:
+    hex_ = value.hex()
+    return f"{hex_[:8]}-{hex_[8:12]}-{hex_[12:16]}-{hex_[16:20]}-{hex_[20:]}"
+
+
+def _decode_list(data: bytes, offset: int) -> tuple[list, int]:
+    (length,) = _LENGTH_VALUE.unpack_from(data, offset)
+    offset += _LENGTH_VALUE.size
+
+    list_ = []
+    for _ in range(length):
+        item, offset = _DECODERS[data[offset]](data, offset + 1)
+        list_.append(item)
+
+    return list_, offset
+
+
+def _decode_dict(data: bytes, offset: int) -> tuple[dict, int]:
+    (length,) = _LENGTH_VALUE.unpack_from(data, offset)
+    offset += _LENGTH_VALUE.size
+
+    dict_ = {}
+    for _ in range(length):
+        key, offset = _DECODERS[data[offset]](data, offset + 1)
+        dict_[key], offset = _DECODERS[data[offset]](data, offset + 1)
+
+    return dict_, offset
+
+
+# Indexed by tags.
+_DECODERS: Final[tuple[Callable[[bytes, int], tuple[Any, int]], ...]] = (
+    _decode_none,
+    _decode_false,
+    _decode_true,
+    _decode_int,
+    _decode_float,
+    _decode_short_str,
+    _decode_str,
+    _decode_uuid,
+    _decode_list,
+    _decode_dict,
+)
@@ -0,0 +1,66 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "ConcurrencyMode",
+    "load_concurrency_mode",
+    "VersionTracker",
+)
+
+from enum import StrEnum
+from typing import Mapping
+
+from connection_hub.infrastructure.utils import get_env_var
+
+
+def load_concurrency_mode() -> "ConcurrencyMode":
+    return get_env_var(
+        key="CONCURRENCY_MODE",
+        value_factory=ConcurrencyMode,
+        default=ConcurrencyMode.PESSIMISTIC,
+    )
+
+
+class ConcurrencyMode(StrEnum):
+    # Entities loaded with `acquire=True` are locked
+    # until the transaction is completed.
+    PESSIMISTIC = "pessimistic"
+
+    # Entities are not locked. Instead, the transaction is
+    # committed only if versions of entities it changes are
+    # the same as they were when the entities were loaded.
+    OPTIMISTIC = "optimistic"
+
+
+class VersionTracker:
+    """
+    Collects versions, which entities are expected to have
+    at the moment of committing the current transaction.
+    """
+
+    __slots__ = ("_expected_versions",)
+
+    def __init__(self):
+        self._expected_versions: dict[str, int] = {}
+
+    @property
+    def expected_versions(self) -> Mapping[str, int]:
+        """
+        Returns keys of entities mapped to their
+        expected versions.
+        """
+        return self._expected_versions
+
+    def expect(self, key: str, version: int) -> None:
+        """
+        Records that an entity with the provided key must have
+        the provided version. Version 0 means that the entity
+        either does not exist or was written before versioning
+        was introduced. If the entity is already tracked, its
+        first recorded version is kept.
+        """
+        self._expected_versions.setdefault(key, version)
+
+    def clear(self) -> None:
+        self._expected_versions.clear()
@@ -0,0 +1,748 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("EntityMapper",)
+
+from datetime import timedelta
+from typing import ClassVar, Iterable
+from uuid import UUID
+
+from redis.asyncio.client import Redis, Pipeline
+
+from connection_hub.domain import UserId
+from connection_hub.infrastructure.database.lock_manager import LockManager
+from connection_hub.infrastructure.database.near_cache import NearCache
+from connection_hub.infrastructure.database.codec import EntityCodec
+from connection_hub.infrastructure.database.scripts import (
+    GET_ENTITY_SCRIPT,
+    GET_ENTITIES_SCRIPT,
+    DELETE_INDEX_ENTRIES_SCRIPT,
+)
+from connection_hub.infrastructure.database.concurrency import (
+    ConcurrencyMode,
+    VersionTracker,
+)
+from connection_hub.infrastructure.database.keys import id_from_index_value
+from connection_hub.infrastructure.common_retort import Converters
+
+
+class EntityMapper[EntityIdT: UUID, EntityT]:
+    """
+    Persistence shared by mappers of lobbies and games.
+
+    Each entity is stored under its own key and has an index
+    entry per participant pointing to the entity id. Entities
+    are stored either as strings or as hashes with the `data`
+    field, containing everything except participants, and a
+    field per participant.
+
+    Everything, which is loaded into the identity map and
+    can therefore decide what is written, is read from the
+    primary. Index entries are deleted only if they still
+    point at the entity, since a participant may have moved
+    to another entity since the entity was loaded.
+
+    Subclasses define keys, conversions and what entities
+    and their participants are.
+    """
+
+    # Key of participants in dumped entities, also used as
+    # a prefix of fields of participants in hashes.
+    _participants_field: ClassVar[str]
+
+    __slots__ = (
+        "_redis",
+        "_redis_pipeline",
+        "_near_cache",
+        "_converters",
+        "_codec",
+        "_lock_manager",
+        "_version_tracker",
+        "_expires_in",
+        "_legacy_reads_enabled",
+        "_locking_enabled",
+        "_hash_storage_enabled",
+        "_get_entity_script",
+        "_get_entities_script",
+        "_delete_index_entries_script",
+        "_loaded_participant_ids",
+        "_loaded_versions",
+        "_loaded_hash_fields",
+        "_legacy_keys",
+        "_identity_map",
+        "_entity_ids_by_participant",
+    )
+
+    def __init__(
+        self,
+        redis: Redis,
+        redis_pipeline: Pipeline,
+        near_cache: NearCache,
+        converters: Converters,
+        codec: EntityCodec,
+        lock_manager: LockManager,
+        version_tracker: VersionTracker,
+        *,
+        expires_in: timedelta,
+        legacy_reads_enabled: bool,
+        concurrency_mode: ConcurrencyMode,
+        hash_storage_enabled: bool,
+    ):
+        self._redis = redis
+        self._redis_pipeline = redis_pipeline
+        self._near_cache = near_cache
+        self._converters = converters
+        self._codec = codec
+        self._lock_manager = lock_manager
+        self._version_tracker = version_tracker
+        self._expires_in = expires_in
+        self._legacy_reads_enabled = legacy_reads_enabled
+        self._locking_enabled = concurrency_mode == ConcurrencyMode.PESSIMISTIC
+        self._hash_storage_enabled = hash_storage_enabled
+        self._get_entity_script = redis.register_script(GET_ENTITY_SCRIPT)
+        self._get_entities_script = redis.register_script(
+            GET_ENTITIES_SCRIPT,
+        )
+        self._delete_index_entries_script = redis.register_script(
+            DELETE_INDEX_ENTRIES_SCRIPT,
+        )
+
+        # Ids of participants of entities as they were loaded,
+        # used to find index entries to delete on update.
+        self._loaded_participant_ids: dict[EntityIdT, set[UserId]] = {}
+
+        # Versions of entities as they were loaded.
+        self._loaded_versions: dict[EntityIdT, int] = {}
+
+        # Dumped participants of entities stored as hashes as
+        # they were loaded, used to find fields to write on
+        # update.
+        self._loaded_hash_fields: dict[EntityIdT, dict[str, object]] = {}
+
+        # Keys of entities loaded from the legacy layout,
+        # which must be deleted once entities are written
+        # with the current one.
+        self._legacy_keys: dict[EntityIdT, str] = {}
+
+        # Entities loaded or written within the current request
+        # and ids of entities of their participants, including
+        # lookups, which have found nothing.
+        self._identity_map: dict[EntityIdT, EntityT | None] = {}
+        self._entity_ids_by_participant: dict[UserId, EntityIdT | None] = {}
+
+    async def _by_id(
+        self,
+        entity_id: EntityIdT,
+        *,
+        acquire: bool = False,
+    ) -> EntityT | None:
+        key = self._key_factory(entity_id)
+        lock_required = (
+            acquire
+            and self._locking_enabled
+            and not self._lock_manager.is_held(key)
+        )
+
+        if entity_id in self._identity_map and not lock_required:
+            return self._identity_map[entity_id]
+
+        if lock_required:
+            encoded_entity = await self._lock_manager.acquire_and_get(
+                lock_id=key,
+                key=key,
+            )
+        else:
+            encoded_entity = await self._get_entity(key, acquire=acquire)
+
+        if encoded_entity:
+            return self._load(encoded_entity)
+
+        entity = None
+        if self._legacy_reads_enabled:
+            entity = await self._legacy_by_id(entity_id, acquire=acquire)
+
+        if not entity:
+            self._identity_map[entity_id] = None
+
+        return entity
+
+    async def _by_ids(
+        self,
+        entity_ids: Iterable[EntityIdT],
+        *,
+        acquire: bool = False,
+    ) -> list[EntityT]:
+        entity_ids = list(dict.fromkeys(entity_ids))
+
+        if acquire and self._locking_enabled:
+            # Locks are acquired in the same order by every
+            # transaction, so that they cannot deadlock.
+            for entity_id in sorted(entity_ids):
+                await self._by_id(entity_id, acquire=True)
+        else:
+            await self._load_many(
+                [
+                    entity_id
+                    for entity_id in entity_ids
+                    if entity_id not in self._identity_map
+                ],
+            )
+
+        entities = []
+        for entity_id in entity_ids:
+            entity = self._identity_map.get(entity_id)
+            if entity:
+                entities.append(entity)
+
+        return entities
+
+    async def _update(self, entity: EntityT) -> None:
+        entity_id = self._id_of(entity)
+        key = self._key_factory(entity_id)
+        old_participant_ids = await self._old_participant_ids(entity_id)
+
+        old_version = self._loaded_versions.get(entity_id, 0)
+        if not self._locking_enabled:
+            self._version_tracker.expect(key, old_version)
+
+        legacy_key = self._legacy_keys.pop(entity_id, None)
+        if legacy_key:
+            self._redis_pipeline.delete(legacy_key)
+
+        # Expiration time of the entity and its index entries
+        # is refreshed on every update, so that entities in use
+        # never expire, and abandoned ones always do.
+        self._write(entity, version=old_version + 1)
+
+        participant_ids = set(self._participant_ids_of(entity))
+        removed_participant_ids = old_participant_ids - participant_ids
+        await self._delete_index_entries(
+            dict.fromkeys(removed_participant_ids, entity_id),
+        )
+        self._set_indexes(entity)
+        self._after_write([entity])
+
+        self._loaded_participant_ids[entity_id] = participant_ids
+        self._loaded_versions[entity_id] = old_version + 1
+        for participant_id in removed_participant_ids:
+            self._entity_ids_by_participant[participant_id] = None
+        self._remember(entity)
+
+    async def _save_many(self, entities: Iterable[EntityT]) -> None:
+        entities = list(entities)
+
+        for entity in entities:
+            entity_id = self._id_of(entity)
+
+            # New entities are always written as a whole.
+            self._loaded_hash_fields.pop(entity_id, None)
+            self._write(entity, version=1)
+            self._set_indexes(entity)
+
+            self._loaded_participant_ids[entity_id] = set(
+                self._participant_ids_of(entity),
+            )
+            self._loaded_versions[entity_id] = 1
+            self._remember(entity)
+
+        self._after_write(entities)
+
+    async def _delete_many(self, entities: Iterable[EntityT]) -> None:
+        entities = list(entities)
+        entity_ids = list(map(self._id_of, entities))
+
+        # Entities, participants of which are unknown, are
+        # loaded with a single request instead of one request
+        # per entity.
+        await self._load_many(
+            [
+                entity_id
+                for entity_id in entity_ids
+                if entity_id not in self._loaded_participant_ids
+            ],
+        )
+
+        # Entities are deleted with a single command, and so
+        # are their index entries.
+        keys_to_delete = []
+        index_entries: dict[UserId, EntityIdT] = {}
+        for entity, entity_id in zip(entities, entity_ids, strict=True):
+            key = self._key_factory(entity_id)
+            if not self._locking_enabled:
+                self._version_tracker.expect(
+                    key,
+                    self._loaded_versions.get(entity_id, 0),
+                )
+
+            keys_to_delete.append(key)
+
+            legacy_key = self._legacy_keys.pop(entity_id, None)
+            if legacy_key:
+                keys_to_delete.append(legacy_key)
+
+            participant_ids = self._loaded_participant_ids.get(
+                entity_id,
+                set(),
+            ).union(self._participant_ids_of(entity))
+            for participant_id in participant_ids:
+                index_entries[participant_id] = entity_id
+                self._entity_ids_by_participant[participant_id] = None
+
+            self._loaded_participant_ids.pop(entity_id, None)
+            self._loaded_versions.pop(entity_id, None)
+            self._loaded_hash_fields.pop(entity_id, None)
+            self._identity_map[entity_id] = None
+
+        if keys_to_delete:
+            self._redis_pipeline.delete(*keys_to_delete)
+        await self._delete_index_entries(index_entries)
+        self._after_delete(entity_ids)
+
+    async def _by_participant_id(
+        self,
+        participant_id: UserId,
+        *,
+        acquire: bool,
+    ) -> EntityT | None:
+        cached = participant_id in self._entity_ids_by_participant
+        if cached:
+            entity_id = self._entity_ids_by_participant[participant_id]
+        else:
+            entity_id = await self._entity_id_by_participant_id(
+                participant_id,
+            )
+
+        entity = None
+        if entity_id:
+            entity = await self._by_id(entity_id, acquire=acquire)
+        elif not cached and self._legacy_reads_enabled:
+            pattern = self._legacy_key_pattern_factory(
+                participant_id=participant_id,
+            )
+            entity = await self._legacy_by_pattern(pattern, acquire=acquire)
+
+        if entity and participant_id in self._participant_ids_of(entity):
+            return entity
+
+        self._entity_ids_by_participant[participant_id] = None
+        return None
+
+    async def _by_participant_ids(
+        self,
+        participant_ids: Iterable[UserId],
+        *,
+        acquire: bool,
+    ) -> list[EntityT]:
+        participant_ids = list(dict.fromkeys(participant_ids))
+        uncached_participant_ids = [
+            participant_id
+            for participant_id in participant_ids
+            if participant_id not in self._entity_ids_by_participant
+        ]
+        if uncached_participant_ids:
+            await self._entity_ids_by_participant_ids(
+                uncached_participant_ids,
+                acquire=acquire,
+            )
+
+        entity_ids = []
+        for participant_id in participant_ids:
+            entity_id = self._entity_ids_by_participant[participant_id]
+            if entity_id:
+                entity_ids.append(entity_id)
+        await self._by_ids(entity_ids, acquire=acquire)
+
+        entities: dict[EntityIdT, EntityT] = {}
+        for participant_id in participant_ids:
+            entity_id = self._entity_ids_by_participant[participant_id]
+            entity = self._identity_map.get(entity_id) if entity_id else None
+
+            if entity and participant_id in self._participant_ids_of(entity):
+                entities[self._id_of(entity)] = entity
+            else:
+                self._entity_ids_by_participant[participant_id] = None
+
+        return list(entities.values())
+
+    def _load(self, encoded_entity: str | list[str]) -> EntityT:
+        entity, version, dumped_participants = self._decode(encoded_entity)
+        entity_id = self._id_of(entity)
+        self._loaded_participant_ids[entity_id] = set(
+            self._participant_ids_of(entity),
+        )
+        self._loaded_versions[entity_id] = version
+        if dumped_participants is not None:
+            self._loaded_hash_fields[entity_id] = dumped_participants
+        self._remember(entity)
+
+        return entity
+
+    def _decode(
+        self,
+        encoded_entity: str | list[str],
+    ) -> tuple[EntityT, int, dict[str, object] | None]:
+        """
+        Returns an entity, its version and its dumped
+        participants, if it has been stored as a hash.
+        """
+        if isinstance(encoded_entity, list):
+            return self._decode_hash(encoded_entity)
+
+        entity_as_dict, version = self._codec.decode(encoded_entity)
+        return self._dict_to_entity(entity_as_dict), version, None
+
+    def _decode_hash(
+        self,
+        fields_and_values: list[str],
+    ) -> tuple[EntityT, int, dict[str, object]]:
+        fields = dict(
+            zip(
+                fields_and_values[::2],
+                fields_and_values[1::2],
+                strict=True,
+            ),
+        )
+        entity_as_dict, version = self._codec.decode(fields.pop("data"))
+
+        field_prefix = f"{self._participants_field}:"
+        dumped_participants = {}
+        for field, value in fields.items():
+            participant_id = field.removeprefix(field_prefix)
+            dumped_participants[participant_id] = self._codec.decode_field(
+                value,
+            )
+        entity_as_dict[self._participants_field] = dumped_participants
+
+        entity = self._dict_to_entity(entity_as_dict)
+        return entity, version, dumped_participants
+
+    def _remember(self, entity: EntityT) -> None:
+        entity_id = self._id_of(entity)
+        self._identity_map[entity_id] = entity
+        for participant_id in self._participant_ids_of(entity):
+            self._entity_ids_by_participant[participant_id] = entity_id
+
+    def _write(self, entity: EntityT, *, version: int) -> None:
+        if self._hash_storage_enabled:
+            self._write_hash(entity, version=version)
+            return
+
+        entity_id = self._id_of(entity)
+        self._loaded_hash_fields.pop(entity_id, None)
+        self._redis_pipeline.set(
+            name=self._key_factory(entity_id),
+            value=self._codec.encode(
+                self._entity_to_dict(entity),
+                version=version,
+            ),
+            ex=self._expires_in,
+        )
+
+    def _write_hash(self, entity: EntityT, *, version: int) -> None:
+        """
+        Writes the entity as a hash. If the entity has been
+        loaded as a hash, only changed participants are
+        written, otherwise the entity is written entirely.
+        """
+        entity_id = self._id_of(entity)
+        key = self._key_factory(entity_id)
+
+        entity_as_dict = self._entity_to_dict(entity)
+        dumped_participants = entity_as_dict.pop(self._participants_field)
+        fields = {"data": self._codec.encode(entity_as_dict, version=version)}
+
+        old_dumped_participants = self._loaded_hash_fields.get(entity_id)
+        if old_dumped_participants is None:
+            self._redis_pipeline.delete(key)
+            old_dumped_participants = {}
+
+        for participant_id, value in dumped_participants.items():
+            if old_dumped_participants.get(participant_id) != value:
+                field = f"{self._participants_field}:{participant_id}"
+                fields[field] = self._codec.encode_field(value)
+        self._redis_pipeline.hset(key, mapping=fields)  # type: ignore
+        self._redis_pipeline.expire(name=key, time=self._expires_in)
+
+        removed_participant_ids = (
+            old_dumped_participants.keys() - dumped_participants.keys()
+        )
+        if removed_participant_ids:
+            self._redis_pipeline.hdel(
+                key,
+                *(
+                    f"{self._participants_field}:{participant_id}"
+                    for participant_id in removed_participant_ids
+                ),
+            )
+
+        self._loaded_hash_fields[entity_id] = dumped_participants
+
+    async def _get_entity(
+        self,
+        key: str,
+        *,
+        acquire: bool,
+    ) -> str | list[str] | None:
+        """
+        Returns an entity with `key` without locking it.
+        Entities, which are not acquired, are read through
+        the near cache, when it is active.
+        """
+        if acquire or not self._near_cache.active:
+            return await self._get_entity_script(keys=[key])
+
+        encoded_entity = self._near_cache.get(key)
+        if encoded_entity is not None:
+            return encoded_entity  # type: ignore[return-value]
+
+        epoch = self._near_cache.epoch()
+        encoded_entity = await self._get_entity_script(keys=[key])
+        if encoded_entity:
+            self._near_cache.put(key, encoded_entity, epoch=epoch)
+
+        return encoded_entity
+
+    async def _load_many(self, entity_ids: list[EntityIdT]) -> None:
+        """
+        Loads entities with specified `entity_ids` into the
+        identity map without locking them.
+        """
+        if not entity_ids:
+            return
+
+        encoded_entities = await self._get_entities_script(
+            keys=list(map(self._key_factory, entity_ids)),
+        )
+
+        for entity_id, encoded_entity in zip(
+            entity_ids,
+            encoded_entities,
+            strict=True,
+        ):
+            if encoded_entity:
+                self._load(encoded_entity)
+                continue
+
+            entity = None
+            if self._legacy_reads_enabled:
+                entity = await self._legacy_by_id(entity_id, acquire=False)
+
+            if not entity:
+                self._identity_map[entity_id] = None
+
+    async def _peek_many(
+        self,
+        entity_ids: list[EntityIdT],
+        *,
+        redis: Redis,
+    ) -> list[EntityT]:
+        """
+        Returns entities with specified `entity_ids`, skipping
+        missing ones, without loading them into the identity
+        map, so that `redis` may be a replica. Entities stored
+        with the legacy layout are not searched for.
+        """
+        if not entity_ids:
+            return []
+
+        encoded_entities = await self._get_entities_script(
+            keys=list(map(self._key_factory, entity_ids)),
+            client=redis,
+        )
+        return [
+            self._decode(encoded_entity)[0]
+            for encoded_entity in encoded_entities
+            if encoded_entity
+        ]
+
+    async def _entity_ids_by_participant_ids(
+        self,
+        participant_ids: list[UserId],
+        *,
+        acquire: bool,
+    ) -> None:
+        """
+        Reads index entries of participants with specified
+        `participant_ids` with a single request and caches
+        ids of their entities.
+        """
+        index_values = await self._redis.mget(  # type: ignore
+            list(map(self._index_key_factory, participant_ids)),
+        )
+
+        for participant_id, index_value in zip(
+            participant_ids,
+            index_values,
+            strict=True,
+        ):
+            if index_value:
+                self._entity_ids_by_participant[participant_id] = (
+                    self._entity_id_factory(id_from_index_value(index_value))
+                )
+            elif self._legacy_reads_enabled:
+                await self._by_participant_id(participant_id, acquire=acquire)
+            else:
+                self._entity_ids_by_participant[participant_id] = None
+
+    async def _entity_id_by_participant_id(
+        self,
+        participant_id: UserId,
+    ) -> EntityIdT | None:
+        index_value = await self._redis.get(  # type: ignore
+            self._index_key_factory(participant_id),
+        )
+        if not index_value:
+            return None
+
+        return self._entity_id_factory(id_from_index_value(index_value))
+
+    async def _old_participant_ids(self, entity_id: EntityIdT) -> set[UserId]:
+        """
+        Returns ids of participants of the entity as it was
+        loaded. If the entity has not been loaded through this
+        mapper, they are read from redis.
+        """
+        participant_ids = self._loaded_participant_ids.get(entity_id)
+        if participant_ids is not None:
+            return participant_ids
+
+        encoded_entity = await self._get_entity_script(
+            keys=[self._key_factory(entity_id)],
+        )
+        if encoded_entity:
+            return set(self._participant_ids_of(self._load(encoded_entity)))
+
+        return set()
+
+    def _set_indexes(self, entity: EntityT) -> None:
+        entity_id = self._id_of(entity)
+        for participant_id in self._participant_ids_of(entity):
+            self._redis_pipeline.set(
+                name=self._index_key_factory(participant_id),
+                value=entity_id.hex,
+                ex=self._expires_in,
+            )
+
+    async def _delete_index_entries(
+        self,
+        entity_ids_by_participant: dict[UserId, EntityIdT],
+    ) -> None:
+        if not entity_ids_by_participant:
+            return
+
+        await self._delete_index_entries_script(
+            keys=list(
+                map(self._index_key_factory, entity_ids_by_participant),
+            ),
+            args=[
+                entity_id.hex
+                for entity_id in entity_ids_by_participant.values()
+            ],
+            client=self._redis_pipeline,
+        )
+
+    async def _legacy_by_id(
+        self,
+        entity_id: EntityIdT,
+        *,
+        acquire: bool,
+    ) -> EntityT | None:
+        pattern = self._legacy_key_pattern_factory(entity_id=entity_id)
+        return await self._legacy_by_pattern(pattern, acquire=acquire)
+
+    async def _legacy_by_pattern(
+        self,
+        pattern: str,
+        *,
+        acquire: bool,
+    ) -> EntityT | None:
+        keys = await self._keys_by_pattern(pattern=pattern, limit=1)
+        if not keys:
+            return None
+
+        entity_id, _ = self._parse_legacy_key(keys[0])
+        if acquire and self._locking_enabled:
+            await self._lock_manager.acquire(self._key_factory(entity_id))
+
+        encoded_entity = await self._get_entity_script(keys=[keys[0]])
+        if not encoded_entity:
+            return None
+
+        self._legacy_keys[entity_id] = keys[0]
+        entity = self._load(encoded_entity)
+
+        # Entity is moved to its current key on update, so
+        # it is written as a whole.
+        self._loaded_hash_fields.pop(entity_id, None)
+
+        return entity
+
+    async def _keys_by_pattern(
+        self,
+        *,
+        pattern: str,
+        batch_size: int = 10,
+        limit: int | None = None,
+    ) -> list[str]:
+        keys: list[str] = []
+
+        if limit == 0:
+            return keys
+
+        async for key in self._redis.scan_iter(
+            match=pattern,
+            count=batch_size,
+        ):
+            keys.append(key)
+
+            if limit and len(keys) >= limit:
+                return keys
+
+        return keys
+
+    def _after_write(self, entities: list[EntityT]) -> None:
+        """
+        Called with entities written by a single call, so that
+        subclasses can write what else depends on them with
+        as few commands as possible.
+        """
+
+    def _after_delete(self, entity_ids: list[EntityIdT]) -> None:
+        """
+        Called with ids of entities deleted by a single call,
+        so that subclasses can delete what else depends on
+        them with as few commands as possible.
+        """
+
+    def _id_of(self, entity: EntityT) -> EntityIdT:
+        raise NotImplementedError
+
+    def _participant_ids_of(self, entity: EntityT) -> Iterable[UserId]:
+        raise NotImplementedError
+
+    def _entity_id_factory(self, raw_id: UUID) -> EntityIdT:
+        raise NotImplementedError
+
+    def _key_factory(self, entity_id: EntityIdT) -> str:
+        raise NotImplementedError
+
+    def _index_key_factory(self, participant_id: UserId) -> str:
+        raise NotImplementedError
+
+    def _legacy_key_pattern_factory(
+        self,
+        *,
+        entity_id: EntityIdT | None = None,
+        participant_id: UserId | None = None,
+    ) -> str:
+        raise NotImplementedError
+
+    def _parse_legacy_key(self, key: str) -> tuple[EntityIdT, list[UserId]]:
+        raise NotImplementedError
+
+    def _dict_to_entity(self, dict_: dict) -> EntityT:
+        raise NotImplementedError
+
+    def _entity_to_dict(self, entity: EntityT) -> dict:
+        raise NotImplementedError
@@ -8,23 +8,37 @@ __all__ = (
     "GameMapper",
 )
 
-import json
+from enum import StrEnum
 from dataclasses import dataclass
 from datetime import timedelta
 from typing import Iterable
-from enum import StrEnum
+from uuid import UUID
 
 from redis.asyncio.client import Redis, Pipeline
 
 from connection_hub.domain import GameId, UserId, ConnectFourGame, Game
 from connection_hub.application import GameGateway
 from connection_hub.infrastructure.database.lock_manager import LockManager
-from connection_hub.infrastructure.common_retort import CommonRetort
-from connection_hub.infrastructure.utils import get_env_var, str_to_timedelta
-
-
-class _GameType(StrEnum):
-    CONNECT_FOUR = "connect_four"
+from connection_hub.infrastructure.database.near_cache import NearCache
+from connection_hub.infrastructure.database.codec import EntityCodec
+from connection_hub.infrastructure.database.concurrency import (
+    ConcurrencyMode,
+    load_concurrency_mode,
+    VersionTracker,
+)
+from connection_hub.infrastructure.database.keys import (
+    game_key_factory,
+    game_by_player_key_factory,
+    legacy_game_key_pattern_factory,
+    parse_legacy_game_key,
+)
+from connection_hub.infrastructure.common_retort import Converters
+from connection_hub.infrastructure.utils import (
+    get_env_var,
+    str_to_timedelta,
+    str_to_bool,
+)
+from .entity import EntityMapper
 
 
 def load_game_mapper_config() -> "GameMapperConfig":
@@ -34,6 +48,17 @@ def load_game_mapper_config() -> "GameMapperConfig":
             value_factory=str_to_timedelta,
             default=timedelta(days=1),
         ),
+        legacy_reads_enabled=get_env_var(
+            key="GAME_MAPPER_LEGACY_READS_ENABLED",
+            value_factory=str_to_bool,
+            default=False,
+        ),
+        concurrency_mode=load_concurrency_mode(),
+        hash_storage_enabled=get_env_var(
+            key="GAME_MAPPER_HASH_STORAGE_ENABLED",
+            value_factory=str_to_bool,
+            default=False,
+        ),
     )
 
 
@@ -41,28 +66,60 @@ def load_game_mapper_config() -> "GameMapperConfig":
 class GameMapperConfig:
     game_expires_in: timedelta
 
+    # Whether games, which are not found in the current
+    # storage layout, should be searched in the legacy one.
+    # Must be enabled while games stored by previous
+    # versions have not been migrated yet.
+    legacy_reads_enabled: bool = False
 
-class GameMapper(GameGateway):
-    __slots__ = (
-        "_redis",
-        "_redis_pipeline",
-        "_common_retort",
-        "_lock_manager",
-        "_config",
-    )
+    concurrency_mode: ConcurrencyMode = ConcurrencyMode.PESSIMISTIC
+
+    # Whether games should be written as hashes, where each
+    # player is stored in its own field, so that only changed
+    # players are written on update. Games are read regardless
+    # of the layout they were written with.
+    hash_storage_enabled: bool = False
+
+
+class _GameType(StrEnum):
+    CONNECT_FOUR = "connect_four"
+
+
+class GameMapper(EntityMapper[GameId, Game], GameGateway):
+    """
+    Stores each game under `games:{game_id}` and maintains
+    `game_by_player:{player_id}` index entries pointing to the
+    game id. Hashes of games have `players:{player_id}` fields.
+    """
+
+    _participants_field = "players"
+
+    __slots__ = ("_config",)
 
     def __init__(
         self,
         redis: Redis,
         redis_pipeline: Pipeline,
-        common_retort: CommonRetort,
+        near_cache: NearCache,
+        converters: Converters,
+        codec: EntityCodec,
         lock_manager: LockManager,
+        version_tracker: VersionTracker,
         config: GameMapperConfig,
     ):
-        self._redis = redis
-        self._redis_pipeline = redis_pipeline
-        self._common_retort = common_retort
-        self._lock_manager = lock_manager
+        super().__init__(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            near_cache=near_cache,
+            converters=converters,
+            codec=codec,
+            lock_manager=lock_manager,
+            version_tracker=version_tracker,
+            expires_in=config.game_expires_in,
+            legacy_reads_enabled=config.legacy_reads_enabled,
+            concurrency_mode=config.concurrency_mode,
+            hash_storage_enabled=config.hash_storage_enabled,
+        )
         self._config = config
 
     async def by_id(
@@ -71,20 +128,7 @@ class GameMapper(GameGateway):
         *,
         acquire: bool = False,
     ) -> Game | None:
-        pattern = self._pattern_to_find_game_by_id(game_id)
-        keys = await self._keys_by_pattern(pattern=pattern, limit=1)
-        if not keys:
-            return None
-
-        if acquire:
-            await self._lock_manager.acquire(keys[0])
-
-        game_as_json = await self._redis.get(keys[0])  # type: ignore
-        if game_as_json:
-            game_as_dict = json.loads(game_as_json)
-            return self._dict_to_game(game_as_dict)
-
-        return None
+        return await self._by_id(game_id, acquire=acquire)
 
     async def by_player_id(
         self,
@@ -92,117 +136,83 @@ class GameMapper(GameGateway):
         *,
         acquire: bool = False,
     ) -> Game | None:
-        pattern = self._pattern_to_find_game_by_player_id(player_id)
-        keys = await self._keys_by_pattern(pattern=pattern, limit=1)
-        if not keys:
-            return None
+        return await self._by_participant_id(player_id, acquire=acquire)
 
-        if acquire:
-            await self._lock_manager.acquire(keys[0])
-
-        game_as_json = await self._redis.get(keys[0])  # type: ignore
-        if game_as_json:
-            game_as_dict = json.loads(game_as_json)
-            return self._dict_to_game(game_as_dict)
+    async def by_player_ids(
+        self,
+        player_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        return await self._by_participant_ids(player_ids, acquire=acquire)
 
-        return None
+    async def by_ids(
+        self,
+        game_ids: Iterable[GameId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        return await self._by_ids(game_ids, acquire=acquire)
 
     async def save(self, game: Game) -> None:
-        game_key = self._game_key_factory(
-            game_id=game.id,
-            player_ids=game.players,
-        )
-
-        game_as_dict = self._game_to_dict(game)
-        game_as_json = json.dumps(game_as_dict)
-
-        self._redis_pipeline.set(
-            name=game_key,
-            value=game_as_json,
-            ex=self._config.game_expires_in,
-        )
+        await self._save_many([game])
 
     async def update(self, game: Game) -> None:
-        # Delete an old game, because a new game might have
-        # different user ids (user ids being part of the key).
-        # This adds an extra request to redis, which could be
-        # avoided by tracking changes to game and, as a
-        # consequence, deleting it only if user ids have
-        # changed. However, this is considered overkill for now.
-        await self.delete(game)
-
-        game_key = self._game_key_factory(
-            game_id=game.id,
-            player_ids=game.players,
-        )
-
-        game_as_dict = self._game_to_dict(game)
-        game_as_json = json.dumps(game_as_dict)
-
-        self._redis_pipeline.set(game_key, game_as_json)
+        await self._update(game)
 
     async def delete(self, game: Game) -> None:
-        pattern = self._pattern_to_find_game_by_id(game.id)
-        keys = await self._redis.keys(pattern)
-        self._redis_pipeline.delete(*keys)
+        await self._delete_many([game])
 
-    def _dict_to_game(self, dict_: dict) -> Game:
-        raw_game_type = dict_.get("type")
-        if not raw_game_type:
-            raise Exception(
-                "Cannot convert dict to game: dict has no 'type' key.",
-            )
+    async def save_many(self, games: Iterable[Game]) -> None:
+        await self._save_many(games)
 
-        game_type = _GameType(raw_game_type)
+    async def delete_many(self, games: Iterable[Game]) -> None:
+        await self._delete_many(games)
 
-        if game_type == _GameType.CONNECT_FOUR:
-            return self._common_retort.load(dict_, ConnectFourGame)
+    def _id_of(self, game: Game) -> GameId:
+        return game.id
 
-    def _game_to_dict(self, game: Game) -> dict:
-        game_as_dict = self._common_retort.dump(game)
+    def _participant_ids_of(self, game: Game) -> Iterable[UserId]:
+        return game.players
 
-        if isinstance(game, ConnectFourGame):
-            game_as_dict["type"] = _GameType.CONNECT_FOUR
+    def _entity_id_factory(self, raw_id: UUID) -> GameId:
+        return GameId(raw_id)
 
-        return game_as_dict
+    def _key_factory(self, game_id: GameId) -> str:
+        return game_key_factory(game_id)
 
-    def _game_key_factory(
+    def _index_key_factory(self, player_id: UserId) -> str:
+        return game_by_player_key_factory(player_id)
+
+    def _legacy_key_pattern_factory(
         self,
         *,
-        game_id: GameId,
-        player_ids: Iterable[UserId],
+        entity_id: GameId | None = None,
+        participant_id: UserId | None = None,
     ) -> str:
-        sorted_player_ids = sorted(player_ids)
-        return (
-            f"games:id:{game_id.hex}:player_ids:"
-            f"{':'.join((player_id.hex for player_id in sorted_player_ids))}"
+        return legacy_game_key_pattern_factory(
+            game_id=entity_id,
+            player_id=participant_id,
         )
 
-    def _pattern_to_find_game_by_id(self, game_id: GameId) -> str:
-        return f"games:id:{game_id.hex}:player_ids:*"
-
-    def _pattern_to_find_game_by_player_id(self, player_id: UserId) -> str:
-        return f"games:id:*:player_ids:*{player_id.hex}*"
+    def _parse_legacy_key(self, key: str) -> tuple[GameId, list[UserId]]:
+        return parse_legacy_game_key(key)
 
-    async def _keys_by_pattern(
-        self,
-        *,
-        pattern: str,
-        batch_size: int = 10,
-        limit: int | None = None,
-    ) -> list[str]:
-        keys: list[str] = []
+    def _dict_to_entity(self, dict_: dict) -> Game:
+        raw_game_type = dict_.get("type")
+        if not raw_game_type:
+            raise Exception(
+                "Cannot convert dict to game: dict has no 'type' key.",
+            )
+        game_type = _GameType(raw_game_type)
 
-        if limit == 0:
-            return keys
+        if game_type == _GameType.CONNECT_FOUR:
+            return self._converters.loader(ConnectFourGame)(dict_)
 
-        async for key in self._redis.scan_iter(
-            match=pattern,
-            count=batch_size,
-        ):
-            keys.append(key)
+    def _entity_to_dict(self, game: Game) -> dict:
+        game_as_dict = self._converters.dumper(type(game))(game)
 
-            if limit and len(keys) >= limit:
-                return keys
+        if isinstance(game, ConnectFourGame):
+            game_as_dict["type"] = _GameType.CONNECT_FOUR
 
-        return keys
+        return game_as_dict
@@ -8,19 +8,50 @@ __all__ = (
     "LobbyMapper",
 )
 
-import json
 from enum import StrEnum
-from typing import Iterable
 from dataclasses import dataclass
 from datetime import timedelta
+from typing import Final, Iterable
+from uuid import UUID
 
 from redis.asyncio.client import Redis, Pipeline
 
-from connection_hub.domain import LobbyId, UserId, ConnectFourLobby, Lobby
-from connection_hub.application import LobbyGateway
+from connection_hub.domain import (
+    LobbyId,
+    UserId,
+    ConnectFourLobby,
+    Lobby,
+    LOBBY_TO_MAX_PLAYERS_MAP,
+)
+from connection_hub.application import (
+    RuleSetType,
+    OpenLobbyFilters,
+    OpenLobbiesPage,
+    LobbyGateway,
+)
 from connection_hub.infrastructure.database.lock_manager import LockManager
-from connection_hub.infrastructure.common_retort import CommonRetort
-from connection_hub.infrastructure.utils import get_env_var, str_to_timedelta
+from connection_hub.infrastructure.database.replicas import ReplicaRouter
+from connection_hub.infrastructure.database.near_cache import NearCache
+from connection_hub.infrastructure.database.codec import EntityCodec
+from connection_hub.infrastructure.database.concurrency import (
+    ConcurrencyMode,
+    load_concurrency_mode,
+    VersionTracker,
+)
+from connection_hub.infrastructure.database.keys import (
+    lobby_key_factory,
+    lobby_by_user_key_factory,
+    open_lobbies_key_factory,
+    legacy_lobby_key_pattern_factory,
+    parse_legacy_lobby_key,
+)
+from connection_hub.infrastructure.common_retort import Converters
+from connection_hub.infrastructure.utils import (
+    get_env_var,
+    str_to_timedelta,
+    str_to_bool,
+)
+from .entity import EntityMapper
 
 
 def load_lobby_mapper_config() -> "LobbyMapperConfig":
@@ -30,6 +61,17 @@ def load_lobby_mapper_config() -> "LobbyMapperConfig":
             value_factory=str_to_timedelta,
             default=timedelta(days=1),
         ),
+        legacy_reads_enabled=get_env_var(
+            key="LOBBY_MAPPER_LEGACY_READS_ENABLED",
+            value_factory=str_to_bool,
+            default=False,
+        ),
+        concurrency_mode=load_concurrency_mode(),
+        hash_storage_enabled=get_env_var(
+            key="LOBBY_MAPPER_HASH_STORAGE_ENABLED",
+            value_factory=str_to_bool,
+            default=False,
+        ),
     )
 
 
@@ -37,32 +79,74 @@ def load_lobby_mapper_config() -> "LobbyMapperConfig":
 class LobbyMapperConfig:
     lobby_expires_in: timedelta
 
+    # Whether lobbies, which are not found in the current
+    # storage layout, should be searched in the legacy one.
+    # Must be enabled while lobbies stored by previous
+    # versions have not been migrated yet.
+    legacy_reads_enabled: bool = False
+
+    concurrency_mode: ConcurrencyMode = ConcurrencyMode.PESSIMISTIC
+
+    # Whether lobbies should be written as hashes, where each
+    # user is stored in its own field, so that only changed
+    # users are written on update. Lobbies are read regardless
+    # of the layout they were written with.
+    hash_storage_enabled: bool = False
+
 
 class _LobbyType(StrEnum):
     CONNECT_FOUR = "connect_four"
 
 
-class LobbyMapper(LobbyGateway):
-    __slots__ = (
-        "_redis",
-        "_redis_pipeline",
-        "_common_retort",
-        "_lock_manager",
-        "_config",
-    )
+_RULE_SET_TYPE_TO_LOBBY_TYPE: Final = {
+    RuleSetType.CONNECT_FOUR: _LobbyType.CONNECT_FOUR,
+}
+
+
+class LobbyMapper(EntityMapper[LobbyId, Lobby], LobbyGateway):
+    """
+    Stores each lobby under `lobbies:{lobby_id}` and maintains
+    `lobby_by_user:{user_id}` index entries pointing to the
+    lobby id. Hashes of lobbies have `users:{user_id}` fields.
+
+    Ids of lobbies are also kept in `open_lobbies` sorted
+    sets, one per combination of filters of the lobby
+    browser. All members have the same score, and ids of
+    lobbies are UUIDv7, so the sets are ordered by creation
+    time of lobbies. Pages of the lobby browser are only
+    displayed, so they may be read from replicas.
+    """
+
+    _participants_field = "users"
+
+    __slots__ = ("_replica_router", "_config")
 
     def __init__(
         self,
         redis: Redis,
         redis_pipeline: Pipeline,
-        common_retort: CommonRetort,
+        replica_router: ReplicaRouter,
+        near_cache: NearCache,
+        converters: Converters,
+        codec: EntityCodec,
         lock_manager: LockManager,
+        version_tracker: VersionTracker,
         config: LobbyMapperConfig,
     ):
-        self._redis = redis
-        self._redis_pipeline = redis_pipeline
-        self._common_retort = common_retort
-        self._lock_manager = lock_manager
+        super().__init__(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            near_cache=near_cache,
+            converters=converters,
+            codec=codec,
+            lock_manager=lock_manager,
+            version_tracker=version_tracker,
+            expires_in=config.lobby_expires_in,
+            legacy_reads_enabled=config.legacy_reads_enabled,
+            concurrency_mode=config.concurrency_mode,
+            hash_storage_enabled=config.hash_storage_enabled,
+        )
+        self._replica_router = replica_router
         self._config = config
 
     async def by_id(
@@ -71,20 +155,7 @@ class LobbyMapper(LobbyGateway):
         *,
         acquire: bool = False,
     ) -> Lobby | None:
-        pattern = self._pattern_to_find_lobby_by_id(lobby_id)
-        keys = await self._keys_by_pattern(pattern=pattern, limit=1)
-        if not keys:
-            return None
-
-        if acquire:
-            await self._lock_manager.acquire(keys[0])
-
-        lobby_as_json = await self._redis.get(keys[0])  # type: ignore
-        if lobby_as_json:
-            lobby_as_dict = json.loads(lobby_as_json)
-            return self._dict_to_lobby(lobby_as_dict)
-
-        return None
+        return await self._by_id(lobby_id, acquire=acquire)
 
     async def by_user_id(
         self,
@@ -92,61 +163,191 @@ class LobbyMapper(LobbyGateway):
         *,
         acquire: bool = False,
     ) -> Lobby | None:
-        pattern = self._pattern_to_find_lobby_by_user_id(user_id)
-        keys = await self._keys_by_pattern(pattern=pattern, limit=1)
-        if not keys:
-            return None
-
-        if acquire:
-            await self._lock_manager.acquire(keys[0])
+        return await self._by_participant_id(user_id, acquire=acquire)
 
-        lobby_as_json = await self._redis.get(keys[0])  # type: ignore
-        if lobby_as_json:
-            lobby_as_dict = json.loads(lobby_as_json)
-            return self._dict_to_lobby(lobby_as_dict)
+    async def by_user_ids(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        return await self._by_participant_ids(user_ids, acquire=acquire)
 
-        return None
+    async def by_ids(
+        self,
+        lobby_ids: Iterable[LobbyId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        return await self._by_ids(lobby_ids, acquire=acquire)
 
     async def save(self, lobby: Lobby) -> None:
-        lobby_key = self._lobby_key_factory(
-            lobby_id=lobby.id,
-            user_ids=lobby.users.keys(),
-        )
+        await self._save_many([lobby])
 
-        lobby_as_dict = self._lobby_to_dict(lobby)
-        lobby_as_json = json.dumps(lobby_as_dict)
+    async def update(self, lobby: Lobby) -> None:
+        await self._update(lobby)
 
-        self._redis_pipeline.set(
-            name=lobby_key,
-            value=lobby_as_json,
-            ex=self._config.lobby_expires_in,
-        )
+    async def delete(self, lobby: Lobby) -> None:
+        await self._delete_many([lobby])
 
-    async def update(self, lobby: Lobby) -> None:
-        # Delete an old lobby, because a new lobby might have
-        # different user ids (user ids being part of the key).
-        # This adds an extra request to redis, which could be
-        # avoided by tracking changes to lobby and, as a
-        # consequence, deleting it only if player ids have
-        # changed. However, this is considered overkill for now.
-        await self.delete(lobby)
-
-        lobby_key = self._lobby_key_factory(
-            lobby_id=lobby.id,
-            user_ids=lobby.users.keys(),
-        )
+    async def save_many(self, lobbies: Iterable[Lobby]) -> None:
+        await self._save_many(lobbies)
 
-        lobby_as_dict = self._lobby_to_dict(lobby)
-        lobby_as_json = json.dumps(lobby_as_dict)
+    async def delete_many(self, lobbies: Iterable[Lobby]) -> None:
+        await self._delete_many(lobbies)
 
-        self._redis_pipeline.set(lobby_key, lobby_as_json)
+    async def list_open(
+        self,
+        cursor: LobbyId | None,
+        limit: int,
+        filters: OpenLobbyFilters,
+    ) -> OpenLobbiesPage:
+        open_lobbies_key = open_lobbies_key_factory(
+            rule_set_type=(
+                _RULE_SET_TYPE_TO_LOBBY_TYPE[filters.rule_set_type]
+                if filters.rule_set_type
+                else None
+            ),
+            has_password=filters.has_password,
+        )
+        redis = self._replica_router.reader()
+        max_ = f"({cursor.hex}" if cursor else "+"
+
+        # One lobby more than requested is read to find out
+        # whether there is the next page. Sets may contain ids
+        # of expired lobbies, so they are read until enough
+        # existing lobbies are found.
+        lobbies: list[Lobby] = []
+        while len(lobbies) <= limit:
+            count = limit + 1 - len(lobbies)
+            raw_lobby_ids = await redis.zrevrangebylex(
+                name=open_lobbies_key,
+                max=max_,
+                min="-",
+                start=0,
+                num=count,
+            )
+            lobby_ids = [LobbyId(UUID(raw_id)) for raw_id in raw_lobby_ids]
+
+            found_lobbies = await self._peek_many(lobby_ids, redis=redis)
+            lobbies.extend(found_lobbies)
+
+            if len(found_lobbies) < len(lobby_ids):
+                found_lobby_ids = {lobby.id for lobby in found_lobbies}
+                await self._delete_expired_open_lobby_entries(
+                    [
+                        lobby_id
+                        for lobby_id in lobby_ids
+                        if lobby_id not in found_lobby_ids
+                    ],
+                )
+
+            if len(raw_lobby_ids) < count:
+                break
+            max_ = f"({raw_lobby_ids[-1]}"
+
+        next_cursor = lobbies[limit - 1].id if len(lobbies) > limit else None
+        return OpenLobbiesPage(
+            lobbies=lobbies[:limit],
+            next_cursor=next_cursor,
+        )
 
-    async def delete(self, lobby: Lobby) -> None:
-        pattern = self._pattern_to_find_lobby_by_id(lobby.id)
-        keys = await self._redis.keys(pattern)
-        self._redis_pipeline.delete(*keys)
+    def _after_write(self, lobbies: list[Lobby]) -> None:
+        # Each sorted set of open lobbies is changed with
+        # at most one ZADD and one ZREM for all lobbies.
+        all_open_lobbies_keys = _all_open_lobbies_keys()
+        added: dict[str, dict[str, int]] = {
+            key: {} for key in all_open_lobbies_keys
+        }
+        removed: dict[str, list[str]] = {
+            key: [] for key in all_open_lobbies_keys
+        }
+        for lobby in lobbies:
+            open_lobbies_keys = _open_lobbies_keys(lobby)
+            for open_lobbies_key in all_open_lobbies_keys:
+                if open_lobbies_key in open_lobbies_keys:
+                    added[open_lobbies_key][lobby.id.hex] = 0
+                else:
+                    removed[open_lobbies_key].append(lobby.id.hex)
+
+        for open_lobbies_key in all_open_lobbies_keys:
+            if added[open_lobbies_key]:
+                self._redis_pipeline.zadd(
+                    open_lobbies_key,
+                    added[open_lobbies_key],
+                )
+            if removed[open_lobbies_key]:
+                self._redis_pipeline.zrem(
+                    open_lobbies_key,
+                    *removed[open_lobbies_key],
+                )
+
+    def _after_delete(self, lobby_ids: list[LobbyId]) -> None:
+        if not lobby_ids:
+            return
+
+        raw_lobby_ids = [lobby_id.hex for lobby_id in lobby_ids]
+        for open_lobbies_key in _all_open_lobbies_keys():
+            self._redis_pipeline.zrem(open_lobbies_key, *raw_lobby_ids)
+
+    async def _delete_expired_open_lobby_entries(
+        self,
+        lobby_ids: list[LobbyId],
+    ) -> None:
+        """
+        Deletes entries of lobbies with specified `lobby_ids`
+        from sorted sets of open lobbies, if they do not exist.
+        Lobbies are checked on the primary, since replicas may
+        not have received recently created ones yet.
+        """
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for lobby_id in lobby_ids:
+                pipeline.exists(lobby_key_factory(lobby_id))
+            results = await pipeline.execute()
+
+        expired_raw_lobby_ids = [
+            lobby_id.hex
+            for lobby_id, exists in zip(lobby_ids, results, strict=True)
+            if not exists
+        ]
+        if not expired_raw_lobby_ids:
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for open_lobbies_key in _all_open_lobbies_keys():
+                pipeline.zrem(open_lobbies_key, *expired_raw_lobby_ids)
+            await pipeline.execute()
+
+    def _id_of(self, lobby: Lobby) -> LobbyId:
+        return lobby.id
+
+    def _participant_ids_of(self, lobby: Lobby) -> Iterable[UserId]:
+        return lobby.users
+
+    def _entity_id_factory(self, raw_id: UUID) -> LobbyId:
+        return LobbyId(raw_id)
+
+    def _key_factory(self, lobby_id: LobbyId) -> str:
+        return lobby_key_factory(lobby_id)
+
+    def _index_key_factory(self, user_id: UserId) -> str:
+        return lobby_by_user_key_factory(user_id)
+
+    def _legacy_key_pattern_factory(
+        self,
+        *,
+        entity_id: LobbyId | None = None,
+        participant_id: UserId | None = None,
+    ) -> str:
+        return legacy_lobby_key_pattern_factory(
+            lobby_id=entity_id,
+            user_id=participant_id,
+        )
 
-    def _dict_to_lobby(self, dict_: dict) -> Lobby:
+    def _parse_legacy_key(self, key: str) -> tuple[LobbyId, list[UserId]]:
+        return parse_legacy_lobby_key(key)
+
+    def _dict_to_entity(self, dict_: dict) -> Lobby:
         raw_lobby_type = dict_.get("type")
         if not raw_lobby_type:
             raise Exception(
@@ -155,53 +356,47 @@ class LobbyMapper(LobbyGateway):
         lobby_type = _LobbyType(raw_lobby_type)
 
         if lobby_type == _LobbyType.CONNECT_FOUR:
-            return self._common_retort.load(dict_, ConnectFourLobby)
+            return self._converters.loader(ConnectFourLobby)(dict_)
 
-    def _lobby_to_dict(self, lobby: Lobby) -> dict:
-        lobby_as_dict = self._common_retort.dump(lobby)
+    def _entity_to_dict(self, lobby: Lobby) -> dict:
+        lobby_as_dict = self._converters.dumper(type(lobby))(lobby)
 
         if isinstance(lobby, ConnectFourLobby):
             lobby_as_dict["type"] = _LobbyType.CONNECT_FOUR
 
         return lobby_as_dict
 
-    def _lobby_key_factory(
-        self,
-        *,
-        lobby_id: LobbyId,
-        user_ids: Iterable[UserId],
-    ) -> str:
-        sorted_user_ids = sorted(user_ids)
-        return (
-            f"lobbies:id:{lobby_id.hex}:user_ids:"
-            f"{':'.join((user_id.hex for user_id in sorted_user_ids))}"
-        )
-
-    def _pattern_to_find_lobby_by_id(self, lobby_id: LobbyId) -> str:
-        return f"lobbies:id:{lobby_id.hex}:user_ids:*"
 
-    def _pattern_to_find_lobby_by_user_id(self, user_id: UserId) -> str:
-        return f"lobbies:id:*:user_ids:*{user_id.hex}*"
+def _open_lobbies_keys(lobby: Lobby) -> list[str]:
+    """
+    Returns keys of sorted sets of open lobbies, which the
+    lobby must be in. Full lobbies cannot be joined, so they
+    are in none of them.
+    """
+    if len(lobby.users) >= LOBBY_TO_MAX_PLAYERS_MAP[type(lobby)]:
+        return []
 
-    async def _keys_by_pattern(
-        self,
-        *,
-        pattern: str,
-        batch_size: int = 10,
-        limit: int | None = None,
-    ) -> list[str]:
-        keys: list[str] = []
+    if isinstance(lobby, ConnectFourLobby):
+        lobby_type = _LobbyType.CONNECT_FOUR
 
-        if limit == 0:
-            return keys
+    has_password = lobby.password is not None
 
-        async for key in self._redis.scan_iter(
-            match=pattern,
-            count=batch_size,
-        ):
-            keys.append(key)
+    return [
+        open_lobbies_key_factory(
+            rule_set_type=rule_set_type,
+            has_password=has_password_filter,
+        )
+        for rule_set_type in (None, lobby_type)
+        for has_password_filter in (None, has_password)
+    ]
 
-            if limit and len(keys) >= limit:
-                return keys
 
-        return keys
+def _all_open_lobbies_keys() -> list[str]:
+    return [
+        open_lobbies_key_factory(
+            rule_set_type=rule_set_type,
+            has_password=has_password,
+        )
+        for rule_set_type in (None, *_LobbyType)
+        for has_password in (None, False, True)
+    ]
@@ -0,0 +1,91 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("MembershipMapper",)
+
+from redis.asyncio.client import Redis
+
+from connection_hub.domain import LobbyId, GameId, UserId
+from connection_hub.application import (
+    LobbyGateway,
+    GameGateway,
+    Membership,
+    MembershipGateway,
+)
+from connection_hub.infrastructure.database.scripts import MEMBERSHIP_SCRIPT
+from connection_hub.infrastructure.database.keys import (
+    LOBBY_KEY_PREFIX,
+    GAME_KEY_PREFIX,
+    lobby_by_user_key_factory,
+    game_by_player_key_factory,
+    id_from_index_value,
+)
+from .lobby import LobbyMapperConfig
+from .game import GameMapperConfig
+
+
+class MembershipMapper(MembershipGateway):
+    """
+    Resolves both a lobby and a game of a user with a single
+    request to redis, instead of reading their indexes one
+    after another. Membership is checked before users enter
+    lobbies, games or matchmaking, so it is read from the
+    primary rather than from replicas.
+    """
+
+    __slots__ = (
+        "_lobby_gateway",
+        "_game_gateway",
+        "_lobby_mapper_config",
+        "_game_mapper_config",
+        "_membership_script",
+    )
+
+    def __init__(
+        self,
+        redis: Redis,
+        lobby_gateway: LobbyGateway,
+        game_gateway: GameGateway,
+        lobby_mapper_config: LobbyMapperConfig,
+        game_mapper_config: GameMapperConfig,
+    ):
+        self._lobby_gateway = lobby_gateway
+        self._game_gateway = game_gateway
+        self._lobby_mapper_config = lobby_mapper_config
+        self._game_mapper_config = game_mapper_config
+        self._membership_script = redis.register_script(MEMBERSHIP_SCRIPT)
+
+    async def membership(self, user_id: UserId) -> Membership:
+        lobby_index_value, game_index_value = await self._membership_script(
+            keys=[
+                lobby_by_user_key_factory(user_id),
+                game_by_player_key_factory(user_id),
+            ],
+            args=[LOBBY_KEY_PREFIX, GAME_KEY_PREFIX],
+        )
+
+        lobby_id = None
+        if lobby_index_value:
+            lobby_id = LobbyId(id_from_index_value(lobby_index_value))
+
+        game_id = None
+        if game_index_value:
+            game_id = GameId(id_from_index_value(game_index_value))
+
+        if lobby_id or game_id:
+            return Membership(lobby_id=lobby_id, game_id=game_id)
+
+        # Entities stored with the legacy layout may have no
+        # index entries, so they are searched by mappers.
+        if self._lobby_mapper_config.legacy_reads_enabled:
+            lobby = await self._lobby_gateway.by_user_id(user_id)
+            if lobby:
+                return Membership(lobby_id=lobby.id)
+
+        if self._game_mapper_config.legacy_reads_enabled:
+            game = await self._game_gateway.by_player_id(user_id)
+            if game:
+                return Membership(game_id=game.id)
+
+        return Membership()
@@ -0,0 +1,20 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("TransactionConflictError", "LockLostError")
+
+
+class TransactionConflictError(Exception):
+    """
+    Raised when a transaction cannot be committed because
+    data it depends on has been changed concurrently.
+    Processing of a command can be safely retried.
+    """
+
+
+class LockLostError(TransactionConflictError):
+    """
+    Raised when a lock held by the current instance has
+    expired and might have been acquired by someone else.
+    """
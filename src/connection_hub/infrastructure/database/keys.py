@@ -0,0 +1,136 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "LOBBY_KEY_PREFIX",
+    "GAME_KEY_PREFIX",
+    "lobby_key_factory",
+    "lobby_by_user_key_factory",
+    "game_key_factory",
+    "game_by_player_key_factory",
+    "id_from_index_value",
+    "open_lobbies_key_factory",
+    "MATCHMAKING_QUEUES_KEY",
+    "matchmaking_queue_key_factory",
+    "PRESENCE_KEY",
+    "legacy_lobby_key_pattern_factory",
+    "parse_legacy_lobby_key",
+    "legacy_game_key_pattern_factory",
+    "parse_legacy_game_key",
+)
+
+from typing import Final
+from uuid import UUID
+
+from connection_hub.domain import LobbyId, GameId, UserId
+
+
+LOBBY_KEY_PREFIX: Final = "lobbies:"
+GAME_KEY_PREFIX: Final = "games:"
+
+# Matchmaking queues and the set of their ids share a hash
+# tag, so that they can be changed by a single script on
+# Redis Cluster.
+MATCHMAKING_QUEUES_KEY: Final = "{matchmaking}:queues"
+
+PRESENCE_KEY: Final = "presence"
+
+
+def lobby_key_factory(lobby_id: LobbyId) -> str:
+    return f"{LOBBY_KEY_PREFIX}{lobby_id.hex}"
+
+
+def lobby_by_user_key_factory(user_id: UserId) -> str:
+    return f"lobby_by_user:{user_id.hex}"
+
+
+def game_key_factory(game_id: GameId) -> str:
+    return f"{GAME_KEY_PREFIX}{game_id.hex}"
+
+
+def game_by_player_key_factory(player_id: UserId) -> str:
+    return f"game_by_player:{player_id.hex}"
+
+
+def id_from_index_value(value: str) -> UUID:
+    """
+    Returns an entity id from a value of an index entry.
+    Index entries written with the legacy layout store the
+    whole entity key instead of the entity id.
+    """
+    if ":id:" in value:
+        return UUID(value.split(":")[2])
+
+    return UUID(value)
+
+
+def open_lobbies_key_factory(
+    *,
+    rule_set_type: str | None = None,
+    has_password: bool | None = None,
+) -> str:
+    """
+    Returns a key of a sorted set of ids of lobbies shown in
+    the lobby browser, which match the provided filters.
+    """
+    key = "open_lobbies"
+    if rule_set_type:
+        key += f":{rule_set_type}"
+    if has_password is not None:
+        key += ":with_password" if has_password else ":without_password"
+    return key
+
+
+def matchmaking_queue_key_factory(queue_id: str) -> str:
+    return f"{{matchmaking}}:queue:{queue_id}"
+
+
+def legacy_lobby_key_pattern_factory(
+    *,
+    lobby_id: LobbyId | None = None,
+    user_id: UserId | None = None,
+) -> str:
+    """
+    Returns a pattern matching keys of lobbies stored with the
+    legacy layout, i.e. `lobbies:id:{id}:user_ids:{ids}`.
+    """
+    raw_lobby_id = lobby_id.hex if lobby_id else "*"
+    raw_user_id = f"*{user_id.hex}*" if user_id else "*"
+    return f"lobbies:id:{raw_lobby_id}:user_ids:{raw_user_id}"
+
+
+def parse_legacy_lobby_key(key: str) -> tuple[LobbyId, list[UserId]]:
+    key_without_prefix = key.removeprefix("lobbies:id:")
+    raw_lobby_id, raw_user_ids = key_without_prefix.split(":user_ids:")
+    user_ids = [
+        UserId(UUID(raw_user_id))
+        for raw_user_id in raw_user_ids.split(":")
+        if raw_user_id
+    ]
+    return LobbyId(UUID(raw_lobby_id)), user_ids
+
+
+def legacy_game_key_pattern_factory(
+    *,
+    game_id: GameId | None = None,
+    player_id: UserId | None = None,
+) -> str:
+    """
+    Returns a pattern matching keys of games stored with the
+    legacy layout, i.e. `games:id:{id}:player_ids:{ids}`.
+    """
+    raw_game_id = game_id.hex if game_id else "*"
+    raw_player_id = f"*{player_id.hex}*" if player_id else "*"
+    return f"games:id:{raw_game_id}:player_ids:{raw_player_id}"
+
+
+def parse_legacy_game_key(key: str) -> tuple[GameId, list[UserId]]:
+    key_without_prefix = key.removeprefix("games:id:")
+    raw_game_id, raw_player_ids = key_without_prefix.split(":player_ids:")
+    player_ids = [
+        UserId(UUID(raw_player_id))
+        for raw_player_id in raw_player_ids.split(":")
+        if raw_player_id
+    ]
+    return GameId(UUID(raw_game_id)), player_ids
@@ -3,25 +3,102 @@
 # Licensed under the Personal Use License (see LICENSE).
 
 __all__ = (
+    "LockWaitMode",
     "LockManagerConfig",
     "load_lock_manager_config",
+    "lock_release_listener_factory",
+    "LockReleaseListener",
     "LockManager",
     "lock_manager_factory",
 )
 
 import asyncio
-from dataclasses import dataclass
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import AsyncGenerator
+from enum import StrEnum
+from typing import AsyncGenerator, Awaitable, Callable, Final, Mapping
+from uuid import uuid4
 
-from redis.asyncio.client import Redis
+from redis.asyncio.client import Redis, PubSub
 
+from connection_hub.infrastructure.database.scripts import GET_ENTITY_SCRIPT
 from connection_hub.infrastructure.utils import (
     get_env_var,
     str_to_timedelta,
+    str_to_bool,
 )
 
 
+# Acquires a lock, if it is not held, storing the owner
+# token and a fence token, which is incremented on every
+# acquisition of the lock, as the lock value. Returns the
+# fence token and a value of the optional key to get in the
+# same round trip, or nil if the lock is held. Hashes are
+# returned as flat lists of fields and values.
+#
+# KEYS[1] - lock name, KEYS[2] - fence counter,
+# KEYS[3] - key to get (optional).
+# ARGV[1] - owner token, ARGV[2] - lock expiration time in
+# milliseconds, ARGV[3] - fence counter expiration time
+# in milliseconds.
+_ACQUIRE_SCRIPT: Final = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return false
+end
+local fence_token = redis.call("INCR", KEYS[2])
+redis.call("PEXPIRE", KEYS[2], ARGV[3])
+redis.call(
+    "SET", KEYS[1], ARGV[1] .. ":" .. fence_token, "PX", ARGV[2]
+)
+local value = false
+if KEYS[3] then
+    if redis.call("TYPE", KEYS[3])["ok"] == "hash" then
+        value = redis.call("HGETALL", KEYS[3])
+    else
+        value = redis.call("GET", KEYS[3])
+    end
+end
+return {fence_token, value}
+"""
+
+# Deletes a lock only if it still has the provided value,
+# i.e. it has not expired and been acquired by someone else,
+# and notifies waiters about it.
+#
+# KEYS[1] - lock name, KEYS[2] - release channel.
+# ARGV[1] - lock value.
+_RELEASE_SCRIPT: Final = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("PUBLISH", KEYS[2], "")
+    return 1
+end
+return 0
+"""
+
+# Extends expiration time of a lock only if it is still
+# held by the current instance.
+#
+# KEYS[1] - lock name.
+# ARGV[1] - lock value, ARGV[2] - lock expiration time
+# in milliseconds.
+_RENEW_SCRIPT: Final = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Fence counters must outlive locks, so that fence tokens
+# keep growing while the locked entity exists.
+_FENCE_COUNTER_EXPIRES_IN: Final = timedelta(days=1)
+
+_logger: Final = logging.getLogger(__name__)
+
+
 def load_lock_manager_config() -> "LockManagerConfig":
     return LockManagerConfig(
         lock_expires_in=get_env_var(
@@ -29,19 +106,240 @@ def load_lock_manager_config() -> "LockManagerConfig":
             value_factory=str_to_timedelta,
             default=timedelta(seconds=5),
         ),
+        wait_mode=get_env_var(
+            key="LOCK_WAIT_MODE",
+            value_factory=LockWaitMode,
+            default=LockWaitMode.NOTIFICATION,
+        ),
+        poll_interval=get_env_var(
+            key="LOCK_POLL_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(milliseconds=100),
+        ),
+        notification_timeout=get_env_var(
+            key="LOCK_NOTIFICATION_TIMEOUT",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=1),
+        ),
+        renewal_enabled=get_env_var(
+            key="LOCK_RENEWAL_ENABLED",
+            value_factory=str_to_bool,
+            default=True,
+        ),
     )
 
 
+class LockWaitMode(StrEnum):
+    # Lock is retried every `poll_interval`.
+    POLLING = "polling"
+
+    # Lock is retried as soon as its holder releases it. As
+    # locks may also expire without being released, waiting
+    # for a notification is limited by `notification_timeout`.
+    # Lock is polled for instead, if its release channel
+    # cannot be subscribed to.
+    NOTIFICATION = "notification"
+
+
 @dataclass(frozen=True, slots=True)
 class LockManagerConfig:
     lock_expires_in: timedelta
+    wait_mode: LockWaitMode = LockWaitMode.NOTIFICATION
+    poll_interval: timedelta = timedelta(milliseconds=100)
+    notification_timeout: timedelta = timedelta(seconds=1)
+
+    # Whether held locks should be renewed in the background
+    # every third of `lock_expires_in` until they are released.
+    renewal_enabled: bool = True
+
+
+async def lock_release_listener_factory(
+    redis: Redis,
+) -> AsyncGenerator["LockReleaseListener", None]:
+    release_listener = LockReleaseListener(redis)
+    try:
+        yield release_listener
+    finally:
+        await release_listener.stop()
+
+
+@dataclass(slots=True)
+class _Subscription:
+    # Confirmation of subscription to the channel by redis.
+    confirmed: asyncio.Future[None]
+
+    # One event per waiter, set on every release of the lock.
+    events: set[asyncio.Event] = field(default_factory=set)
+
+
+class LockReleaseListener:
+    """
+    Receives notifications about released locks for every
+    `LockManager` of the process through a single pubsub
+    connection, so that the number of waiters does not affect
+    the number of connections taken from the shared pool.
+
+    Channel is subscribed to while at least one waiter is
+    interested in it, and every waiter gets its own event,
+    which is set each time the lock is released.
+    """
+
+    __slots__ = (
+        "_redis",
+        "_pubsub",
+        "_subscriptions",
+        "_pending_confirmations",
+        "_listening_task",
+    )
+
+    def __init__(self, redis: Redis):
+        self._redis = redis
+        self._pubsub: PubSub | None = None
+        self._subscriptions: dict[str, _Subscription] = {}
+
+        # Number of SUBSCRIBE commands sent for each channel,
+        # which have not been confirmed yet. Subscription is
+        # confirmed only once all of them are, since the last
+        # waiter might have unsubscribed from the channel
+        # right before the current one subscribed to it.
+        self._pending_confirmations: Counter[str] = Counter()
+
+        self._listening_task: asyncio.Task | None = None
+
+    async def subscribe(
+        self,
+        channel: str,
+        *,
+        confirmation_timeout: timedelta,
+    ) -> asyncio.Event:
+        """
+        Subscribes to the channel and returns an event set on
+        every message published to it. Returns once redis has
+        confirmed the subscription or `confirmation_timeout`
+        has passed.
+        """
+        subscription = self._subscriptions.get(channel)
+        if subscription is None:
+            subscription = _Subscription(
+                confirmed=asyncio.get_running_loop().create_future(),
+            )
+            self._subscriptions[channel] = subscription
+            self._pending_confirmations[channel] += 1
+
+            try:
+                await self._subscribe(channel)
+            except BaseException:
+                self._subscriptions.pop(channel, None)
+                self._pending_confirmations[channel] -= 1
+                raise
+
+        event = asyncio.Event()
+        subscription.events.add(event)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(subscription.confirmed),
+                timeout=confirmation_timeout.total_seconds(),
+            )
+        except TimeoutError:
+            pass
+
+        return event
+
+    async def unsubscribe(self, channel: str, event: asyncio.Event) -> None:
+        subscription = self._subscriptions.get(channel)
+        if not subscription:
+            return
+
+        subscription.events.discard(event)
+        if subscription.events:
+            return
+
+        del self._subscriptions[channel]
+        if not self._pubsub:
+            return
+
+        # Waiter has already got what it waited for, so the
+        # error is not propagated to it.
+        try:
+            await self._pubsub.unsubscribe(channel)
+        except Exception:
+            _logger.exception({
+                "message": "Error occurred during unsubscribing.",
+                "channel": channel,
+            })
+
+    async def stop(self) -> None:
+        if self._listening_task:
+            self._listening_task.cancel()
+            try:
+                await self._listening_task
+            except asyncio.CancelledError:
+                pass
+            self._listening_task = None
+
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+        self._subscriptions.clear()
+        self._pending_confirmations.clear()
+
+    async def _subscribe(self, channel: str) -> None:
+        # Connection is taken from the pool only once locks
+        # are waited for.
+        if not self._pubsub:
+            self._pubsub = self._redis.pubsub()
+
+        await self._pubsub.subscribe(channel)
+
+        if not self._listening_task:
+            self._listening_task = asyncio.create_task(
+                self._listen(self._pubsub),
+            )
+
+    async def _listen(self, pubsub: PubSub) -> None:
+        while True:
+            try:
+                message = await pubsub.get_message(timeout=1)
+            except Exception:
+                _logger.exception({
+                    "message": "Error occurred during receiving lock releases.",
+                })
+                await asyncio.sleep(1)
+                continue
+
+            if message:
+                self._handle(message)
+
+    def _handle(self, message: dict) -> None:
+        channel = message["channel"]
+        subscription = self._subscriptions.get(channel)
+
+        if message["type"] == "subscribe":
+            self._pending_confirmations[channel] -= 1
+            if self._pending_confirmations[channel] > 0:
+                return
+
+            del self._pending_confirmations[channel]
+            if subscription and not subscription.confirmed.done():
+                subscription.confirmed.set_result(None)
+
+        elif message["type"] == "message" and subscription:
+            for event in subscription.events:
+                event.set()
 
 
 async def lock_manager_factory(
     redis: Redis,
+    release_listener: LockReleaseListener,
     config: LockManagerConfig,
 ) -> AsyncGenerator["LockManager", None]:
-    lock_manager = LockManager(redis=redis, config=config)
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=release_listener,
+        config=config,
+    )
     try:
         yield lock_manager
     finally:
@@ -49,16 +347,77 @@ async def lock_manager_factory(
 
 
 class LockManager:
+    """
+    Each lock is stored with the value `{owner_token}:{fence_token}`,
+    where the owner token is unique for each instance, and the
+    fence token is incremented on every acquisition of the lock.
+    Locks are released only by their owners. On commit, a lock
+    is considered lost if its value has changed or its fence
+    counter has moved past the fence token it was acquired with.
+    """
+
     __slots__ = (
         "_redis",
-        "_acquired_lock_names",
+        "_release_listener",
+        "_acquired_locks",
         "_config",
+        "_owner_token",
+        "_acquire_script",
+        "_release_script",
+        "_renew_script",
+        "_get_entity_script",
+        "_renewal_task",
     )
 
-    def __init__(self, redis: Redis, config: LockManagerConfig):
+    def __init__(
+        self,
+        redis: Redis,
+        release_listener: LockReleaseListener,
+        config: LockManagerConfig,
+    ):
         self._redis = redis
-        self._acquired_lock_names: list[str] = []
+        self._release_listener = release_listener
+        self._acquired_locks: dict[str, str] = {}
         self._config = config
+        self._owner_token = uuid4().hex
+
+        # Scripts are sent with EVALSHA and loaded
+        # into redis only if they are not there yet.
+        self._acquire_script = redis.register_script(_ACQUIRE_SCRIPT)
+        self._release_script = redis.register_script(_RELEASE_SCRIPT)
+        self._renew_script = redis.register_script(_RENEW_SCRIPT)
+        self._get_entity_script = redis.register_script(GET_ENTITY_SCRIPT)
+
+        self._renewal_task: asyncio.Task | None = None
+
+    @property
+    def acquired_locks(self) -> Mapping[str, str]:
+        """
+        Returns names of locks held by the current instance
+        mapped to values they are stored with.
+        """
+        return self._acquired_locks
+
+    def is_held(self, lock_id: str) -> bool:
+        """
+        Returns whether a lock with the provided id is held
+        by the current instance.
+        """
+        return self._lock_name_factory(lock_id) in self._acquired_locks
+
+    @property
+    def fence_tokens(self) -> Mapping[str, int]:
+        """
+        Returns names of fence counters of locks held by
+        the current instance mapped to fence tokens these
+        locks have been acquired with.
+        """
+        fence_tokens = {}
+        for lock_name, lock_value in self._acquired_locks.items():
+            _, fence_token = lock_value.rsplit(":", maxsplit=1)
+            fence_counter = self._fence_counter_factory(lock_name)
+            fence_tokens[fence_counter] = int(fence_token)
+        return fence_tokens
 
     async def acquire(self, lock_id: str) -> None:
         """
@@ -69,25 +428,237 @@ class LockManager:
         the lock becomes available and then acquires it.
         """
         lock_name = self._lock_name_factory(lock_id)
-        if lock_name in self._acquired_lock_names:
+        if lock_name in self._acquired_locks:
             return
 
-        while not await self._redis.set(
-            name=lock_name,
-            value="",
-            ex=self._config.lock_expires_in,
-            nx=True,
-        ):
-            await asyncio.sleep(0.1)
+        await self._acquire(lock_name, keys=[])
+
+    async def acquire_and_get(
+        self,
+        lock_id: str,
+        key: str,
+    ) -> str | list[str] | None:
+        """
+        Acquires a lock with the provided id the same way as
+        `acquire` does and returns a value of the provided key.
+        If the key holds a hash, its fields and values are
+        returned as a flat list.
+
+        Each attempt to acquire the lock and reading of the key
+        are made in a single round trip.
+        """
+        lock_name = self._lock_name_factory(lock_id)
+        if lock_name in self._acquired_locks:
+            return await self._get_entity_script(keys=[key])
 
-        self._acquired_lock_names.append(lock_name)
+        return await self._acquire(lock_name, keys=[key])
 
     async def release_all(self) -> None:
-        if not self._acquired_lock_names:
+        await self._stop_renewal()
+
+        if not self._acquired_locks:
             return
 
-        await self._redis.delete(*self._acquired_lock_names)
-        self._acquired_lock_names.clear()
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for lock_name, lock_value in self._acquired_locks.items():
+                await self._release_script(
+                    keys=[lock_name, self._release_channel_factory(lock_name)],
+                    args=[lock_value],
+                    client=pipeline,
+                )
+            results = await pipeline.execute()
+
+        for lock_name, released in zip(
+            self._acquired_locks,
+            results,
+            strict=True,
+        ):
+            if not released:
+                _logger.warning({
+                    "message": "Lock has expired before being released.",
+                    "lock_name": lock_name,
+                })
+
+        self._acquired_locks.clear()
+
+    async def _acquire(
+        self,
+        lock_name: str,
+        *,
+        keys: list[str],
+    ) -> str | list[str] | None:
+        fence_counter = self._fence_counter_factory(lock_name)
+        args: list[str | int] = [
+            self._owner_token,
+            int(self._config.lock_expires_in.total_seconds() * 1000),
+            int(_FENCE_COUNTER_EXPIRES_IN.total_seconds() * 1000),
+        ]
+
+        async def attempt() -> tuple[bool, str | list[str] | None]:
+            result = await self._acquire_script(
+                keys=[lock_name, fence_counter, *keys],
+                args=args,
+            )
+            if result is None:
+                return False, None
+
+            fence_token, value = result
+            self._acquired_locks[lock_name] = (
+                f"{self._owner_token}:{fence_token}"
+            )
+            return True, value
+
+        acquired, value = await attempt()
+        if acquired:
+            self._start_renewal()
+            return value
+
+        started_at = time.monotonic()
+
+        if self._config.wait_mode == LockWaitMode.NOTIFICATION:
+            value, retries = await self._wait_for_notification(
+                lock_name,
+                attempt,
+            )
+        else:
+            value, retries = await self._poll(attempt)
+
+        _logger.info({
+            "message": "Lock has been acquired after waiting.",
+            "lock_name": lock_name,
+            "wait_mode": self._config.wait_mode,
+            "wait_time": time.monotonic() - started_at,
+            "retries": retries,
+        })
+
+        self._start_renewal()
+
+        return value
+
+    async def _poll[T](
+        self,
+        attempt: Callable[[], Awaitable[tuple[bool, T]]],
+    ) -> tuple[T, int]:
+        retries = 0
+        while True:
+            await asyncio.sleep(self._config.poll_interval.total_seconds())
+
+            retries += 1
+            acquired, result = await attempt()
+            if acquired:
+                return result, retries
+
+    async def _wait_for_notification[T](
+        self,
+        lock_name: str,
+        attempt: Callable[[], Awaitable[tuple[bool, T]]],
+    ) -> tuple[T, int]:
+        notification_timeout = self._config.notification_timeout
+        release_channel = self._release_channel_factory(lock_name)
+        retries = 0
+
+        try:
+            released = await self._release_listener.subscribe(
+                release_channel,
+                confirmation_timeout=notification_timeout,
+            )
+        except Exception:
+            _logger.exception({
+                "message": (
+                    "Lock release channel cannot be subscribed to. "
+                    "Lock is polled for instead."
+                ),
+                "lock_name": lock_name,
+            })
+            return await self._poll(attempt)
+
+        try:
+            # Lock might have been released before subscription,
+            # so it is retried right after subscribing.
+            while True:
+                retries += 1
+                acquired, result = await attempt()
+                if acquired:
+                    return result, retries
+
+                try:
+                    await asyncio.wait_for(
+                        released.wait(),
+                        timeout=notification_timeout.total_seconds(),
+                    )
+                except TimeoutError:
+                    pass
+                released.clear()
+        finally:
+            await self._release_listener.unsubscribe(release_channel, released)
+
+    def _start_renewal(self) -> None:
+        if not self._config.renewal_enabled or self._renewal_task:
+            return
+
+        self._renewal_task = asyncio.create_task(self._renew_periodically())
+
+    async def _stop_renewal(self) -> None:
+        if not self._renewal_task:
+            return
+
+        self._renewal_task.cancel()
+        try:
+            await self._renewal_task
+        except asyncio.CancelledError:
+            pass
+
+        self._renewal_task = None
+
+    async def _renew_periodically(self) -> None:
+        lock_expires_in = self._config.lock_expires_in
+        renewal_interval = lock_expires_in.total_seconds() / 3
+        lock_expires_in_ms = int(lock_expires_in.total_seconds() * 1000)
+
+        while True:
+            await asyncio.sleep(renewal_interval)
+
+            # Copy is made, since locks might be acquired
+            # while the renewal is in progress.
+            acquired_locks = dict(self._acquired_locks)
+            try:
+                await self._renew(
+                    acquired_locks=acquired_locks,
+                    lock_expires_in_ms=lock_expires_in_ms,
+                )
+            except Exception:
+                _logger.exception({
+                    "message": "Error occurred during renewing locks.",
+                    "lock_names": list(acquired_locks),
+                })
+
+    async def _renew(
+        self,
+        *,
+        acquired_locks: dict[str, str],
+        lock_expires_in_ms: int,
+    ) -> None:
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for lock_name, lock_value in acquired_locks.items():
+                await self._renew_script(
+                    keys=[lock_name],
+                    args=[lock_value, lock_expires_in_ms],
+                    client=pipeline,
+                )
+            results = await pipeline.execute()
+
+        for lock_name, renewed in zip(acquired_locks, results, strict=True):
+            if not renewed:
+                _logger.warning({
+                    "message": "Lock has expired before being renewed.",
+                    "lock_name": lock_name,
+                })
 
     def _lock_name_factory(self, lock_id: str) -> str:
         return f"locks:{lock_id}"
+
+    def _fence_counter_factory(self, lock_name: str) -> str:
+        return f"lock_fences:{lock_name}"
+
+    def _release_channel_factory(self, lock_name: str) -> str:
+        return f"lock_releases:{lock_name}"
@@ -0,0 +1,183 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "MatchmakingQueueConfig",
+    "load_matchmaking_queue_config",
+    "RedisMatchmakingQueue",
+)
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Final, Iterable
+from uuid import UUID
+
+from redis.asyncio.client import Redis, Pipeline
+
+from connection_hub.domain import UserId, ConnectFourRuleSet, RuleSet
+from connection_hub.application import MatchmakingTicket, MatchmakingQueue
+from connection_hub.infrastructure.utils import get_env_var, str_to_timedelta
+from .keys import MATCHMAKING_QUEUES_KEY, matchmaking_queue_key_factory
+from .lock_manager import LockManager
+
+
+# Removes tickets, which are no longer valid, and returns
+# the oldest remaining ones with their scores. Queue, which
+# has become empty, is removed from the set of queues.
+#
+# KEYS[1] - key of the queue, KEYS[2] - key of the set of
+# queues.
+# ARGV[1] - minimum score of a valid ticket, ARGV[2] - max
+# number of tickets to return, ARGV[3] - id of the queue.
+_OLDEST_TICKETS_SCRIPT: Final = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", "(" .. ARGV[1])
+local tickets = redis.call(
+    "ZRANGE", KEYS[1], 0, tonumber(ARGV[2]) - 1, "WITHSCORES"
+)
+if #tickets == 0 then
+    redis.call("SREM", KEYS[2], ARGV[3])
+end
+return tickets
+"""
+
+
+def load_matchmaking_queue_config() -> "MatchmakingQueueConfig":
+    return MatchmakingQueueConfig(
+        ticket_expires_in=get_env_var(
+            key="MATCHMAKING_TICKET_EXPIRES_IN",
+            value_factory=str_to_timedelta,
+            default=timedelta(minutes=1),
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class MatchmakingQueueConfig:
+    # Tickets are dropped once they have been waiting longer
+    # than `ticket_expires_in`, so that users, who have gone
+    # away, are not matched. Users still waiting have to
+    # enter matchmaking again.
+    ticket_expires_in: timedelta = timedelta(minutes=1)
+
+
+class RedisMatchmakingQueue(MatchmakingQueue):
+    """
+    Each queue is a sorted set of ids of users scored by
+    the time they have entered it in milliseconds. Ids of
+    queues, which may contain tickets, are kept in a set,
+    so that the matcher does not have to scan keys.
+    """
+
+    __slots__ = (
+        "_redis",
+        "_redis_pipeline",
+        "_lock_manager",
+        "_config",
+        "_oldest_tickets_script",
+    )
+
+    def __init__(
+        self,
+        redis: Redis,
+        redis_pipeline: Pipeline,
+        lock_manager: LockManager,
+        config: MatchmakingQueueConfig,
+    ):
+        self._redis = redis
+        self._redis_pipeline = redis_pipeline
+        self._lock_manager = lock_manager
+        self._config = config
+        self._oldest_tickets_script = redis.register_script(
+            _OLDEST_TICKETS_SCRIPT,
+        )
+
+    async def add(self, ticket: MatchmakingTicket) -> None:
+        queue_id = _queue_id(ticket.rule_set)
+        queue_key = matchmaking_queue_key_factory(queue_id)
+
+        self._redis_pipeline.zadd(
+            name=queue_key,
+            mapping={ticket.user_id.hex: _to_score(ticket.enqueued_at)},
+            nx=True,
+        )
+        self._redis_pipeline.expire(
+            name=queue_key,
+            time=self._config.ticket_expires_in,
+        )
+        self._redis_pipeline.sadd(MATCHMAKING_QUEUES_KEY, queue_id)
+
+    async def rule_sets(self) -> list[RuleSet]:
+        queue_ids = await self._redis.smembers(  # type: ignore
+            MATCHMAKING_QUEUES_KEY,
+        )
+        return [_rule_set(queue_id) for queue_id in sorted(queue_ids)]
+
+    async def oldest(
+        self,
+        *,
+        rule_set: RuleSet,
+        limit: int,
+        acquire: bool = False,
+    ) -> list[MatchmakingTicket]:
+        queue_id = _queue_id(rule_set)
+        queue_key = matchmaking_queue_key_factory(queue_id)
+
+        if acquire:
+            await self._lock_manager.acquire(queue_key)
+
+        min_score = _to_score(
+            datetime.now(timezone.utc) - self._config.ticket_expires_in,
+        )
+        members_and_scores = await self._oldest_tickets_script(
+            keys=[queue_key, MATCHMAKING_QUEUES_KEY],
+            args=[min_score, limit, queue_id],
+        )
+
+        return [
+            MatchmakingTicket(
+                user_id=UserId(UUID(member)),
+                rule_set=rule_set,
+                enqueued_at=datetime.fromtimestamp(
+                    int(score) / 1000,
+                    timezone.utc,
+                ),
+            )
+            for member, score in zip(
+                members_and_scores[::2],
+                members_and_scores[1::2],
+                strict=True,
+            )
+        ]
+
+    async def remove_many(
+        self,
+        tickets: Iterable[MatchmakingTicket],
+    ) -> None:
+        members_by_queue_key: defaultdict[str, list[str]] = defaultdict(list)
+        for ticket in tickets:
+            queue_key = matchmaking_queue_key_factory(
+                _queue_id(ticket.rule_set),
+            )
+            members_by_queue_key[queue_key].append(ticket.user_id.hex)
+
+        for queue_key, members in members_by_queue_key.items():
+            self._redis_pipeline.zrem(queue_key, *members)
+
+
+def _queue_id(rule_set: RuleSet) -> str:
+    if isinstance(rule_set, ConnectFourRuleSet):
+        seconds = int(rule_set.time_for_each_player.total_seconds())
+        return f"connect_four:{seconds}"
+
+
+def _rule_set(queue_id: str) -> RuleSet:
+    _, raw_seconds = queue_id.split(":")
+    return ConnectFourRuleSet(
+        time_for_each_player=timedelta(seconds=int(raw_seconds)),
+    )
+
+
+def _to_score(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
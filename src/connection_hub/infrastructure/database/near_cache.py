@@ -0,0 +1,327 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "NearCacheConfig",
+    "load_near_cache_config",
+    "near_cache_factory",
+    "NearCache",
+)
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncGenerator, Final
+
+from redis.asyncio.client import Redis, PubSub
+
+from connection_hub.infrastructure.utils import (
+    get_env_var,
+    str_to_timedelta,
+    str_to_bool,
+)
+from .keys import LOBBY_KEY_PREFIX, GAME_KEY_PREFIX
+
+
+_logger: Final = logging.getLogger(__name__)
+
+# Channel, which redis publishes keys to be invalidated to,
+# when invalidations are redirected to another connection.
+_INVALIDATION_CHANNEL: Final = "__redis__:invalidate"
+
+_TRACKED_PREFIXES: Final = (LOBBY_KEY_PREFIX, GAME_KEY_PREFIX)
+
+
+def load_near_cache_config() -> "NearCacheConfig":
+    return NearCacheConfig(
+        enabled=get_env_var(
+            key="NEAR_CACHE_ENABLED",
+            value_factory=str_to_bool,
+            default=False,
+        ),
+        max_size=get_env_var(
+            key="NEAR_CACHE_MAX_SIZE",
+            value_factory=int,
+            default=10_000,
+        ),
+        check_interval=get_env_var(
+            key="NEAR_CACHE_CHECK_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=1),
+        ),
+        metrics_interval=get_env_var(
+            key="NEAR_CACHE_METRICS_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=60),
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class NearCacheConfig:
+    enabled: bool = False
+
+    # Maximum number of entities kept in memory. Least
+    # recently used ones are evicted first.
+    max_size: int = 10_000
+
+    # Invalidations published while the connection receiving
+    # them is being restored are lost, so tracking is checked
+    # every `check_interval` and the whole cache is dropped
+    # once it turns out to be broken.
+    check_interval: timedelta = timedelta(seconds=1)
+
+    # How often hits and misses are logged. `0` disables it.
+    metrics_interval: timedelta = timedelta(seconds=60)
+
+
+async def near_cache_factory(
+    redis: Redis,
+    config: NearCacheConfig,
+) -> AsyncGenerator["NearCache", None]:
+    near_cache = NearCache(redis=redis, config=config)
+    await near_cache.start()
+
+    try:
+        yield near_cache
+    finally:
+        await near_cache.stop()
+
+
+class NearCache:
+    """
+    Keeps entities stored in redis in memory of the process,
+    so that repeated reads of them need no request to redis.
+
+    Cache relies on server-assisted client side caching in
+    broadcasting mode: redis publishes keys of lobbies and
+    games to a dedicated connection every time they change,
+    and cached values of those keys are dropped. Until
+    tracking is established, cache is inactive and every
+    lookup misses.
+    """
+
+    __slots__ = (
+        "_redis",
+        "_config",
+        "_values",
+        "_active",
+        "_epoch",
+        "_hits",
+        "_misses",
+        "_evictions",
+        "_invalidations",
+        "_tracking_task",
+        "_metrics_task",
+    )
+
+    def __init__(self, redis: Redis, config: NearCacheConfig):
+        self._redis = redis
+        self._config = config
+
+        self._values: OrderedDict[str, object] = OrderedDict()
+        self._active = False
+
+        # Incremented on every invalidation, so that values
+        # read before an invalidation was received are not
+        # cached after it.
+        self._epoch = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+        self._tracking_task: asyncio.Task | None = None
+        self._metrics_task: asyncio.Task | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def epoch(self) -> int:
+        """
+        Returns a value to be passed to `put` together with
+        a value read after calling this method.
+        """
+        return self._epoch
+
+    def get(self, key: str) -> object | None:
+        if not self._active:
+            return None
+
+        value = self._values.get(key)
+        if value is None:
+            self._misses += 1
+            return None
+
+        self._values.move_to_end(key)
+        self._hits += 1
+
+        return value
+
+    def put(self, key: str, value: object, *, epoch: int) -> None:
+        if not self._active or epoch != self._epoch:
+            return
+
+        self._values[key] = value
+        self._values.move_to_end(key)
+
+        if len(self._values) > self._config.max_size:
+            self._values.popitem(last=False)
+            self._evictions += 1
+
+    async def start(self) -> None:
+        if not self._config.enabled or self._tracking_task:
+            return
+
+        self._tracking_task = asyncio.create_task(self._track_periodically())
+        if self._config.metrics_interval:
+            self._metrics_task = asyncio.create_task(
+                self._report_metrics_periodically(),
+            )
+
+    async def stop(self) -> None:
+        for task in (self._tracking_task, self._metrics_task):
+            if not task:
+                continue
+
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        self._tracking_task = None
+        self._metrics_task = None
+        self._deactivate()
+
+    async def _track_periodically(self) -> None:
+        while True:
+            try:
+                await self._track()
+            except Exception:
+                _logger.exception({
+                    "message": "Error occurred during tracking near cache.",
+                })
+
+            self._deactivate()
+            await asyncio.sleep(self._config.check_interval.total_seconds())
+
+    async def _track(self) -> None:
+        async with (
+            self._redis.pubsub() as pubsub,
+            self._redis.client() as tracking_redis,
+        ):
+            try:
+                await self._track_with(
+                    pubsub=pubsub,
+                    tracking_redis=tracking_redis,
+                )
+            finally:
+                # Connection of tracking client is returned to
+                # the shared pool, so it is closed to turn
+                # tracking off.
+                if tracking_redis.connection:
+                    await tracking_redis.connection.disconnect()
+
+    async def _track_with(
+        self,
+        *,
+        pubsub: PubSub,
+        tracking_redis: Redis,
+    ) -> None:
+        await pubsub.connect()
+
+        # Connection is not subscribed yet, so it can still
+        # serve regular commands.
+        await pubsub.connection.send_command("CLIENT", "ID")  # type: ignore
+        client_id = await pubsub.connection.read_response()  # type: ignore
+
+        await pubsub.subscribe(_INVALIDATION_CHANNEL)
+        await tracking_redis.client_tracking_on(
+            clientid=client_id,
+            prefix=_TRACKED_PREFIXES,
+            bcast=True,
+        )
+        self._activate()
+
+        while True:
+            await self._receive_invalidations(pubsub)
+            await self._ensure_tracking(tracking_redis)
+
+    async def _receive_invalidations(self, pubsub: PubSub) -> None:
+        message = await pubsub.get_message(
+            ignore_subscribe_messages=True,
+            timeout=self._config.check_interval.total_seconds(),
+        )
+        while message:
+            if message["type"] == "message":
+                self._invalidate(message["data"])
+            message = await pubsub.get_message(ignore_subscribe_messages=True)
+
+    async def _ensure_tracking(self, tracking_redis: Redis) -> None:
+        # Both connections are restored by the client after
+        # errors, but neither tracking nor redirection
+        # survives that.
+        tracking_info = await tracking_redis.client_trackinginfo()
+        tracking_info = dict(
+            zip(tracking_info[::2], tracking_info[1::2], strict=True),
+        )
+
+        flags = tracking_info["flags"]
+        if "on" not in flags or "broken_redirect" in flags:
+            raise Exception("Tracking of keys of near cache is broken.")
+
+    def _invalidate(self, keys: list[str] | None) -> None:
+        self._epoch += 1
+
+        # Redis sends no keys, when the whole database is
+        # flushed.
+        if keys is None:
+            self._invalidations += len(self._values)
+            self._values.clear()
+            return
+
+        for key in keys:
+            if self._values.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def _activate(self) -> None:
+        self._epoch += 1
+        self._active = True
+
+        _logger.info({"message": "Near cache is active."})
+
+    def _deactivate(self) -> None:
+        if self._active:
+            _logger.info({"message": "Near cache is inactive."})
+
+        self._epoch += 1
+        self._active = False
+        self._values.clear()
+
+    async def _report_metrics_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.metrics_interval.total_seconds())
+
+            lookups = self._hits + self._misses
+            _logger.info({
+                "message": "Near cache usage.",
+                "active": self._active,
+                "size": len(self._values),
+                "max_size": self._config.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            })
+
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._invalidations = 0
@@ -0,0 +1,124 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("RedisPresenceTracker",)
+
+from datetime import datetime
+from typing import Final, Iterable
+from uuid import UUID
+
+from redis.asyncio.client import Redis
+
+from connection_hub.domain import UserId
+from connection_hub.application import PresenceTracker
+from .keys import PRESENCE_KEY
+
+
+# Claims up to ARGV[2] users last seen before ARGV[1] by
+# moving the time they have last been seen at to ARGV[3],
+# and returns their ids.
+#
+# KEYS[1] - key of the sorted set of users.
+# ARGV[1] - time in milliseconds, ARGV[2] - max number of
+# users to claim, ARGV[3] - time the claim expires at in
+# milliseconds.
+_CLAIM_ABSENT_SCRIPT: Final = """
+local user_ids = redis.call(
+    "ZRANGEBYSCORE", KEYS[1], "-inf", "(" .. ARGV[1], "LIMIT", 0, ARGV[2]
+)
+for _, user_id in ipairs(user_ids) do
+    redis.call("ZADD", KEYS[1], ARGV[3], user_id)
+end
+return user_ids
+"""
+
+# Removes users, who have not been seen after ARGV[1].
+#
+# KEYS[1] - key of the sorted set of users.
+# ARGV[1] - time the claim expires at in milliseconds,
+# ARGV[2..] - ids of the users.
+_FORGET_SCRIPT: Final = """
+for i = 2, #ARGV do
+    local score = redis.call("ZSCORE", KEYS[1], ARGV[i])
+    if score and tonumber(score) <= tonumber(ARGV[1]) then
+        redis.call("ZREM", KEYS[1], ARGV[i])
+    end
+end
+"""
+
+
+class RedisPresenceTracker(PresenceTracker):
+    """
+    Keeps ids of users in a sorted set scored by the time
+    they have last been seen at in milliseconds.
+
+    Presence is written immediately rather than with the
+    current transaction, so that acknowledging presence
+    costs a single ZADD. Users written by a transaction,
+    which has failed, are dropped once they are absent.
+
+    Absent users are claimed rather than removed, so that
+    users, whose eviction has failed, are taken again once
+    their claim expires.
+    """
+
+    __slots__ = ("_redis", "_claim_absent_script", "_forget_script")
+
+    def __init__(self, redis: Redis):
+        self._redis = redis
+        self._claim_absent_script = redis.register_script(
+            _CLAIM_ABSENT_SCRIPT,
+        )
+        self._forget_script = redis.register_script(_FORGET_SCRIPT)
+
+    async def acknowledge(self, user_id: UserId, *, at: datetime) -> None:
+        await self.acknowledge_many([user_id], at=at)
+
+    async def acknowledge_many(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        at: datetime,
+    ) -> None:
+        score = _to_score(at)
+        mapping = {user_id.hex: score for user_id in user_ids}
+        if not mapping:
+            return
+
+        # Presence acknowledged late, e.g. by a message that
+        # has been waiting in the stream, must not move the
+        # time users have last been seen at back.
+        await self._redis.zadd(name=PRESENCE_KEY, mapping=mapping, gt=True)
+
+    async def claim_absent(
+        self,
+        *,
+        seen_before: datetime,
+        limit: int,
+        claimed_until: datetime,
+    ) -> list[UserId]:
+        raw_user_ids = await self._claim_absent_script(
+            keys=[PRESENCE_KEY],
+            args=[_to_score(seen_before), limit, _to_score(claimed_until)],
+        )
+        return [UserId(UUID(raw_user_id)) for raw_user_id in raw_user_ids]
+
+    async def forget(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        claimed_until: datetime,
+    ) -> None:
+        raw_user_ids = [user_id.hex for user_id in user_ids]
+        if not raw_user_ids:
+            return
+
+        await self._forget_script(
+            keys=[PRESENCE_KEY],
+            args=[_to_score(claimed_until), *raw_user_ids],
+        )
+
+
+def _to_score(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
@@ -0,0 +1,284 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("ReapedKeys", "RedisReaper")
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Final
+from uuid import UUID
+
+from redis.asyncio.client import Redis
+
+from .keys import (
+    LOBBY_KEY_PREFIX,
+    GAME_KEY_PREFIX,
+    lobby_key_factory,
+    game_key_factory,
+)
+
+
+# Sets an expiration time of a key, if it has none. Keys,
+# which must not exist without an expiration time, are
+# deleted instead. Returns 1 if the key has been changed.
+#
+# KEYS[1] - key.
+# ARGV[1] - expiration time in milliseconds, 0 to delete
+# the key.
+_BOUND_SCRIPT: Final = """
+if redis.call("PTTL", KEYS[1]) ~= -1 then
+    return 0
+end
+if ARGV[1] == "0" then
+    return redis.call("DEL", KEYS[1])
+end
+return redis.call("PEXPIRE", KEYS[1], ARGV[1])
+"""
+
+# Deletes an index entry, if it still has the value read
+# before and its entity does not exist. Returns 1 if
+# the entry has been deleted.
+#
+# KEYS[1] - key of the index entry, KEYS[2] - key of
+# the entity.
+# ARGV[1] - value of the index entry.
+_DELETE_ORPHANED_INDEX_ENTRY_SCRIPT: Final = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    return 0
+end
+return redis.call("DEL", KEYS[1])
+"""
+
+_logger: Final = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, kw_only=True)
+class ReapedKeys:
+    kind: str
+
+    # Number of keys of this kind found in redis.
+    keys: int = 0
+
+    # Number of keys, which have got an expiration time.
+    bounded: int = 0
+
+    deleted: int = 0
+
+
+class RedisReaper:
+    """
+    Finds keys left in redis forever and removes them:
+
+    - Lobbies and games without an expiration time, e.g.
+      written by versions, which did not keep it on update,
+      get the configured one.
+    - Index entries pointing to lobbies or games, which no
+      longer exist, are deleted, and ones without an
+      expiration time get the configured one.
+    - Locks without an expiration time can never be
+      released, so they are deleted.
+
+    Keys are scanned and changed in batches, checks and
+    changes of a single key are atomic, so it is safe to
+    run alongside the application. Index entries are checked
+    together with keys of their entities, so reaping is not
+    compatible with Redis Cluster.
+    """
+
+    __slots__ = (
+        "_redis",
+        "_lobby_expires_in",
+        "_game_expires_in",
+        "_batch_size",
+        "_bound_script",
+        "_delete_orphaned_index_entry_script",
+    )
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        lobby_expires_in: timedelta,
+        game_expires_in: timedelta,
+        batch_size: int = 100,
+    ):
+        self._redis = redis
+        self._lobby_expires_in = lobby_expires_in
+        self._game_expires_in = game_expires_in
+        self._batch_size = batch_size
+        self._bound_script = redis.register_script(_BOUND_SCRIPT)
+        self._delete_orphaned_index_entry_script = redis.register_script(
+            _DELETE_ORPHANED_INDEX_ENTRY_SCRIPT,
+        )
+
+    async def reap(self) -> list[ReapedKeys]:
+        keyspace = await self._redis.info("keyspace")
+        _logger.info({
+            "message": "Redis keyspace before reaping.",
+            "keyspace": keyspace,
+        })
+
+        reaped_keys_list = [
+            await self._bound(
+                kind="lobbies",
+                pattern=f"{LOBBY_KEY_PREFIX}*",
+                expires_in=self._lobby_expires_in,
+            ),
+            await self._bound(
+                kind="games",
+                pattern=f"{GAME_KEY_PREFIX}*",
+                expires_in=self._game_expires_in,
+            ),
+            await self._reap_index(
+                kind="lobby_index",
+                pattern="lobby_by_user:*",
+                entity_key_factory=lobby_key_factory,  # type: ignore[arg-type]
+                expires_in=self._lobby_expires_in,
+            ),
+            await self._reap_index(
+                kind="game_index",
+                pattern="game_by_player:*",
+                entity_key_factory=game_key_factory,  # type: ignore[arg-type]
+                expires_in=self._game_expires_in,
+            ),
+            await self._bound(
+                kind="locks",
+                pattern="locks:*",
+                expires_in=None,
+            ),
+        ]
+
+        for reaped_keys in reaped_keys_list:
+            _logger.info({
+                "message": "Redis keys have been reaped.",
+                "kind": reaped_keys.kind,
+                "keys": reaped_keys.keys,
+                "bounded": reaped_keys.bounded,
+                "deleted": reaped_keys.deleted,
+            })
+
+        return reaped_keys_list
+
+    async def _bound(
+        self,
+        *,
+        kind: str,
+        pattern: str,
+        expires_in: timedelta | None,
+    ) -> ReapedKeys:
+        """
+        Sets `expires_in` as an expiration time of keys
+        matching `pattern`, which have none, or deletes them,
+        if `expires_in` is None.
+        """
+        reaped_keys = ReapedKeys(kind=kind)
+        expires_in_ms = _to_ms(expires_in)
+
+        async for keys in self._batches_by_pattern(pattern):
+            reaped_keys.keys += len(keys)
+
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                for key in keys:
+                    await self._bound_script(
+                        keys=[key],
+                        args=[expires_in_ms],
+                        client=pipeline,
+                    )
+                results = await pipeline.execute()
+
+            if expires_in:
+                reaped_keys.bounded += sum(results)
+            else:
+                reaped_keys.deleted += sum(results)
+
+        return reaped_keys
+
+    async def _reap_index(
+        self,
+        *,
+        kind: str,
+        pattern: str,
+        entity_key_factory: Callable[[UUID], str],
+        expires_in: timedelta,
+    ) -> ReapedKeys:
+        reaped_keys = ReapedKeys(kind=kind)
+        expires_in_ms = _to_ms(expires_in)
+
+        async for index_keys in self._batches_by_pattern(pattern):
+            reaped_keys.keys += len(index_keys)
+
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                for index_key in index_keys:
+                    pipeline.get(index_key)
+                index_values = await pipeline.execute()
+
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                for index_key, index_value in zip(
+                    index_keys,
+                    index_values,
+                    strict=True,
+                ):
+                    # Key has expired between SCAN and GET.
+                    if index_value is None:
+                        continue
+
+                    await self._delete_orphaned_index_entry_script(
+                        keys=[
+                            index_key,
+                            _entity_key(index_value, entity_key_factory),
+                        ],
+                        args=[index_value],
+                        client=pipeline,
+                    )
+                    await self._bound_script(
+                        keys=[index_key],
+                        args=[expires_in_ms],
+                        client=pipeline,
+                    )
+                results = await pipeline.execute()
+
+            reaped_keys.deleted += sum(results[::2])
+            reaped_keys.bounded += sum(results[1::2])
+
+        return reaped_keys
+
+    async def _batches_by_pattern(
+        self,
+        pattern: str,
+    ) -> AsyncIterator[list[str]]:
+        keys: list[str] = []
+        async for key in self._redis.scan_iter(
+            match=pattern,
+            count=self._batch_size,
+        ):
+            keys.append(key)
+
+            if len(keys) >= self._batch_size:
+                yield keys
+                keys = []
+
+        if keys:
+            yield keys
+
+
+def _entity_key(
+    index_value: str,
+    entity_key_factory: Callable[[UUID], str],
+) -> str:
+    # Index entries written with the legacy layout store
+    # the whole entity key.
+    if ":id:" in index_value:
+        return index_value
+
+    return entity_key_factory(UUID(index_value))
+
+
+def _to_ms(expires_in: timedelta | None) -> int:
+    if not expires_in:
+        return 0
+    return int(expires_in.total_seconds() * 1000)
@@ -2,19 +2,115 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("redis_factory", "redis_pipeline_factory")
+__all__ = (
+    "ConnectionPoolUsage",
+    "connection_pool_usage",
+    "connection_pool_factory",
+    "redis_connection_pool_factory",
+    "redis_factory",
+    "redis_pipeline_factory",
+)
 
-from typing import AsyncGenerator
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncGenerator, Final
 
 from redis.asyncio.client import Redis, Pipeline
+from redis.asyncio.connection import ConnectionPool, BlockingConnectionPool
 
 from connection_hub.infrastructure.redis_config import RedisConfig
 
 
-async def redis_factory(
+_logger: Final = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ConnectionPoolUsage:
+    in_use_connections: int
+    idle_connections: int
+    max_connections: int
+
+    @property
+    def utilization(self) -> float:
+        return self.in_use_connections / self.max_connections
+
+
+def connection_pool_usage(
+    connection_pool: ConnectionPool,
+) -> ConnectionPoolUsage:
+    # Redis client exposes no public API for pool usage,
+    # so it is read from attributes of the pool.
+    in_use_connections = connection_pool._in_use_connections  # noqa: SLF001
+    idle_connections = connection_pool._available_connections  # noqa: SLF001
+
+    return ConnectionPoolUsage(
+        in_use_connections=len(in_use_connections),
+        idle_connections=len(idle_connections),
+        max_connections=connection_pool.max_connections,
+    )
+
+
+def connection_pool_factory(
+    *,
+    url: str,
+    config: RedisConfig,
+) -> BlockingConnectionPool:
+    """
+    Returns a connection pool to the redis instance with
+    the provided url, configured with `config`.
+    """
+    # Responses are decoded with the `surrogateescape` error
+    # handler, so that binary values, e.g. entities stored in
+    # the binary format, can be restored to original bytes.
+    return BlockingConnectionPool.from_url(
+        url=url,
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout.total_seconds(),
+        socket_timeout=config.socket_timeout.total_seconds(),
+        socket_connect_timeout=config.socket_connect_timeout.total_seconds(),
+        socket_keepalive=config.socket_keepalive,
+        health_check_interval=config.health_check_interval.total_seconds(),
+        decode_responses=True,
+        encoding_errors="surrogateescape",
+    )
+
+
+async def redis_connection_pool_factory(
     config: RedisConfig,
+) -> AsyncGenerator[BlockingConnectionPool, None]:
+    """
+    Returns a connection pool shared by all clients of redis
+    within a process, including the schedule source.
+    """
+    connection_pool = connection_pool_factory(url=config.url, config=config)
+
+    metrics_task = None
+    if config.pool_metrics_interval:
+        metrics_task = asyncio.create_task(
+            _report_usage_periodically(
+                connection_pool=connection_pool,
+                interval=config.pool_metrics_interval,
+            ),
+        )
+
+    try:
+        yield connection_pool
+    finally:
+        if metrics_task:
+            metrics_task.cancel()
+            try:
+                await metrics_task
+            except asyncio.CancelledError:
+                pass
+        await connection_pool.aclose()
+
+
+async def redis_factory(
+    connection_pool: BlockingConnectionPool,
 ) -> AsyncGenerator[Redis, None]:
-    redis = Redis.from_url(url=config.url, decode_responses=True)
+    redis = Redis(connection_pool=connection_pool)
     yield redis
     await redis.aclose()
 
@@ -24,3 +120,21 @@ async def redis_pipeline_factory(
 ) -> AsyncGenerator[Pipeline, None]:
     async with redis.pipeline() as pipeline:
         yield pipeline
+
+
+async def _report_usage_periodically(
+    *,
+    connection_pool: ConnectionPool,
+    interval: timedelta,
+) -> None:
+    while True:
+        await asyncio.sleep(interval.total_seconds())
+
+        usage = connection_pool_usage(connection_pool)
+        _logger.info({
+            "message": "Redis connection pool usage.",
+            "in_use_connections": usage.in_use_connections,
+            "idle_connections": usage.idle_connections,
+            "max_connections": usage.max_connections,
+            "utilization": usage.utilization,
+        })
@@ -0,0 +1,157 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("ReplicaRouter", "replica_router_factory")
+
+import asyncio
+import logging
+from datetime import timedelta
+from itertools import cycle
+from typing import AsyncGenerator, Final, Iterator
+
+from redis.asyncio.client import Redis
+
+from connection_hub.infrastructure.redis_config import RedisConfig
+from .redis_ import connection_pool_factory
+
+
+_logger: Final = logging.getLogger(__name__)
+
+
+async def replica_router_factory(
+    redis: Redis,
+    config: RedisConfig,
+) -> AsyncGenerator["ReplicaRouter", None]:
+    replicas = [
+        Redis(connection_pool=connection_pool_factory(url=url, config=config))
+        for url in config.replica_urls
+    ]
+    replica_router = ReplicaRouter(
+        primary=redis,
+        replicas=replicas,
+        max_lag=config.replica_max_lag,
+    )
+    await replica_router.start()
+
+    try:
+        yield replica_router
+    finally:
+        await replica_router.stop()
+        for replica in replicas:
+            await replica.aclose()
+            await replica.connection_pool.aclose()
+
+
+class ReplicaRouter:
+    """
+    Chooses a redis instance for reads, which are only
+    displayed, such as pages of the lobby browser. Such reads
+    are sent to replicas in turn, while writes and reads,
+    which decide what is written, always go to the primary.
+
+    Replicas are checked every `max_lag`. A replica is read
+    from only if it is connected to the primary and has
+    received everything the primary had at the previous
+    check. Otherwise, or if there are no replicas, reads go
+    to the primary.
+    """
+
+    __slots__ = (
+        "_primary",
+        "_replicas",
+        "_max_lag",
+        "_fresh_replicas",
+        "_fresh_replica_iterator",
+        "_check_task",
+    )
+
+    def __init__(
+        self,
+        primary: Redis,
+        replicas: list[Redis] | None = None,
+        max_lag: timedelta = timedelta(seconds=1),
+    ):
+        self._primary = primary
+        self._replicas = replicas or []
+        self._max_lag = max_lag
+
+        self._fresh_replicas: list[Redis] = []
+        self._fresh_replica_iterator: Iterator[Redis] = iter(())
+        self._check_task: asyncio.Task | None = None
+
+    def reader(self) -> Redis:
+        return next(self._fresh_replica_iterator, self._primary)
+
+    async def start(self) -> None:
+        if not self._replicas or self._check_task:
+            return
+
+        self._check_task = asyncio.create_task(self._check_periodically())
+
+    async def stop(self) -> None:
+        if not self._check_task:
+            return
+
+        self._check_task.cancel()
+        try:
+            await self._check_task
+        except asyncio.CancelledError:
+            pass
+
+        self._check_task = None
+        self._set_fresh_replicas([])
+
+    async def _check_periodically(self) -> None:
+        previous_primary_offset: int | None = None
+
+        while True:
+            try:
+                primary_info = await self._primary.info("replication")
+                primary_offset = primary_info["master_repl_offset"]
+
+                if previous_primary_offset is not None:
+                    await self._check_replicas(previous_primary_offset)
+
+                previous_primary_offset = primary_offset
+            except Exception:
+                _logger.exception({
+                    "message": "Error occurred during checking replicas.",
+                })
+                previous_primary_offset = None
+                self._set_fresh_replicas([])
+
+            await asyncio.sleep(self._max_lag.total_seconds())
+
+    async def _check_replicas(self, min_offset: int) -> None:
+        fresh_replicas = []
+
+        for replica in self._replicas:
+            try:
+                replica_info = await replica.info("replication")
+            except Exception:
+                _logger.exception({
+                    "message": "Error occurred during checking a replica.",
+                })
+                continue
+
+            if (
+                replica_info.get("master_link_status") == "up"
+                and replica_info.get("slave_repl_offset", -1) >= min_offset
+            ):
+                fresh_replicas.append(replica)
+
+        if len(fresh_replicas) != len(self._fresh_replicas):
+            _logger.info({
+                "message": "Set of replicas to read from has changed.",
+                "fresh_replicas": len(fresh_replicas),
+                "replicas": len(self._replicas),
+            })
+
+        self._set_fresh_replicas(fresh_replicas)
+
+    def _set_fresh_replicas(self, fresh_replicas: list[Redis]) -> None:
+        self._fresh_replicas = fresh_replicas
+        self._fresh_replica_iterator = (
+            cycle(fresh_replicas) if fresh_replicas else iter(())
+        )
@@ -0,0 +1,88 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "GET_ENTITY_SCRIPT",
+    "GET_ENTITIES_SCRIPT",
+    "MEMBERSHIP_SCRIPT",
+    "DELETE_INDEX_ENTRIES_SCRIPT",
+)
+
+from typing import Final
+
+
+# Returns an entity stored either as a string or as a hash.
+# Hashes are returned as flat lists of fields and values.
+#
+# KEYS[1] - key of the entity.
+GET_ENTITY_SCRIPT: Final = """
+if redis.call("TYPE", KEYS[1])["ok"] == "hash" then
+    return redis.call("HGETALL", KEYS[1])
+end
+return redis.call("GET", KEYS[1])
+"""
+
+
+# Returns entities stored either as strings or as hashes
+# in the order of their keys, or false for each missing
+# one. It replaces MGET, which fails on hashes.
+#
+# KEYS - keys of entities.
+GET_ENTITIES_SCRIPT: Final = """
+local result = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("TYPE", key)["ok"] == "hash" then
+        result[i] = redis.call("HGETALL", key)
+    else
+        result[i] = redis.call("GET", key)
+    end
+end
+return result
+"""
+
+
+# Returns ids of entities from index entries, whose entities
+# still exist, or false for each missing one. Index entries
+# written with the legacy layout store the whole entity key.
+# Keys of entities are not known in advance, so the script
+# is not compatible with Redis Cluster.
+#
+# KEYS - keys of index entries.
+# ARGV - prefixes of keys of entities, one per index entry.
+MEMBERSHIP_SCRIPT: Final = """
+local result = {}
+for i, index_key in ipairs(KEYS) do
+    local value = redis.call("GET", index_key)
+    result[i] = false
+    if value then
+        local entity_key = ARGV[i] .. value
+        if string.find(value, ":id:", 1, true) then
+            entity_key = value
+        end
+        if redis.call("EXISTS", entity_key) == 1 then
+            result[i] = value
+        end
+    end
+end
+return result
+"""
+
+
+# Deletes index entries, which still point at the provided
+# entities, and returns how many have been deleted. Index
+# entries written with the legacy layout store the whole
+# entity key, which contains the entity id.
+#
+# KEYS - keys of index entries.
+# ARGV - ids of entities, one per index entry.
+DELETE_INDEX_ENTRIES_SCRIPT: Final = """
+local deleted = 0
+for i, key in ipairs(KEYS) do
+    local value = redis.call("GET", key)
+    if value and string.find(value, ARGV[i], 1, true) then
+        deleted = deleted + redis.call("DEL", key)
+    end
+end
+return deleted
+"""
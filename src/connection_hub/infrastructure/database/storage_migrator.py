@@ -0,0 +1,128 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("RedisStorageMigrator",)
+
+from typing import Callable
+from uuid import UUID
+
+from redis.asyncio.client import Redis
+
+from connection_hub.domain import UserId
+from .keys import (
+    lobby_key_factory,
+    lobby_by_user_key_factory,
+    legacy_lobby_key_pattern_factory,
+    parse_legacy_lobby_key,
+    game_key_factory,
+    game_by_player_key_factory,
+    legacy_game_key_pattern_factory,
+    parse_legacy_game_key,
+)
+
+
+class RedisStorageMigrator:
+    """
+    Moves lobbies and games stored with the legacy layout,
+    where ids of participants are part of the key, to the
+    current one and creates their index entries. Expiration
+    times are preserved. Running it multiple times is safe.
+    """
+
+    __slots__ = ("_redis", "_batch_size")
+
+    def __init__(self, redis: Redis, batch_size: int = 100):
+        self._redis = redis
+        self._batch_size = batch_size
+
+    async def migrate(self) -> None:
+        await self._migrate(
+            pattern=legacy_lobby_key_pattern_factory(),
+            legacy_key_parser=parse_legacy_lobby_key,
+            key_factory=lobby_key_factory,  # type: ignore[arg-type]
+            index_key_factory=lobby_by_user_key_factory,
+        )
+        await self._migrate(
+            pattern=legacy_game_key_pattern_factory(),
+            legacy_key_parser=parse_legacy_game_key,
+            key_factory=game_key_factory,  # type: ignore[arg-type]
+            index_key_factory=game_by_player_key_factory,
+        )
+
+    async def _migrate(
+        self,
+        *,
+        pattern: str,
+        legacy_key_parser: Callable[[str], tuple[UUID, list[UserId]]],
+        key_factory: Callable[[UUID], str],
+        index_key_factory: Callable[[UserId], str],
+    ) -> None:
+        legacy_keys: list[str] = []
+        async for legacy_key in self._redis.scan_iter(
+            match=pattern,
+            count=self._batch_size,
+        ):
+            legacy_keys.append(legacy_key)
+
+            if len(legacy_keys) >= self._batch_size:
+                await self._migrate_batch(
+                    legacy_keys=legacy_keys,
+                    legacy_key_parser=legacy_key_parser,
+                    key_factory=key_factory,
+                    index_key_factory=index_key_factory,
+                )
+                legacy_keys.clear()
+
+        if legacy_keys:
+            await self._migrate_batch(
+                legacy_keys=legacy_keys,
+                legacy_key_parser=legacy_key_parser,
+                key_factory=key_factory,
+                index_key_factory=index_key_factory,
+            )
+
+    async def _migrate_batch(
+        self,
+        *,
+        legacy_keys: list[str],
+        legacy_key_parser: Callable[[str], tuple[UUID, list[UserId]]],
+        key_factory: Callable[[UUID], str],
+        index_key_factory: Callable[[UserId], str],
+    ) -> None:
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for legacy_key in legacy_keys:
+                pipeline.get(legacy_key)
+                pipeline.pttl(legacy_key)
+            results = await pipeline.execute()
+
+        async with self._redis.pipeline(transaction=True) as pipeline:
+            for index, legacy_key in enumerate(legacy_keys):
+                value, ttl = results[index * 2], results[index * 2 + 1]
+
+                # Key has expired between SCAN and GET.
+                if value is None:
+                    continue
+
+                entity_id, participant_ids = legacy_key_parser(legacy_key)
+                px = ttl if ttl > 0 else None
+
+                # Entity might have already been written with the
+                # current layout by a newer version, in that case
+                # it must not be overwritten.
+                pipeline.set(
+                    name=key_factory(entity_id),
+                    value=value,
+                    px=px,
+                    nx=True,
+                )
+                pipeline.delete(legacy_key)
+
+                for participant_id in participant_ids:
+                    pipeline.set(
+                        name=index_key_factory(participant_id),
+                        value=entity_id.hex,
+                        px=px,
+                    )
+
+            await pipeline.execute()
@@ -4,23 +4,162 @@
 
 __all__ = ("RedisTransactionManager",)
 
-from redis.asyncio.client import Pipeline
+from typing import Final
+
+from redis.asyncio.client import Redis, Pipeline
+from redis.exceptions import WatchError
 
 from connection_hub.application import TransactionManager
+from .exceptions import TransactionConflictError, LockLostError
 from .lock_manager import LockManager
+from .concurrency import VersionTracker
+
+
+# Returns versions of entities. Entities stored as hashes
+# keep the encoded entity in the `data` field. Entities
+# encoded with the binary format store their version in the
+# header, entities encoded with JSON in the `version` field.
+# Missing entities and entities without version have
+# version 0.
+#
+# KEYS - keys of entities.
+_ENTITY_VERSIONS_SCRIPT: Final = """
+local versions = {}
+for i, key in ipairs(KEYS) do
+    local value
+    if redis.call("TYPE", key)["ok"] == "hash" then
+        value = redis.call("HGET", key, "data")
+    else
+        value = redis.call("GET", key)
+    end
+    versions[i] = 0
+    if value then
+        if string.byte(value, 1) == 1 then
+            versions[i] = (struct.unpack(">I4", value, 2))
+        else
+            versions[i] = cjson.decode(value)["version"] or 0
+        end
+    end
+end
+return versions
+"""
 
 
 class RedisTransactionManager(TransactionManager):
-    __slots__ = ("_redis_pipeline", "_lock_manager")
+    __slots__ = (
+        "_redis_pipeline",
+        "_lock_manager",
+        "_version_tracker",
+        "_entity_versions_script",
+    )
 
     def __init__(
         self,
+        redis: Redis,
         redis_pipeline: Pipeline,
         lock_manager: LockManager,
+        version_tracker: VersionTracker,
     ):
         self._redis_pipeline = redis_pipeline
         self._lock_manager = lock_manager
+        self._version_tracker = version_tracker
+        self._entity_versions_script = redis.register_script(
+            _ENTITY_VERSIONS_SCRIPT,
+        )
 
     async def commit(self) -> None:
-        await self._redis_pipeline.execute()
+        """
+        Executes buffered commands in a single transaction.
+
+        If any lock held by the current request has expired
+        or has been acquired by someone else, nothing is
+        written and `LockLostError` is raised. If any entity
+        changed in optimistic mode has been changed by someone
+        else since it was loaded, nothing is written and
+        `TransactionConflictError` is raised.
+        """
+        expected_versions = dict(self._version_tracker.expected_versions)
+        if expected_versions:
+            await self._commit_optimistically(expected_versions)
+            return
+
+        acquired_locks = dict(self._lock_manager.acquired_locks)
+        if acquired_locks:
+            await self._ensure_locks_are_held(
+                acquired_locks=acquired_locks,
+                fence_tokens=dict(self._lock_manager.fence_tokens),
+            )
+
+        try:
+            await self._redis_pipeline.execute()
+        except WatchError as error:
+            raise LockLostError() from error
+
         await self._lock_manager.release_all()
+
+    async def _commit_optimistically(
+        self,
+        expected_versions: dict[str, int],
+    ) -> None:
+        self._version_tracker.clear()
+
+        try:
+            await self._ensure_versions_are_expected(expected_versions)
+            await self._redis_pipeline.execute()
+        except WatchError as error:
+            raise TransactionConflictError() from error
+        finally:
+            await self._lock_manager.release_all()
+
+    async def _ensure_versions_are_expected(
+        self,
+        expected_versions: dict[str, int],
+    ) -> None:
+        # Entities are watched before their versions are read,
+        # so that the transaction is aborted if any of them
+        # changes after it has been checked.
+        keys = list(expected_versions)
+        await self._redis_pipeline.watch(*keys)
+
+        # Versions are read through another connection, since
+        # scripts called through the pipeline are loaded only
+        # when it is executed.
+        versions = await self._entity_versions_script(keys=keys)
+        if versions != list(expected_versions.values()):
+            await self._redis_pipeline.reset()
+            raise TransactionConflictError()
+
+    async def _ensure_locks_are_held(
+        self,
+        *,
+        acquired_locks: dict[str, str],
+        fence_tokens: dict[str, int],
+    ) -> None:
+        # Locks and their fence counters are watched, so that
+        # the transaction is aborted if any of them changes
+        # before it is executed.
+        lock_names = list(acquired_locks)
+        fence_counters = list(fence_tokens)
+        await self._redis_pipeline.watch(*lock_names, *fence_counters)
+
+        # Commands are executed immediately while watching.
+        values = await self._redis_pipeline.mget(  # type: ignore
+            [*lock_names, *fence_counters],
+        )
+        lock_values = values[: len(lock_names)]
+        stored_fences = values[len(lock_names) :]
+
+        # A fence token older than the stored fence means that
+        # the lock has been acquired by someone else since then,
+        # even if its value happens to be the same.
+        is_outfenced = any(
+            int(stored_fence or 0) > fence_token
+            for stored_fence, fence_token in zip(
+                stored_fences,
+                fence_tokens.values(),
+                strict=True,
+            )
+        )
+        if lock_values != list(acquired_locks.values()) or is_outfenced:
+            await self._redis_pipeline.reset()
+            raise LockLostError()
@@ -22,7 +22,7 @@ from connection_hub.application import (
     ConnectFourGamePlayerDisqualifiedEvent,
     Event,
 )
-from connection_hub.infrastructure.common_retort import CommonRetort
+from connection_hub.infrastructure.common_retort import Converters
 from connection_hub.infrastructure.operation_id import OperationId
 
 
@@ -52,22 +52,22 @@ _logger: Final = logging.getLogger(__name__)
 
 
 class NATSEventPublisher:
-    __all__ = ("_jetstream", "_common_retort", "_operation_id")
+    __all__ = ("_jetstream", "_converters", "_operation_id")
 
     def __init__(
         self,
         jetstream: JetStreamContext,
-        common_retort: CommonRetort,
+        converters: Converters,
         operation_id: OperationId,
     ):
         self._jetstream = jetstream
-        self._common_retort = common_retort
+        self._converters = converters
         self._operation_id = operation_id
 
     async def publish(self, event: Event) -> None:
         subject = _EVENT_TO_SUBJECT_MAP[type(event)]
 
-        event_as_dict = self._common_retort.dump(event)
+        event_as_dict = self._converters.dumper(type(event))(event)
         event_as_dict["operation_id"] = str(self._operation_id)
         payload = json.dumps(event_as_dict).encode()
 
@@ -31,6 +31,7 @@ class NATSStreamCreator:
                 "gaems12.api_gateway.lobby.user_joined",
                 "gaems12.api_gateway.lobby.user_left",
                 "gaems12.api_gateway.lobby.user_kicked",
+                "gaems12.api_gateway.matchmaking.entered",
                 "gaems12.api_gateway.game.created",
                 "gaems12.api_gateway.game.player_disconnected",
                 "gaems12.api_gateway.game.player_reconnected",
@@ -5,16 +5,97 @@
 __all__ = ("RedisConfig", "load_redis_config")
 
 from dataclasses import dataclass
+from datetime import timedelta
 
-from connection_hub.infrastructure.utils import get_env_var
+from connection_hub.infrastructure.utils import (
+    get_env_var,
+    str_to_timedelta,
+    str_to_bool,
+)
 
 
 def load_redis_config() -> "RedisConfig":
     return RedisConfig(
         url=get_env_var("REDIS_URL", default="redis://localhost:6379"),
+        max_connections=get_env_var(
+            key="REDIS_MAX_CONNECTIONS",
+            value_factory=int,
+            default=50,
+        ),
+        pool_timeout=get_env_var(
+            key="REDIS_POOL_TIMEOUT",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=5),
+        ),
+        socket_timeout=get_env_var(
+            key="REDIS_SOCKET_TIMEOUT",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=5),
+        ),
+        socket_connect_timeout=get_env_var(
+            key="REDIS_SOCKET_CONNECT_TIMEOUT",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=5),
+        ),
+        socket_keepalive=get_env_var(
+            key="REDIS_SOCKET_KEEPALIVE",
+            value_factory=str_to_bool,
+            default=True,
+        ),
+        health_check_interval=get_env_var(
+            key="REDIS_HEALTH_CHECK_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=30),
+        ),
+        pool_metrics_interval=get_env_var(
+            key="REDIS_POOL_METRICS_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=60),
+        ),
+        replica_urls=get_env_var(
+            key="REDIS_REPLICA_URLS",
+            value_factory=_str_to_urls,
+            default=(),
+        ),
+        replica_max_lag=get_env_var(
+            key="REDIS_REPLICA_MAX_LAG",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=1),
+        ),
     )
 
 
+def _str_to_urls(value: str) -> tuple[str, ...]:
+    return tuple(url.strip() for url in value.split(",") if url.strip())
+
+
 @dataclass(frozen=True, slots=True)
 class RedisConfig:
     url: str
+
+    # Connections are shared by all requests. When all of
+    # them are in use, a request waits for one to be
+    # released for at most `pool_timeout` instead of opening
+    # a new one.
+    max_connections: int = 50
+    pool_timeout: timedelta = timedelta(seconds=5)
+
+    socket_timeout: timedelta = timedelta(seconds=5)
+    socket_connect_timeout: timedelta = timedelta(seconds=5)
+    socket_keepalive: bool = True
+
+    # Idle connections are checked with PING before being
+    # used, if they have not been used for this long.
+    health_check_interval: timedelta = timedelta(seconds=30)
+
+    # How often usage of the connection pool is logged.
+    # Zero disables logging.
+    pool_metrics_interval: timedelta = timedelta(seconds=60)
+
+    # Replicas, which reads of entities without locking them
+    # are sent to. Replicas are checked every
+    # `replica_max_lag` and read from only if they have
+    # received everything the primary had at the previous
+    # check, so reads are at most about twice as stale.
+    replica_urls: tuple[str, ...] = ()
+    replica_max_lag: timedelta = timedelta(seconds=1)
@@ -3,4 +3,6 @@
 # Licensed under the Personal Use License (see LICENSE).
 
 from .taskiq_ import *
+from .schedule_source import *
+from .sorted_set_scheduler import *
 from .task_scheduler import *
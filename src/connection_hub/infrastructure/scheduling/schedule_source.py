@@ -0,0 +1,104 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "schedules_by_time_key_factory",
+    "schedule_score",
+    "RedisPipelineScheduleSource",
+)
+
+from typing import Iterable
+
+from redis.asyncio.client import Pipeline
+from taskiq import ScheduleSource, ScheduledTask
+from taskiq_redis import RedisScheduleSource
+
+
+def schedules_by_time_key_factory(prefix: str) -> str:
+    """
+    Returns a key of the sorted set of ids of schedules
+    scored by the time they are due at. The key does not
+    match the pattern of keys of schedules themselves.
+    """
+    return f"{prefix}_by_time"
+
+
+def schedule_score(schedule: ScheduledTask) -> int:
+    """
+    Returns time the schedule is due at in milliseconds.
+    Schedules without time are due immediately.
+    """
+    if not schedule.time:
+        return 0
+    return int(schedule.time.timestamp() * 1000)
+
+
+class RedisPipelineScheduleSource(ScheduleSource):
+    """
+    Writes schedules the same way `RedisScheduleSource`
+    does, but buffers them in the request's pipeline instead
+    of sending them immediately, so that they are written in
+    the same transaction as lobbies and games, and are not
+    written at all if the transaction is never committed.
+    Schedules are read by the task scheduler through the
+    wrapped source.
+
+    Ids of schedules are also kept in a sorted set scored by
+    the time they are due at, so that `SortedSetScheduler`
+    reads only due schedules.
+    """
+
+    __slots__ = ("_schedule_source", "_redis_pipeline")
+
+    def __init__(
+        self,
+        schedule_source: RedisScheduleSource,
+        redis_pipeline: Pipeline,
+    ):
+        self._schedule_source = schedule_source
+        self._redis_pipeline = redis_pipeline
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        return await self._schedule_source.get_schedules()
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        await self.add_schedules([schedule])
+
+    async def add_schedules(self, schedules: Iterable[ScheduledTask]) -> None:
+        schedules = list(schedules)
+        if not schedules:
+            return
+
+        for schedule in schedules:
+            self._redis_pipeline.set(
+                self._schedule_key_factory(schedule.schedule_id),
+                self._schedule_source.serializer.dumpb(schedule.model_dump()),
+            )
+        self._redis_pipeline.zadd(
+            name=self._schedules_by_time_key,
+            mapping={
+                schedule.schedule_id: schedule_score(schedule)
+                for schedule in schedules
+            },
+        )
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        await self.delete_schedules([schedule_id])
+
+    async def delete_schedules(self, schedule_ids: Iterable[str]) -> None:
+        schedule_ids = list(schedule_ids)
+        if not schedule_ids:
+            return
+
+        self._redis_pipeline.delete(
+            *map(self._schedule_key_factory, schedule_ids),
+        )
+        self._redis_pipeline.zrem(self._schedules_by_time_key, *schedule_ids)
+
+    @property
+    def _schedules_by_time_key(self) -> str:
+        return schedules_by_time_key_factory(self._schedule_source.prefix)
+
+    def _schedule_key_factory(self, schedule_id: str) -> str:
+        return f"{self._schedule_source.prefix}:{schedule_id}"
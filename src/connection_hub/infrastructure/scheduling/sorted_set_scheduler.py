@@ -0,0 +1,352 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "SortedSetSchedulerConfig",
+    "load_sorted_set_scheduler_config",
+    "SortedSetScheduler",
+)
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import batched
+from typing import Final
+
+from redis.asyncio.client import Redis
+from taskiq import AsyncBroker, ScheduledTask
+from taskiq.kicker import AsyncKicker
+from taskiq_redis import RedisScheduleSource
+
+from connection_hub.infrastructure.utils import get_env_var, str_to_timedelta
+from .schedule_source import schedules_by_time_key_factory, schedule_score
+
+
+# Claims schedules, which are still due, by moving them in
+# the sorted set to the time their claim expires at, so that
+# other instances do not take them, and returns their ids
+# and values. Ids of schedules, which no longer exist, are
+# removed from the sorted set. Schedules are checked again,
+# since they may have been claimed by another instance after
+# they were read.
+#
+# KEYS[1] - key of the sorted set, KEYS[2..] - keys of the
+# schedules.
+# ARGV[1] - current time in milliseconds, ARGV[2] - time the
+# claim expires at in milliseconds, ARGV[3..] - ids of the
+# schedules.
+_CLAIM_SCRIPT: Final = """
+local result = {}
+for i = 2, #KEYS do
+    local schedule_id = ARGV[i + 1]
+    local score = redis.call("ZSCORE", KEYS[1], schedule_id)
+    if score and tonumber(score) <= tonumber(ARGV[1]) then
+        local value = redis.call("GET", KEYS[i])
+        if value then
+            redis.call("ZADD", KEYS[1], ARGV[2], schedule_id)
+            table.insert(result, schedule_id)
+            table.insert(result, value)
+        else
+            redis.call("ZREM", KEYS[1], schedule_id)
+        end
+    end
+end
+return result
+"""
+
+# Deletes a dispatched or undecodable schedule, unless it has
+# been replaced since it was claimed.
+#
+# KEYS[1] - key of the sorted set, KEYS[2] - key of the
+# schedule.
+# ARGV[1] - id of the schedule, ARGV[2] - claimed value.
+_COMPLETE_SCRIPT: Final = """
+if redis.call("GET", KEYS[2]) ~= ARGV[2] then
+    return 0
+end
+redis.call("ZREM", KEYS[1], ARGV[1])
+return redis.call("DEL", KEYS[2])
+"""
+
+_logger: Final = logging.getLogger(__name__)
+
+
+def load_sorted_set_scheduler_config() -> "SortedSetSchedulerConfig":
+    return SortedSetSchedulerConfig(
+        poll_interval=get_env_var(
+            key="TASK_SCHEDULER_POLL_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(milliseconds=100),
+        ),
+        batch_size=get_env_var(
+            key="TASK_SCHEDULER_BATCH_SIZE",
+            value_factory=int,
+            default=500,
+        ),
+        claim_expires_in=get_env_var(
+            key="TASK_SCHEDULER_CLAIM_EXPIRES_IN",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=30),
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class SortedSetSchedulerConfig:
+    # How long to wait before looking for due schedules
+    # again once there are none left.
+    poll_interval: timedelta = timedelta(milliseconds=100)
+
+    # Maximum number of schedules claimed at once.
+    batch_size: int = 500
+
+    # Schedules claimed by an instance, which has stopped
+    # before dispatching them, are claimed again once their
+    # claim expires.
+    claim_expires_in: timedelta = timedelta(seconds=30)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class _ClaimedSchedule:
+    schedule_id: str
+    value: bytes
+    schedule: ScheduledTask
+
+
+class SortedSetScheduler:
+    """
+    Sends tasks to the broker once their schedules are due.
+
+    Unlike the scheduler loop of taskiq, which reads every
+    schedule each second, it reads only due schedules from
+    a sorted set of ids of schedules scored by the time they
+    are due at, kept by `RedisPipelineScheduleSource`. Due
+    schedules are claimed atomically, so any number of
+    instances can run without sending a task twice.
+
+    Schedules are sent at least once: a schedule claimed by
+    an instance, which has stopped before deleting it, is
+    sent again once its claim expires.
+    """
+
+    __slots__ = (
+        "_broker",
+        "_schedule_source",
+        "_config",
+        "_redis",
+        "_claim_script",
+        "_complete_script",
+    )
+
+    def __init__(
+        self,
+        broker: AsyncBroker,
+        schedule_source: RedisScheduleSource,
+        config: SortedSetSchedulerConfig,
+    ):
+        self._broker = broker
+        self._schedule_source = schedule_source
+        self._config = config
+
+        # Values of schedules are compared with claimed ones
+        # byte by byte, so the source's own pool, which does
+        # not decode responses, is used.
+        self._redis = Redis(connection_pool=schedule_source.connection_pool)
+        self._claim_script = self._redis.register_script(_CLAIM_SCRIPT)
+        self._complete_script = self._redis.register_script(
+            _COMPLETE_SCRIPT,
+        )
+
+    async def startup(self) -> None:
+        await self._broker.startup()
+
+    async def shutdown(self) -> None:
+        await self._broker.shutdown()
+        await self._redis.aclose()
+        await self._schedule_source.shutdown()
+
+    async def run(self) -> None:
+        await self.index_schedules()
+
+        while True:
+            try:
+                dispatched = await self.dispatch_due()
+            except Exception:
+                _logger.exception("Error occurred during dispatching tasks.")
+                dispatched = 0
+
+            if dispatched < self._config.batch_size:
+                await asyncio.sleep(self._config.poll_interval.total_seconds())
+
+    async def index_schedules(self) -> int:
+        """
+        Adds schedules written before they were indexed by
+        time to the sorted set. Returns the number of added
+        schedules.
+        """
+        schedules = await self._schedule_source.get_schedules()
+
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for schedule_batch in batched(
+                schedules,
+                self._config.batch_size,
+                strict=False,
+            ):
+                pipeline.zadd(
+                    name=self._schedules_by_time_key,
+                    mapping={
+                        schedule.schedule_id: schedule_score(schedule)
+                        for schedule in schedule_batch
+                    },
+                    nx=True,
+                )
+            indexed = sum(await pipeline.execute())
+
+        if indexed:
+            _logger.info({
+                "message": "Schedules have been indexed by time.",
+                "indexed": indexed,
+            })
+
+        return indexed
+
+    async def dispatch_due(self) -> int:
+        """
+        Claims up to `batch_size` due schedules, sends their
+        tasks to the broker and deletes them. Returns the
+        number of claimed schedules.
+        """
+        claimed_schedules = await self._claim()
+        if not claimed_schedules:
+            return 0
+
+        results = await asyncio.gather(
+            *map(self._send, claimed_schedules),
+            return_exceptions=True,
+        )
+
+        sent_schedules = []
+        for claimed_schedule, result in zip(
+            claimed_schedules,
+            results,
+            strict=True,
+        ):
+            # Task is sent again once the claim expires.
+            if isinstance(result, BaseException):
+                _logger.error(
+                    {
+                        "message": "Task cannot be sent to the broker.",
+                        "schedule_id": claimed_schedule.schedule_id,
+                    },
+                    exc_info=result,
+                )
+                continue
+
+            sent_schedules.append(
+                (claimed_schedule.schedule_id, claimed_schedule.value),
+            )
+
+        await self._complete(sent_schedules)
+
+        return len(claimed_schedules)
+
+    async def _claim(self) -> list[_ClaimedSchedule]:
+        now = datetime.now(timezone.utc)
+        now_in_ms = int(now.timestamp() * 1000)
+
+        # Keys of schedules are passed to the claim script, so
+        # ids of due schedules are read beforehand.
+        raw_schedule_ids = await self._redis.zrangebyscore(
+            name=self._schedules_by_time_key,
+            min="-inf",
+            max=now_in_ms,
+            start=0,
+            num=self._config.batch_size,
+        )
+        if not raw_schedule_ids:
+            return []
+
+        ids_and_values = await self._claim_script(
+            keys=[
+                self._schedules_by_time_key,
+                *(
+                    self._schedule_key_factory(raw_schedule_id.decode())
+                    for raw_schedule_id in raw_schedule_ids
+                ),
+            ],
+            args=[
+                now_in_ms,
+                int((now + self._config.claim_expires_in).timestamp() * 1000),
+                *raw_schedule_ids,
+            ],
+        )
+
+        claimed_schedules = []
+        undecodable_schedules = []
+        for raw_schedule_id, value in zip(
+            ids_and_values[::2],
+            ids_and_values[1::2],
+            strict=True,
+        ):
+            schedule_id = raw_schedule_id.decode()
+
+            # Undecodable schedule would be claimed again and
+            # again, failing the whole batch, so it is deleted.
+            try:
+                schedule = ScheduledTask.model_validate(
+                    self._schedule_source.serializer.loadb(value),
+                )
+            except Exception:
+                _logger.exception({
+                    "message": "Schedule cannot be decoded, so it is deleted.",
+                    "schedule_id": schedule_id,
+                })
+                undecodable_schedules.append((schedule_id, value))
+                continue
+
+            claimed_schedule = _ClaimedSchedule(
+                schedule_id=schedule_id,
+                value=value,
+                schedule=schedule,
+            )
+            claimed_schedules.append(claimed_schedule)
+
+        await self._complete(undecodable_schedules)
+
+        return claimed_schedules
+
+    async def _complete(
+        self,
+        ids_and_values: list[tuple[str, bytes]],
+    ) -> None:
+        if not ids_and_values:
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipeline:
+            for schedule_id, value in ids_and_values:
+                await self._complete_script(
+                    keys=[
+                        self._schedules_by_time_key,
+                        self._schedule_key_factory(schedule_id),
+                    ],
+                    args=[schedule_id, value],
+                    client=pipeline,
+                )
+            await pipeline.execute()
+
+    async def _send(self, claimed_schedule: _ClaimedSchedule) -> None:
+        schedule = claimed_schedule.schedule
+        await (
+            AsyncKicker(schedule.task_name, self._broker, schedule.labels)
+            .with_labels(schedule_id=schedule.schedule_id)
+            .kiq(*schedule.args, **schedule.kwargs)
+        )
+
+    @property
+    def _schedules_by_time_key(self) -> str:
+        return schedules_by_time_key_factory(self._schedule_source.prefix)
+
+    def _schedule_key_factory(self, schedule_id: str) -> str:
+        return f"{self._schedule_source.prefix}:{schedule_id}"
@@ -9,7 +9,6 @@ from typing import Iterable
 from typing_extensions import Final
 
 from taskiq import ScheduledTask
-from taskiq_redis import RedisScheduleSource
 
 from connection_hub.application import (
     TryToDisqualifyPlayerCommand,
@@ -22,64 +21,64 @@ from connection_hub.application import (
     TaskScheduler,
 )
 from connection_hub.infrastructure.operation_id import OperationId
+from .schedule_source import RedisPipelineScheduleSource
 
 
 _logger: Final = logging.getLogger(__name__)
 
 
 class TaskiqTaskScheduler(TaskScheduler):
+    """
+    Schedules are buffered in the request's pipeline and
+    written when the transaction is committed.
+    """
+
     __slots__ = ("_schedule_source", "_operation_id")
 
     def __init__(
         self,
-        schedule_source: RedisScheduleSource,
+        schedule_source: RedisPipelineScheduleSource,
         operation_id: OperationId,
     ):
         self._schedule_source = schedule_source
         self._operation_id = operation_id
 
     async def schedule(self, task: Task) -> None:
-        if isinstance(task, TryToDisqualifyPlayerTask):
-            await self._schedule_try_to_disqualify_player(task)
-
-        elif isinstance(task, RemoveFromLobbyTask):
-            await self._schedule_remove_from_lobby(task)
-
-        elif isinstance(task, DisconnectFromGameTask):
-            await self._schedule_disconnect_from_game(task)
+        await self._add_schedules([self._schedule_factory(task)])
 
     async def schedule_many(self, tasks: Iterable[Task]) -> None:
-        for task in tasks:
-            await self.schedule(task)
+        schedules = [self._schedule_factory(task) for task in tasks]
+        if schedules:
+            await self._add_schedules(schedules)
 
     async def unschedule(self, task_id: str) -> None:
-        _logger.debug({
-            "message": "About to unschedule a task.",
-            "task_id": task_id,
-        })
+        await self._delete_schedules([task_id])
+
+    async def unschedule_many(self, task_ids: Iterable[str]) -> None:
+        task_ids = list(task_ids)
+        if task_ids:
+            await self._delete_schedules(task_ids)
 
-        try:
-            await self._schedule_source.delete_schedule(task_id)
-        except Exception as error:
-            error_message = "Error occurred during unscheduling a task."
-            _logger.exception(error_message)
+    def _schedule_factory(self, task: Task) -> ScheduledTask:
+        if isinstance(task, TryToDisqualifyPlayerTask):
+            return self._try_to_disqualify_player_schedule_factory(task)
 
-            raise Exception(error_message) from error
+        elif isinstance(task, RemoveFromLobbyTask):
+            return self._remove_from_lobby_schedule_factory(task)
 
-    async def unschedule_many(self, task_ids: Iterable[str]) -> None:
-        for task_id in task_ids:
-            await self.unschedule(task_id)
+        elif isinstance(task, DisconnectFromGameTask):
+            return self._disconnect_from_game_schedule_factory(task)
 
-    async def _schedule_try_to_disqualify_player(
+    def _try_to_disqualify_player_schedule_factory(
         self,
         task: TryToDisqualifyPlayerTask,
-    ) -> None:
+    ) -> ScheduledTask:
         command = TryToDisqualifyPlayerCommand(
             game_id=task.game_id,
             player_id=task.player_id,
             player_state_id=task.player_state_id,
         )
-        schedule = ScheduledTask(
+        return ScheduledTask(
             task_name="try_to_disqualify_player",
             labels={},
             args=[self._operation_id],
@@ -88,17 +87,15 @@ class TaskiqTaskScheduler(TaskScheduler):
             time=task.execute_at,
         )
 
-        await self._add_schedule(schedule)
-
-    async def _schedule_remove_from_lobby(
+    def _remove_from_lobby_schedule_factory(
         self,
         task: RemoveFromLobbyTask,
-    ) -> None:
+    ) -> ScheduledTask:
         command = RemoveFromLobbyCommand(
             lobby_id=task.lobby_id,
             user_id=task.user_id,
         )
-        schedule = ScheduledTask(
+        return ScheduledTask(
             task_name="remove_from_lobby",
             labels={},
             args=[self._operation_id],
@@ -107,17 +104,15 @@ class TaskiqTaskScheduler(TaskScheduler):
             time=task.execute_at,
         )
 
-        await self._add_schedule(schedule)
-
-    async def _schedule_disconnect_from_game(
+    def _disconnect_from_game_schedule_factory(
         self,
         task: DisconnectFromGameTask,
-    ) -> None:
+    ) -> ScheduledTask:
         command = DisconnectFromGameCommand(
             game_id=task.game_id,
             user_id=task.player_id,
         )
-        schedule = ScheduledTask(
+        return ScheduledTask(
             task_name="disconnect_from_game",
             labels={},
             args=[self._operation_id],
@@ -126,18 +121,18 @@ class TaskiqTaskScheduler(TaskScheduler):
             time=task.execute_at,
         )
 
-        await self._add_schedule(schedule)
-
-    async def _add_schedule(self, schedule: ScheduledTask) -> None:
+    async def _add_schedules(self, schedules: list[ScheduledTask]) -> None:
         _logger.debug({
-            "message": "About to schedule a task.",
-            "task": schedule.model_dump(mode="json"),
+            "message": "About to schedule tasks.",
+            "tasks": [
+                schedule.model_dump(mode="json") for schedule in schedules
+            ],
         })
+        await self._schedule_source.add_schedules(schedules)
 
-        try:
-            await self._schedule_source.add_schedule(schedule)
-        except Exception as error:
-            error_message = "Error occurred during scheduling a task."
-            _logger.exception(error_message)
-
-            raise Exception(error_message) from error
+    async def _delete_schedules(self, task_ids: list[str]) -> None:
+        _logger.debug({
+            "message": "About to unschedule tasks.",
+            "task_ids": task_ids,
+        })
+        await self._schedule_source.delete_schedules(task_ids)
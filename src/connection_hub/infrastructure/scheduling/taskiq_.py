@@ -2,8 +2,12 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("taskiq_redis_schedule_source_factory",)
+__all__ = (
+    "taskiq_redis_schedule_source_factory",
+    "shared_taskiq_redis_schedule_source_factory",
+)
 
+from redis.asyncio.connection import BlockingConnectionPool
 from taskiq_redis import RedisScheduleSource
 
 from connection_hub.infrastructure.redis_config import RedisConfig
@@ -12,4 +16,31 @@ from connection_hub.infrastructure.redis_config import RedisConfig
 def taskiq_redis_schedule_source_factory(
     redis_config: RedisConfig,
 ) -> RedisScheduleSource:
-    return RedisScheduleSource(url=redis_config.url)
+    """
+    Returns a schedule source with a connection pool of its
+    own, which is used by the scheduler to read schedules.
+    """
+    return RedisScheduleSource(
+        url=redis_config.url,
+        max_connection_pool_size=redis_config.max_connections,
+    )
+
+
+def shared_taskiq_redis_schedule_source_factory(
+    redis_config: RedisConfig,
+    connection_pool: BlockingConnectionPool,
+) -> RedisScheduleSource:
+    """
+    Returns a schedule source using the connection pool
+    shared with other clients of redis.
+    """
+    schedule_source = taskiq_redis_schedule_source_factory(redis_config)
+
+    # Schedule source creates a pool of its own, which opens
+    # no connections until used, so it can be replaced.
+    # Application never reads schedules, it only adds and
+    # deletes them, so decoding of responses by the shared
+    # pool does not affect it.
+    schedule_source.connection_pool = connection_pool
+
+    return schedule_source
@@ -0,0 +1,25 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("load_timeout_policy",)
+
+from datetime import timedelta
+
+from connection_hub.application import TimeoutPolicy
+from connection_hub.infrastructure.utils import get_env_var, str_to_timedelta
+
+
+def load_timeout_policy() -> TimeoutPolicy:
+    return TimeoutPolicy(
+        presence_window=get_env_var(
+            key="PRESENCE_WINDOW",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=15),
+        ),
+        connect_four_time_for_reconnect=get_env_var(
+            key="CONNECT_FOUR_TIME_FOR_RECONNECT",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=40),
+        ),
+    )
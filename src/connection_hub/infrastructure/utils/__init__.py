@@ -4,3 +4,4 @@
 
 from .get_env_var_ import *
 from .str_to_timedelta_ import *
+from .str_to_bool_ import *
@@ -56,7 +56,7 @@ def get_env_var[T: Any, D: Any](
     """
     value = os.getenv(key)
     if not value:
-        if default:
+        if default is not None:
             return default
 
         raise Exception(f"Env var {key} doesn't exist.")
@@ -0,0 +1,19 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("str_to_bool",)
+
+
+def str_to_bool(value: str) -> bool:
+    """
+    Converts a string such as 'true', '1', 'yes' or 'false',
+    '0', 'no' into a bool.
+    """
+    normalized_value = value.strip().lower()
+    if normalized_value in ("true", "1", "yes", "on"):
+        return True
+    if normalized_value in ("false", "0", "no", "off"):
+        return False
+
+    raise ValueError(f"Cannot convert '{value}' to bool.")
@@ -9,8 +9,8 @@ from datetime import timedelta
 
 def str_to_timedelta(value: str) -> timedelta:
     """
-    Converts a string representing seconds into a
-    timedelta object.
+    Converts a string representing seconds, possibly
+    fractional, into a timedelta object.
     """
-    value_as_int = int(value)
-    return timedelta(seconds=value_as_int)
+    value_as_float = float(value)
+    return timedelta(seconds=value_as_float)
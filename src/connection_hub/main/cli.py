@@ -8,7 +8,6 @@ from typing import Annotated
 
 from cyclopts import App, Parameter
 from faststream.cli.main import cli as run_faststream
-from taskiq.cli.scheduler.run import run_scheduler_loop
 from taskiq.cli.worker.args import WorkerArgs
 from taskiq.cli.worker.run import run_worker
 
@@ -18,6 +17,20 @@ from connection_hub.infrastructure import (
     nats_client_factory,
     nats_jetstream_factory,
     NATSStreamCreator,
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    RedisStorageMigrator,
+    RedisReaper,
+    load_lobby_mapper_config,
+    load_game_mapper_config,
+)
+from connection_hub.presentation.task_executor import (
+    ioc_container_factory as task_executor_ioc_container_factory,
+    load_matchmaker_config,
+    Matchmaker,
+    load_presence_sweeper_config,
+    PresenceSweeper,
 )
 from .task_scheduler import create_task_scheduler_app
 
@@ -37,10 +50,14 @@ def create_cli_app() -> App:
     )
 
     app.command(create_nats_streams)
+    app.command(migrate_redis_storage)
+    app.command(reap_redis_storage)
 
     app.command(run_message_consumer)
     app.command(run_task_scheduler)
     app.command(run_task_executor)
+    app.command(run_matchmaker)
+    app.command(run_presence_sweeper)
 
     return app
 
@@ -56,6 +73,36 @@ async def create_nats_streams(nats_url: str) -> None:
         await stream_creator.create()
 
 
+async def migrate_redis_storage(redis_url: str) -> None:
+    """
+    Move lobbies and games stored by previous versions
+    to the current storage layout.
+    """
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            storage_migrator = RedisStorageMigrator(redis)
+            await storage_migrator.migrate()
+
+
+async def reap_redis_storage(redis_url: str) -> None:
+    """
+    Set expiration times of lobbies, games and index entries
+    left without them, delete index entries of missing
+    lobbies and games and locks, which can never expire,
+    and log the size of the keyspace.
+    """
+    redis_config = RedisConfig(url=redis_url)
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            reaper = RedisReaper(
+                redis,
+                lobby_expires_in=load_lobby_mapper_config().lobby_expires_in,
+                game_expires_in=load_game_mapper_config().game_expires_in,
+            )
+            await reaper.reap()
+
+
 def run_message_consumer(
     workers: Annotated[
         str,
@@ -78,8 +125,10 @@ async def run_task_scheduler() -> None:
     """Run task scheduler."""
     task_scheduler = create_task_scheduler_app()
     await task_scheduler.startup()
-    await run_scheduler_loop(task_scheduler)
-    await task_scheduler.shutdown()
+    try:
+        await task_scheduler.run()
+    finally:
+        await task_scheduler.shutdown()
 
 
 def run_task_executor(
@@ -97,3 +146,36 @@ def run_task_executor(
         configure_logging=False,
     )
     run_worker(worker_args)
+
+
+async def run_matchmaker() -> None:
+    """
+    Run matchmaker, which pairs users waiting in matchmaking
+    queues and creates a lobby for each pair.
+    """
+    ioc_container = task_executor_ioc_container_factory()
+    matchmaker = Matchmaker(
+        ioc_container=ioc_container,
+        config=load_matchmaker_config(),
+    )
+    try:
+        await matchmaker.run()
+    finally:
+        await ioc_container.close()
+
+
+async def run_presence_sweeper() -> None:
+    """
+    Run presence sweeper, which removes users, who have
+    stopped acknowledging presence, from lobbies and
+    disconnects them from games.
+    """
+    ioc_container = task_executor_ioc_container_factory()
+    presence_sweeper = PresenceSweeper(
+        ioc_container=ioc_container,
+        config=load_presence_sweeper_config(),
+    )
+    try:
+        await presence_sweeper.run()
+    finally:
+        await ioc_container.close()
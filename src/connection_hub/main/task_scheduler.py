@@ -2,25 +2,31 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-from taskiq import TaskiqScheduler
 from taskiq_nats import PullBasedJetStreamBroker
 
 from connection_hub.infrastructure import (
     load_nats_config,
     load_redis_config,
+    load_sorted_set_scheduler_config,
     taskiq_redis_schedule_source_factory,
+    SortedSetScheduler,
 )
 
 
-def create_task_scheduler_app() -> TaskiqScheduler:
+def create_task_scheduler_app() -> SortedSetScheduler:
     nats_config = load_nats_config()
     redis_config = load_redis_config()
+    sorted_set_scheduler_config = load_sorted_set_scheduler_config()
 
     broker = PullBasedJetStreamBroker(
         [nats_config.url],
         pull_consume_timeout=0.2,
     )
     schedule_source = taskiq_redis_schedule_source_factory(redis_config)
-    app = TaskiqScheduler(broker, [schedule_source])
+    app = SortedSetScheduler(
+        broker=broker,
+        schedule_source=schedule_source,
+        config=sorted_set_scheduler_config,
+    )
 
     return app
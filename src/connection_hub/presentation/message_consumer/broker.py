@@ -8,7 +8,11 @@ from faststream import ExceptionMiddleware
 from connection_hub.domain import DomainError
 from connection_hub.application import ApplicationError
 from .routes import router
-from .middlewares import OperationIdMiddleware, LoggingMiddleware
+from .middlewares import (
+    OperationIdMiddleware,
+    LoggingMiddleware,
+    TransactionConflictRetryMiddleware,
+)
 
 
 def create_broker(nats_url: str) -> NatsBroker:
@@ -22,6 +26,7 @@ def create_broker(nats_url: str) -> NatsBroker:
         OperationIdMiddleware,
         LoggingMiddleware,
         exception_middleware,
+        TransactionConflictRetryMiddleware,
     ]
     broker = NatsBroker(
         nats_url,
@@ -23,6 +23,10 @@ from connection_hub.domain import (
 from connection_hub.application import (
     LobbyGateway,
     GameGateway,
+    MembershipGateway,
+    MatchmakingQueue,
+    PresenceTracker,
+    TimeoutPolicy,
     EventPublisher,
     TaskScheduler,
     CentrifugoClient,
@@ -34,6 +38,8 @@ from connection_hub.application import (
     JoinLobbyProcessor,
     LeaveLobbyProcessor,
     KickFromLobbyProcessor,
+    ListOpenLobbiesProcessor,
+    EnterMatchmakingProcessor,
     CreateGameProcessor,
     AcknowledgePresenceProcessor,
     ReconnectToGameProcessor,
@@ -43,28 +49,46 @@ from connection_hub.infrastructure import (
     CentrifugoConfig,
     load_centrifugo_config,
     HTTPXCentrifugoClient,
+    redis_connection_pool_factory,
     redis_factory,
     redis_pipeline_factory,
+    replica_router_factory,
+    NearCacheConfig,
+    load_near_cache_config,
+    near_cache_factory,
+    EntityCodecConfig,
+    load_entity_codec_config,
+    EntityCodec,
     LobbyMapperConfig,
     load_lobby_mapper_config,
     LobbyMapper,
     GameMapperConfig,
     load_game_mapper_config,
     GameMapper,
+    MembershipMapper,
+    MatchmakingQueueConfig,
+    load_matchmaking_queue_config,
+    RedisMatchmakingQueue,
+    RedisPresenceTracker,
     LockManagerConfig,
     load_lock_manager_config,
+    lock_release_listener_factory,
     lock_manager_factory,
+    VersionTracker,
     RedisTransactionManager,
     NATSConfig,
     load_nats_config,
     nats_client_factory,
     nats_jetstream_factory,
     NATSEventPublisher,
-    taskiq_redis_schedule_source_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    RedisPipelineScheduleSource,
     TaskiqTaskScheduler,
     RedisConfig,
     load_redis_config,
+    load_timeout_policy,
     common_retort_factory,
+    converters_factory,
     get_operation_id,
 )
 from .identity_provider import MessageBrokerIdentityProvider
@@ -76,32 +100,66 @@ def ioc_container_factory(context: dict | None = None) -> AsyncContainer:
     context = context or {
         CentrifugoConfig: load_centrifugo_config(),
         RedisConfig: load_redis_config(),
+        EntityCodecConfig: load_entity_codec_config(),
+        NearCacheConfig: load_near_cache_config(),
         LobbyMapperConfig: load_lobby_mapper_config(),
         GameMapperConfig: load_game_mapper_config(),
+        MatchmakingQueueConfig: load_matchmaking_queue_config(),
         LockManagerConfig: load_lock_manager_config(),
         NATSConfig: load_nats_config(),
+        TimeoutPolicy: load_timeout_policy(),
     }
 
     provider.from_context(CentrifugoConfig, scope=Scope.APP)
     provider.from_context(RedisConfig, scope=Scope.APP)
+    provider.from_context(EntityCodecConfig, scope=Scope.APP)
+    provider.from_context(NearCacheConfig, scope=Scope.APP)
     provider.from_context(LobbyMapperConfig, scope=Scope.APP)
     provider.from_context(GameMapperConfig, scope=Scope.APP)
+    provider.from_context(MatchmakingQueueConfig, scope=Scope.APP)
     provider.from_context(LockManagerConfig, scope=Scope.APP)
     provider.from_context(NATSConfig, scope=Scope.APP)
+    provider.from_context(TimeoutPolicy, scope=Scope.APP)
 
     provider.provide(get_operation_id, scope=Scope.REQUEST)
     provider.provide(common_retort_factory, scope=Scope.APP)
+    provider.provide(converters_factory, scope=Scope.APP)
 
     provider.provide(httpx_client_factory, scope=Scope.APP)
+    provider.provide(redis_connection_pool_factory, scope=Scope.APP)
     provider.provide(redis_factory, scope=Scope.APP)
     provider.provide(redis_pipeline_factory, scope=Scope.REQUEST)
+    provider.provide(replica_router_factory, scope=Scope.APP)
+    provider.provide(near_cache_factory, scope=Scope.APP)
     provider.provide(nats_client_factory, scope=Scope.APP)
     provider.provide(nats_jetstream_factory, scope=Scope.APP)
-    provider.provide(taskiq_redis_schedule_source_factory, scope=Scope.APP)
+    provider.provide(
+        shared_taskiq_redis_schedule_source_factory,
+        scope=Scope.APP,
+    )
+    provider.provide(RedisPipelineScheduleSource, scope=Scope.REQUEST)
 
+    provider.provide(EntityCodec, scope=Scope.APP)
+    provider.provide(lock_release_listener_factory, scope=Scope.APP)
     provider.provide(lock_manager_factory, scope=Scope.REQUEST)
+    provider.provide(VersionTracker, scope=Scope.REQUEST)
     provider.provide(LobbyMapper, scope=Scope.REQUEST, provides=LobbyGateway)
     provider.provide(GameMapper, scope=Scope.REQUEST, provides=GameGateway)
+    provider.provide(
+        MembershipMapper,
+        scope=Scope.REQUEST,
+        provides=MembershipGateway,
+    )
+    provider.provide(
+        RedisMatchmakingQueue,
+        scope=Scope.REQUEST,
+        provides=MatchmakingQueue,
+    )
+    provider.provide(
+        RedisPresenceTracker,
+        scope=Scope.APP,
+        provides=PresenceTracker,
+    )
     provider.provide(
         RedisTransactionManager,
         scope=Scope.REQUEST,
@@ -140,6 +198,8 @@ def ioc_container_factory(context: dict | None = None) -> AsyncContainer:
     provider.provide(JoinLobbyProcessor, scope=Scope.REQUEST)
     provider.provide(LeaveLobbyProcessor, scope=Scope.REQUEST)
     provider.provide(KickFromLobbyProcessor, scope=Scope.REQUEST)
+    provider.provide(ListOpenLobbiesProcessor, scope=Scope.REQUEST)
+    provider.provide(EnterMatchmakingProcessor, scope=Scope.REQUEST)
     provider.provide(CreateGameProcessor, scope=Scope.REQUEST)
     provider.provide(StartGameProcessor, scope=Scope.REQUEST)
     provider.provide(EndGameProcessor, scope=Scope.REQUEST)
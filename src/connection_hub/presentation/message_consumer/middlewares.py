@@ -2,11 +2,18 @@
 # All rights reserved.
 # Licensed under the Personal Use License (see LICENSE).
 
-__all__ = ("OperationIdMiddleware", "LoggingMiddleware")
+__all__ = (
+    "OperationIdMiddleware",
+    "LoggingMiddleware",
+    "TransactionConflictRetryMiddleware",
+)
 
+import asyncio
 import logging
+import random
+from datetime import timedelta
 from uuid import UUID
-from typing import Any, Final
+from typing import Any, Awaitable, Callable, Final
 
 from faststream import BaseMiddleware
 from faststream.broker.message import StreamMessage
@@ -15,11 +22,18 @@ from connection_hub.infrastructure import (
     OperationId,
     set_operation_id,
     default_operation_id_factory,
+    TransactionConflictError,
 )
 
 
 _logger: Final = logging.getLogger(__name__)
 
+_MAX_TRANSACTION_CONFLICT_RETRIES: Final = 5
+
+# Maximum delay before the first retry, doubled on every
+# following one.
+_TRANSACTION_CONFLICT_RETRY_DELAY: Final = timedelta(milliseconds=20)
+
 
 class OperationIdMiddleware(BaseMiddleware):
     async def on_consume[T: Any = Any](
@@ -105,3 +119,43 @@ class LoggingMiddleware(BaseMiddleware):
             raise Exception(error_message)
 
         return await super().on_consume(msg)
+
+
+class TransactionConflictRetryMiddleware(BaseMiddleware):
+    """
+    Processes a message again if its transaction conflicted
+    with a concurrent one. Each attempt is processed within
+    a new request scope, so entities are loaded again.
+
+    Retries are delayed by a random time, so that messages,
+    which have conflicted with each other, are not processed
+    at the same moment again.
+    """
+
+    async def consume_scope(
+        self,
+        call_next: Callable[[StreamMessage[Any]], Awaitable[object]],
+        msg: StreamMessage[Any],
+    ) -> object:
+        retries = 0
+
+        while True:
+            try:
+                return await call_next(msg)
+            except TransactionConflictError:
+                if retries >= _MAX_TRANSACTION_CONFLICT_RETRIES:
+                    raise
+
+                max_delay = _TRANSACTION_CONFLICT_RETRY_DELAY * 2**retries
+                delay = random.uniform(0, max_delay.total_seconds())
+                retries += 1
+
+                _logger.info({
+                    "message": (
+                        "Transaction conflicted with a concurrent one. "
+                        "Message will be processed again."
+                    ),
+                    "retries": retries,
+                    "delay": delay,
+                })
+                await asyncio.sleep(delay)
@@ -7,6 +7,8 @@ __all__ = (
     "join_lobby",
     "leave_lobby",
     "kick_from_lobby",
+    "list_open_lobbies",
+    "enter_matchmaking",
     "create_game",
     "start_game",
     "end_game",
@@ -28,6 +30,10 @@ from connection_hub.application import (
     LeaveLobbyProcessor,
     KickFromLobbyCommand,
     KickFromLobbyProcessor,
+    ListOpenLobbiesQuery,
+    ListOpenLobbiesProcessor,
+    EnterMatchmakingCommand,
+    EnterMatchmakingProcessor,
     CreateGameCommand,
     CreateGameProcessor,
     StartGameCommand,
@@ -37,6 +43,7 @@ from connection_hub.application import (
     AcknowledgePresenceProcessor,
     ReconnectToGameCommand,
     ReconnectToGameProcessor,
+    Serializable,
 )
 
 
@@ -105,6 +112,35 @@ async def kick_from_lobby(
     await command_processor.process(command)
 
 
+# Snapshot of the lobby browser is requested and returned
+# in reply, so the subscriber is not durable.
+@router.subscriber(
+    subject="gaems12.api_gateway.lobby_browser.snapshot_requested",
+)
+@inject
+async def list_open_lobbies(
+    *,
+    query: ListOpenLobbiesQuery,
+    query_processor: FromDishka[ListOpenLobbiesProcessor],
+) -> Serializable:
+    return await query_processor.process(query)
+
+
+@router.subscriber(
+    subject="gaems12.api_gateway.matchmaking.entered",
+    durable="connection_hub_matchmaking_entered",
+    stream=_STREAM,
+    pull_sub=PullSub(timeout=0.2),
+)
+@inject
+async def enter_matchmaking(
+    *,
+    command: EnterMatchmakingCommand,
+    command_processor: FromDishka[EnterMatchmakingProcessor],
+) -> None:
+    await command_processor.process(command)
+
+
 @router.subscriber(
     subject="gaems12.api_gateway.game.created",
     durable="connection_hub_game_created",
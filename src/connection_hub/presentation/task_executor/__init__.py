@@ -4,3 +4,5 @@
 
 from .broker import *
 from .ioc_container import *
+from .matchmaker import *
+from .presence_sweeper import *
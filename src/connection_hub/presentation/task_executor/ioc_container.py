@@ -13,6 +13,8 @@ from dishka import (
 from dishka.integrations.taskiq import TaskiqProvider
 
 from connection_hub.domain import (
+    CreateLobby,
+    JoinLobby,
     RemoveFromLobby,
     DisconnectFromGame,
     TryToDisqualifyPlayer,
@@ -20,6 +22,9 @@ from connection_hub.domain import (
 from connection_hub.application import (
     LobbyGateway,
     GameGateway,
+    MatchmakingQueue,
+    PresenceTracker,
+    TimeoutPolicy,
     EventPublisher,
     TaskScheduler,
     CentrifugoClient,
@@ -27,34 +32,53 @@ from connection_hub.application import (
     RemoveFromLobbyProcessor,
     DisconnectFromGameProcessor,
     TryToDisqualifyPlayerProcessor,
+    MatchPlayersProcessor,
+    EvictAbsentUsersProcessor,
 )
 from connection_hub.infrastructure import (
     httpx_client_factory,
     CentrifugoConfig,
     load_centrifugo_config,
     HTTPXCentrifugoClient,
+    redis_connection_pool_factory,
     redis_factory,
     redis_pipeline_factory,
+    replica_router_factory,
+    NearCacheConfig,
+    load_near_cache_config,
+    near_cache_factory,
+    EntityCodecConfig,
+    load_entity_codec_config,
+    EntityCodec,
     LobbyMapperConfig,
     load_lobby_mapper_config,
     LobbyMapper,
     GameMapperConfig,
     load_game_mapper_config,
     GameMapper,
+    MatchmakingQueueConfig,
+    load_matchmaking_queue_config,
+    RedisMatchmakingQueue,
+    RedisPresenceTracker,
     LockManagerConfig,
     load_lock_manager_config,
+    lock_release_listener_factory,
     lock_manager_factory,
+    VersionTracker,
     RedisTransactionManager,
     NATSConfig,
     load_nats_config,
     nats_client_factory,
     nats_jetstream_factory,
     NATSEventPublisher,
-    taskiq_redis_schedule_source_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    RedisPipelineScheduleSource,
     TaskiqTaskScheduler,
     RedisConfig,
     load_redis_config,
+    load_timeout_policy,
     common_retort_factory,
+    converters_factory,
     get_operation_id,
 )
 
@@ -65,32 +89,61 @@ def ioc_container_factory(context: dict | None = None) -> AsyncContainer:
     context = context or {
         CentrifugoConfig: load_centrifugo_config(),
         RedisConfig: load_redis_config(),
+        EntityCodecConfig: load_entity_codec_config(),
+        NearCacheConfig: load_near_cache_config(),
         LobbyMapperConfig: load_lobby_mapper_config(),
         GameMapperConfig: load_game_mapper_config(),
+        MatchmakingQueueConfig: load_matchmaking_queue_config(),
         LockManagerConfig: load_lock_manager_config(),
         NATSConfig: load_nats_config(),
+        TimeoutPolicy: load_timeout_policy(),
     }
 
     provider.from_context(CentrifugoConfig, scope=Scope.APP)
     provider.from_context(RedisConfig, scope=Scope.APP)
+    provider.from_context(EntityCodecConfig, scope=Scope.APP)
+    provider.from_context(NearCacheConfig, scope=Scope.APP)
     provider.from_context(LobbyMapperConfig, scope=Scope.APP)
     provider.from_context(GameMapperConfig, scope=Scope.APP)
+    provider.from_context(MatchmakingQueueConfig, scope=Scope.APP)
     provider.from_context(LockManagerConfig, scope=Scope.APP)
     provider.from_context(NATSConfig, scope=Scope.APP)
+    provider.from_context(TimeoutPolicy, scope=Scope.APP)
 
     provider.provide(get_operation_id, scope=Scope.REQUEST)
     provider.provide(common_retort_factory, scope=Scope.APP)
+    provider.provide(converters_factory, scope=Scope.APP)
 
     provider.provide(httpx_client_factory, scope=Scope.APP)
+    provider.provide(redis_connection_pool_factory, scope=Scope.APP)
     provider.provide(redis_factory, scope=Scope.APP)
     provider.provide(redis_pipeline_factory, scope=Scope.REQUEST)
+    provider.provide(replica_router_factory, scope=Scope.APP)
+    provider.provide(near_cache_factory, scope=Scope.APP)
     provider.provide(nats_client_factory, scope=Scope.APP)
     provider.provide(nats_jetstream_factory, scope=Scope.APP)
-    provider.provide(taskiq_redis_schedule_source_factory, scope=Scope.APP)
+    provider.provide(
+        shared_taskiq_redis_schedule_source_factory,
+        scope=Scope.APP,
+    )
+    provider.provide(RedisPipelineScheduleSource, scope=Scope.REQUEST)
 
+    provider.provide(EntityCodec, scope=Scope.APP)
+    provider.provide(lock_release_listener_factory, scope=Scope.APP)
     provider.provide(lock_manager_factory, scope=Scope.REQUEST)
+    provider.provide(VersionTracker, scope=Scope.REQUEST)
     provider.provide(LobbyMapper, provides=LobbyGateway, scope=Scope.REQUEST)
     provider.provide(GameMapper, provides=GameGateway, scope=Scope.REQUEST)
+    provider.provide(
+        RedisMatchmakingQueue,
+        provides=MatchmakingQueue,
+        scope=Scope.REQUEST,
+    )
+    provider.provide(
+        RedisPresenceTracker,
+        provides=PresenceTracker,
+        scope=Scope.APP,
+    )
     provider.provide(
         RedisTransactionManager,
         provides=TransactionManager,
@@ -113,6 +166,8 @@ def ioc_container_factory(context: dict | None = None) -> AsyncContainer:
         provides=TaskScheduler,
     )
 
+    provider.provide(CreateLobby, scope=Scope.APP)
+    provider.provide(JoinLobby, scope=Scope.APP)
     provider.provide(RemoveFromLobby, scope=Scope.APP)
     provider.provide(DisconnectFromGame, scope=Scope.APP)
     provider.provide(TryToDisqualifyPlayer, scope=Scope.APP)
@@ -120,5 +175,7 @@ def ioc_container_factory(context: dict | None = None) -> AsyncContainer:
     provider.provide(RemoveFromLobbyProcessor, scope=Scope.REQUEST)
     provider.provide(DisconnectFromGameProcessor, scope=Scope.REQUEST)
     provider.provide(TryToDisqualifyPlayerProcessor, scope=Scope.REQUEST)
+    provider.provide(MatchPlayersProcessor, scope=Scope.REQUEST)
+    provider.provide(EvictAbsentUsersProcessor, scope=Scope.REQUEST)
 
     return make_async_container(provider, TaskiqProvider(), context=context)
@@ -0,0 +1,104 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = ("MatchmakerConfig", "load_matchmaker_config", "Matchmaker")
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Final
+
+from dishka import AsyncContainer
+
+from connection_hub.application import (
+    MatchPlayersCommand,
+    MatchPlayersProcessor,
+)
+from connection_hub.infrastructure import (
+    get_env_var,
+    str_to_timedelta,
+    set_operation_id,
+    default_operation_id_factory,
+)
+
+
+_logger: Final = logging.getLogger(__name__)
+
+
+def load_matchmaker_config() -> "MatchmakerConfig":
+    return MatchmakerConfig(
+        interval=get_env_var(
+            key="MATCHMAKER_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(milliseconds=500),
+        ),
+        max_pairs_per_rule_set=get_env_var(
+            key="MATCHMAKER_MAX_PAIRS_PER_RULE_SET",
+            value_factory=int,
+            default=500,
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class MatchmakerConfig:
+    # How long to wait before the next round once queues
+    # have been drained.
+    interval: timedelta = timedelta(milliseconds=500)
+
+    # Maximum number of pairs taken from a single queue in
+    # one round, i.e. in one transaction.
+    max_pairs_per_rule_set: int = 500
+
+
+class Matchmaker:
+    """
+    Matches users waiting in matchmaking queues in rounds.
+    Each round is processed in a request scope of its own,
+    and rounds follow each other without a pause while
+    queues have more users than can be matched in one round.
+    """
+
+    __slots__ = ("_ioc_container", "_config")
+
+    def __init__(
+        self,
+        ioc_container: AsyncContainer,
+        config: MatchmakerConfig,
+    ):
+        self._ioc_container = ioc_container
+        self._config = config
+
+    async def run(self) -> None:
+        while True:
+            matched_pairs = await self.run_round()
+            if matched_pairs < self._config.max_pairs_per_rule_set:
+                await asyncio.sleep(self._config.interval.total_seconds())
+
+    async def run_round(self) -> int:
+        set_operation_id(default_operation_id_factory())
+        command = MatchPlayersCommand(
+            max_pairs_per_rule_set=self._config.max_pairs_per_rule_set,
+        )
+
+        try:
+            async with self._ioc_container() as request_container:
+                command_processor = await request_container.get(
+                    MatchPlayersProcessor,
+                )
+                matched_pairs = await command_processor.process(command)
+        except Exception:
+            # Tickets are removed only together with creating
+            # lobbies, so they are matched in the next round.
+            _logger.exception("Error occurred during matching players.")
+            return 0
+
+        if matched_pairs:
+            _logger.info({
+                "message": "Players have been matched.",
+                "matched_pairs": matched_pairs,
+            })
+
+        return matched_pairs
@@ -0,0 +1,154 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+__all__ = (
+    "PresenceSweeperConfig",
+    "load_presence_sweeper_config",
+    "PresenceSweeper",
+)
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Final
+
+from dishka import AsyncContainer
+
+from connection_hub.domain import DomainError
+from connection_hub.application import (
+    ApplicationError,
+    RemoveFromLobbyCommand,
+    RemoveFromLobbyProcessor,
+    DisconnectFromGameCommand,
+    DisconnectFromGameProcessor,
+    EvictAbsentUsersCommand,
+    EvictAbsentUsersProcessor,
+)
+from connection_hub.infrastructure import (
+    get_env_var,
+    str_to_timedelta,
+    set_operation_id,
+    default_operation_id_factory,
+)
+
+
+_logger: Final = logging.getLogger(__name__)
+
+
+def load_presence_sweeper_config() -> "PresenceSweeperConfig":
+    return PresenceSweeperConfig(
+        interval=get_env_var(
+            key="PRESENCE_SWEEPER_INTERVAL",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=1),
+        ),
+        max_users_per_round=get_env_var(
+            key="PRESENCE_SWEEPER_MAX_USERS_PER_ROUND",
+            value_factory=int,
+            default=1000,
+        ),
+        claim_expires_in=get_env_var(
+            key="PRESENCE_SWEEPER_CLAIM_EXPIRES_IN",
+            value_factory=str_to_timedelta,
+            default=timedelta(seconds=30),
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class PresenceSweeperConfig:
+    # How long to wait before the next round once absent
+    # users have been evicted.
+    interval: timedelta = timedelta(seconds=1)
+
+    # Maximum number of users evicted in one round.
+    max_users_per_round: int = 1000
+
+    # Users, whose eviction has failed or has been cut short
+    # by a stopped instance, are evicted again once their
+    # claim expires.
+    claim_expires_in: timedelta = timedelta(seconds=30)
+
+
+class PresenceSweeper:
+    """
+    Evicts users, who have stopped acknowledging presence,
+    in rounds. Absent users are taken in a request scope of
+    its own, and each of them is then removed from their
+    lobby or disconnected from their game concurrently, each
+    in a request scope of its own, the same way scheduled
+    tasks used to do it.
+    """
+
+    __slots__ = ("_ioc_container", "_config")
+
+    def __init__(
+        self,
+        ioc_container: AsyncContainer,
+        config: PresenceSweeperConfig,
+    ):
+        self._ioc_container = ioc_container
+        self._config = config
+
+    async def run(self) -> None:
+        while True:
+            evicted_users = await self.run_round()
+            if evicted_users < self._config.max_users_per_round:
+                await asyncio.sleep(self._config.interval.total_seconds())
+
+    async def run_round(self) -> int:
+        set_operation_id(default_operation_id_factory())
+        command = EvictAbsentUsersCommand(
+            max_users=self._config.max_users_per_round,
+            claim_expires_in=self._config.claim_expires_in,
+        )
+
+        try:
+            async with self._ioc_container() as request_container:
+                command_processor = await request_container.get(
+                    EvictAbsentUsersProcessor,
+                )
+                commands = await command_processor.process(command)
+        except Exception:
+            _logger.exception("Error occurred during evicting absent users.")
+            return 0
+
+        await asyncio.gather(*map(self._evict, commands))
+
+        if commands:
+            _logger.info({
+                "message": "Absent users have been evicted.",
+                "evicted_users": len(commands),
+            })
+
+        return len(commands)
+
+    async def _evict(
+        self,
+        command: RemoveFromLobbyCommand | DisconnectFromGameCommand,
+    ) -> None:
+        # Each eviction runs in a task of its own, so that
+        # it has an operation id of its own.
+        set_operation_id(default_operation_id_factory())
+
+        try:
+            async with self._ioc_container() as request_container:
+                if isinstance(command, RemoveFromLobbyCommand):
+                    remove_from_lobby_processor = await request_container.get(
+                        RemoveFromLobbyProcessor,
+                    )
+                    await remove_from_lobby_processor.process(command)
+                else:
+                    disconnect_from_game_processor = (
+                        await request_container.get(
+                            DisconnectFromGameProcessor,
+                        )
+                    )
+                    await disconnect_from_game_processor.process(command)
+        except (DomainError, ApplicationError):
+            # User has left the lobby or the game meanwhile.
+            return
+        except Exception:
+            _logger.exception("Error occurred during evicting absent user.")
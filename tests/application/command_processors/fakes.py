@@ -11,12 +11,22 @@ from connection_hub.domain import (
     GameId,
     UserId,
     PlayerStateId,
+    ConnectFourLobby,
+    RuleSet,
     Lobby,
     Game,
 )
 from connection_hub.application import (
+    RuleSetType,
+    OpenLobbyFilters,
+    OpenLobbiesPage,
     LobbyGateway,
     GameGateway,
+    Membership,
+    MembershipGateway,
+    MatchmakingTicket,
+    MatchmakingQueue,
+    PresenceTracker,
     Event,
     EventPublisher,
     Task,
@@ -59,6 +69,61 @@ class FakeLobbyGateway(LobbyGateway):
                 return lobby
         return None
 
+    async def by_ids(
+        self,
+        lobby_ids: Iterable[LobbyId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        lobbies = []
+        for lobby_id in dict.fromkeys(lobby_ids):
+            lobby = self._lobbies.get(lobby_id, None)
+            if lobby:
+                lobbies.append(lobby)
+        return lobbies
+
+    async def by_user_ids(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Lobby]:
+        user_ids = set(user_ids)
+        return [
+            lobby
+            for lobby in self._lobbies.values()
+            if not user_ids.isdisjoint(lobby.users)
+        ]
+
+    async def list_open(
+        self,
+        cursor: LobbyId | None,
+        limit: int,
+        filters: OpenLobbyFilters,
+    ) -> OpenLobbiesPage:
+        lobbies = [
+            lobby
+            for lobby in sorted(
+                self._lobbies.values(),
+                key=lambda lobby: lobby.id,
+                reverse=True,
+            )
+            if (not cursor or lobby.id < cursor)
+            and (
+                filters.rule_set_type != RuleSetType.CONNECT_FOUR
+                or isinstance(lobby, ConnectFourLobby)
+            )
+            and (
+                filters.has_password is None
+                or filters.has_password == (lobby.password is not None)
+            )
+        ]
+        next_cursor = lobbies[limit - 1].id if len(lobbies) > limit else None
+        return OpenLobbiesPage(
+            lobbies=lobbies[:limit],
+            next_cursor=next_cursor,
+        )
+
     async def save(self, lobby: Lobby) -> None:
         self._lobbies[lobby.id] = lobby
 
@@ -68,6 +133,14 @@ class FakeLobbyGateway(LobbyGateway):
     async def delete(self, lobby: Lobby) -> None:
         self._lobbies.pop(lobby.id, None)
 
+    async def save_many(self, lobbies: Iterable[Lobby]) -> None:
+        for lobby in lobbies:
+            await self.save(lobby)
+
+    async def delete_many(self, lobbies: Iterable[Lobby]) -> None:
+        for lobby in lobbies:
+            await self.delete(lobby)
+
 
 class FakeGameGateway(GameGateway):
     __slots__ = ("_games",)
@@ -98,6 +171,32 @@ class FakeGameGateway(GameGateway):
                 return game
         return None
 
+    async def by_ids(
+        self,
+        game_ids: Iterable[GameId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        games = []
+        for game_id in dict.fromkeys(game_ids):
+            game = self._games.get(game_id, None)
+            if game:
+                games.append(game)
+        return games
+
+    async def by_player_ids(
+        self,
+        player_ids: Iterable[UserId],
+        *,
+        acquire: bool = False,
+    ) -> list[Game]:
+        player_ids = set(player_ids)
+        return [
+            game
+            for game in self._games.values()
+            if not player_ids.isdisjoint(game.players)
+        ]
+
     async def save(self, game: Game) -> None:
         self._games[game.id] = game
 
@@ -107,6 +206,139 @@ class FakeGameGateway(GameGateway):
     async def delete(self, game: Game) -> None:
         self._games.pop(game.id)
 
+    async def save_many(self, games: Iterable[Game]) -> None:
+        for game in games:
+            await self.save(game)
+
+    async def delete_many(self, games: Iterable[Game]) -> None:
+        for game in games:
+            await self.delete(game)
+
+
+class FakeMembershipGateway(MembershipGateway):
+    __slots__ = ("_lobby_gateway", "_game_gateway")
+
+    def __init__(
+        self,
+        lobby_gateway: LobbyGateway,
+        game_gateway: GameGateway,
+    ):
+        self._lobby_gateway = lobby_gateway
+        self._game_gateway = game_gateway
+
+    async def membership(self, user_id: UserId) -> Membership:
+        lobby = await self._lobby_gateway.by_user_id(user_id)
+        game = await self._game_gateway.by_player_id(user_id)
+        return Membership(
+            lobby_id=lobby.id if lobby else None,
+            game_id=game.id if game else None,
+        )
+
+
+class FakeMatchmakingQueue(MatchmakingQueue):
+    __slots__ = ("_tickets",)
+
+    def __init__(self, tickets: list[MatchmakingTicket] | None = None):
+        self._tickets = tickets or []
+
+    @property
+    def tickets(self) -> list[MatchmakingTicket]:
+        return self._tickets
+
+    async def add(self, ticket: MatchmakingTicket) -> None:
+        for existing_ticket in self._tickets:
+            if (
+                existing_ticket.user_id == ticket.user_id
+                and existing_ticket.rule_set == ticket.rule_set
+            ):
+                return
+        self._tickets.append(ticket)
+
+    async def rule_sets(self) -> list[RuleSet]:
+        return list(dict.fromkeys(ticket.rule_set for ticket in self._tickets))
+
+    async def oldest(
+        self,
+        *,
+        rule_set: RuleSet,
+        limit: int,
+        acquire: bool = False,
+    ) -> list[MatchmakingTicket]:
+        tickets = sorted(
+            (
+                ticket
+                for ticket in self._tickets
+                if ticket.rule_set == rule_set
+            ),
+            key=lambda ticket: ticket.enqueued_at,
+        )
+        return tickets[:limit]
+
+    async def remove_many(
+        self,
+        tickets: Iterable[MatchmakingTicket],
+    ) -> None:
+        tickets_to_remove = list(tickets)
+        self._tickets = [
+            ticket
+            for ticket in self._tickets
+            if ticket not in tickets_to_remove
+        ]
+
+
+class FakePresenceTracker(PresenceTracker):
+    __slots__ = ("_last_seen",)
+
+    def __init__(self, last_seen: dict[UserId, datetime] | None = None):
+        self._last_seen = last_seen or {}
+
+    @property
+    def last_seen(self) -> dict[UserId, datetime]:
+        return self._last_seen
+
+    async def acknowledge(self, user_id: UserId, *, at: datetime) -> None:
+        last_seen_at = self._last_seen.get(user_id, at)
+        self._last_seen[user_id] = max(last_seen_at, at)
+
+    async def acknowledge_many(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        at: datetime,
+    ) -> None:
+        for user_id in user_ids:
+            await self.acknowledge(user_id, at=at)
+
+    async def claim_absent(
+        self,
+        *,
+        seen_before: datetime,
+        limit: int,
+        claimed_until: datetime,
+    ) -> list[UserId]:
+        absent_user_ids = sorted(
+            (
+                user_id
+                for user_id, last_seen_at in self._last_seen.items()
+                if last_seen_at < seen_before
+            ),
+            key=self._last_seen.__getitem__,
+        )[:limit]
+        for user_id in absent_user_ids:
+            self._last_seen[user_id] = claimed_until
+        return absent_user_ids
+
+    async def forget(
+        self,
+        user_ids: Iterable[UserId],
+        *,
+        claimed_until: datetime,
+    ) -> None:
+        for user_id in user_ids:
+            last_seen_at = self._last_seen.get(user_id)
+            if last_seen_at and last_seen_at <= claimed_until:
+                del self._last_seen[user_id]
+
 
 class FakeEventPublisher(EventPublisher):
     __slots__ = ("_events",)
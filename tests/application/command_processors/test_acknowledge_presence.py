@@ -5,120 +5,25 @@
 from datetime import datetime, timedelta, timezone
 from typing import Final
 
-import pytest
 from uuid_extensions import uuid7
 
-from connection_hub.domain import (
-    UserRole,
-    PlayerStatus,
-    LobbyId,
-    GameId,
-    UserId,
-    PlayerStateId,
-    PlayerState,
-    ConnectFourLobby,
-    Lobby,
-    ConnectFourGame,
-    Game,
-)
-from connection_hub.application import (
-    RemoveFromLobbyTask,
-    DisconnectFromGameTask,
-    Task,
-    AcknowledgePresenceProcessor,
-)
-from .fakes import (
-    FakeLobbyGateway,
-    FakeGameGateway,
-    FakeTaskScheduler,
-    FakeIdentityProvider,
-    ANY_DATETIME,
-)
+from connection_hub.domain import UserId
+from connection_hub.application import AcknowledgePresenceProcessor
+from .fakes import FakePresenceTracker, FakeIdentityProvider
 
 
 _CURRENT_USER_ID: Final = UserId(uuid7())
-_CURRENT_PLAYER_STATE_ID: Final = PlayerStateId(uuid7())
 
-_OTHER_USER_ID: Final = UserId(uuid7())
-_OTHER_PLAYER_STATE_ID: Final = PlayerStateId(uuid7())
 
-_LOBBY_ID: Final = LobbyId(uuid7())
-_GAME_ID: Final = GameId(uuid7())
-_NAME: Final = "Connect Four for money!!"
-_PASSWORD: Final = "12345"
-_TIME_FOR_EACH_PLAYER: Final = timedelta(minutes=1)
-_CREATED_AT: Final = datetime.now(timezone.utc)
-
-
-@pytest.mark.parametrize(
-    ["lobby", "game", "expected_task"],
-    [
-        [
-            ConnectFourLobby(
-                id=_LOBBY_ID,
-                name=_NAME,
-                users={_CURRENT_USER_ID: UserRole.ADMIN},
-                admin_role_transfer_queue=[],
-                password=_PASSWORD,
-                time_for_each_player=_TIME_FOR_EACH_PLAYER,
-            ),
-            None,
-            RemoveFromLobbyTask(
-                id=(
-                    f"remove_from_lobby:{_LOBBY_ID.hex}:{_CURRENT_USER_ID.hex}"
-                ),
-                execute_at=ANY_DATETIME,
-                lobby_id=_LOBBY_ID,
-                user_id=_CURRENT_USER_ID,
-            ),
-        ],
-        [
-            None,
-            ConnectFourGame(
-                id=_GAME_ID,
-                players={
-                    _CURRENT_USER_ID: PlayerState(
-                        id=_CURRENT_PLAYER_STATE_ID,
-                        status=PlayerStatus.DISCONNECTED,
-                        time_left=timedelta(seconds=40),
-                    ),
-                    _OTHER_USER_ID: PlayerState(
-                        id=_OTHER_PLAYER_STATE_ID,
-                        status=PlayerStatus.CONNECTED,
-                        time_left=timedelta(seconds=40),
-                    ),
-                },
-                created_at=_CREATED_AT,
-                time_for_each_player=_TIME_FOR_EACH_PLAYER,
-            ),
-            DisconnectFromGameTask(
-                id=(
-                    "disconnect_from_game:"
-                    f"{_GAME_ID.hex}:{_CURRENT_USER_ID.hex}"
-                ),
-                execute_at=ANY_DATETIME,
-                game_id=_GAME_ID,
-                player_id=_CURRENT_USER_ID,
-            ),
-        ],
-    ],
-)
-async def test_acknowledge_presence(
-    lobby: Lobby | None,
-    game: Game | None,
-    expected_task: Task,
-):
-    lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
-    game_gateway = FakeGameGateway([game] if game else None)
-    task_scheduler = FakeTaskScheduler()
+async def test_acknowledge_presence():
+    last_seen_at = datetime.now(timezone.utc) - timedelta(seconds=10)
+    presence_tracker = FakePresenceTracker({_CURRENT_USER_ID: last_seen_at})
 
     processor = AcknowledgePresenceProcessor(
-        lobby_gateway=lobby_gateway,
-        game_gateway=game_gateway,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
     )
 
     await processor.process()
 
-    assert expected_task in task_scheduler.tasks
+    assert presence_tracker.last_seen[_CURRENT_USER_ID] > last_seen_at
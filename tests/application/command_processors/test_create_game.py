@@ -23,6 +23,7 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     ConnectFourGameCreatedEvent,
+    TimeoutPolicy,
     CreateGameCommand,
     CreateGameProcessor,
     LobbyDoesNotExistError,
@@ -46,6 +47,7 @@ _LOBBY_ID: Final = LobbyId(uuid7())
 _NAME: Final = "Connect Four for money!!"
 _PASSWORD: Final = "12345"
 _TIME_FOR_EACH_PLAYER: Final = timedelta(minutes=1)
+_TIME_FOR_RECONNECT: Final = timedelta(seconds=25)
 
 
 async def test_create_game_processor():
@@ -73,6 +75,9 @@ async def test_create_game_processor():
         event_publisher=event_publisher,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
+        timeout_policy=TimeoutPolicy(
+            connect_four_time_for_reconnect=_TIME_FOR_RECONNECT,
+        ),
     )
 
     await command_processor.process(command)
@@ -83,12 +88,12 @@ async def test_create_game_processor():
             _CURRENT_USER_ID: PlayerState(
                 id=ANY_PLAYER_STATE_ID,
                 status=PlayerStatus.CONNECTED,
-                time_left=timedelta(seconds=40),
+                time_left=_TIME_FOR_RECONNECT,
             ),
             _OTHER_USER_ID: PlayerState(
                 id=ANY_PLAYER_STATE_ID,
                 status=PlayerStatus.CONNECTED,
-                time_left=timedelta(seconds=40),
+                time_left=_TIME_FOR_RECONNECT,
             ),
         },
         created_at=ANY_DATETIME,
@@ -160,6 +165,9 @@ async def test_create_game_processor_errors(
         event_publisher=event_publisher,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
+        timeout_policy=TimeoutPolicy(
+            connect_four_time_for_reconnect=_TIME_FOR_RECONNECT,
+        ),
     )
 
     with pytest.raises(expected_error):
@@ -26,7 +26,6 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     LobbyCreatedEvent,
-    RemoveFromLobbyTask,
     CreateLobbyCommand,
     CreateLobbyProcessor,
     CurrentUserInLobbyError,
@@ -37,12 +36,12 @@ from connection_hub.application import (
 )
 from .fakes import (
     ANY_LOBBY_ID,
-    ANY_DATETIME,
     ANY_STR,
     FakeLobbyGateway,
     FakeGameGateway,
+    FakeMembershipGateway,
     FakeEventPublisher,
-    FakeTaskScheduler,
+    FakePresenceTracker,
     FakeCentrifugoClient,
     FakeIdentityProvider,
 )
@@ -67,7 +66,7 @@ _CONNECT_FOUR_RULE_SET: Final = ConnectFourRuleSet(
 async def test_create_lobby_processor():
     lobby_gateway = FakeLobbyGateway()
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
+    presence_tracker = FakePresenceTracker()
     centrifugo_client = FakeCentrifugoClient()
 
     command = CreateLobbyCommand(
@@ -78,9 +77,12 @@ async def test_create_lobby_processor():
     command_processor = CreateLobbyProcessor(
         create_lobby=CreateLobby(),
         lobby_gateway=lobby_gateway,
-        game_gateway=FakeGameGateway(),
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=lobby_gateway,
+            game_gateway=FakeGameGateway(),
+        ),
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -107,13 +109,7 @@ async def test_create_lobby_processor():
     )
     assert expected_event in event_publisher.events
 
-    expected_task = RemoveFromLobbyTask(
-        id=ANY_STR,
-        execute_at=ANY_DATETIME,
-        lobby_id=ANY_LOBBY_ID,
-        user_id=_CURRENT_USER_ID,
-    )
-    assert expected_task in task_scheduler.tasks
+    assert _CURRENT_USER_ID in presence_tracker.last_seen
 
     expected_first_centrifugo_publication = {
         "type": "lobby_created",
@@ -276,15 +272,18 @@ async def test_create_lobby_processor_error(
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     game_gateway = FakeGameGateway([game] if game else None)
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
+    presence_tracker = FakePresenceTracker()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = CreateLobbyProcessor(
         create_lobby=CreateLobby(),
         lobby_gateway=lobby_gateway,
-        game_gateway=game_gateway,
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=lobby_gateway,
+            game_gateway=game_gateway,
+        ),
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -294,5 +293,5 @@ async def test_create_lobby_processor_error(
         await command_processor.process(command)
 
     assert not event_publisher.events
-    assert not task_scheduler.tasks
+    assert not presence_tracker.last_seen
     assert not centrifugo_client.publications
@@ -0,0 +1,111 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from unittest.mock import AsyncMock
+from datetime import timedelta
+from typing import Final
+
+import pytest
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    UserRole,
+    LobbyId,
+    UserId,
+    ConnectFourRuleSet,
+    ConnectFourLobby,
+)
+from connection_hub.application import (
+    MatchmakingTicket,
+    EnterMatchmakingCommand,
+    EnterMatchmakingProcessor,
+    InvalidLobbyRuleSetError,
+    CurrentUserInLobbyError,
+)
+from .fakes import (
+    ANY_DATETIME,
+    FakeLobbyGateway,
+    FakeGameGateway,
+    FakeMembershipGateway,
+    FakeMatchmakingQueue,
+    FakeIdentityProvider,
+)
+
+
+_CURRENT_USER_ID: Final = UserId(uuid7())
+_RULE_SET: Final = ConnectFourRuleSet(
+    time_for_each_player=timedelta(minutes=1),
+)
+
+
+async def test_enter_matchmaking_processor():
+    matchmaking_queue = FakeMatchmakingQueue()
+    command_processor = EnterMatchmakingProcessor(
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=FakeLobbyGateway(),
+            game_gateway=FakeGameGateway(),
+        ),
+        matchmaking_queue=matchmaking_queue,
+        transaction_manager=AsyncMock(),
+        identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
+    )
+
+    await command_processor.process(EnterMatchmakingCommand(_RULE_SET))
+
+    expected_ticket = MatchmakingTicket(
+        user_id=_CURRENT_USER_ID,
+        rule_set=_RULE_SET,
+        enqueued_at=ANY_DATETIME,
+    )
+    assert matchmaking_queue.tickets == [expected_ticket]
+
+
+@pytest.mark.parametrize(
+    ["lobbies", "command", "expected_error"],
+    [
+        [
+            [
+                ConnectFourLobby(
+                    id=LobbyId(uuid7()),
+                    name="Connect Four for money!!",
+                    users={_CURRENT_USER_ID: UserRole.ADMIN},
+                    admin_role_transfer_queue=[],
+                    password=None,
+                    time_for_each_player=timedelta(minutes=1),
+                ),
+            ],
+            EnterMatchmakingCommand(_RULE_SET),
+            CurrentUserInLobbyError,
+        ],
+        [
+            [],
+            EnterMatchmakingCommand(
+                ConnectFourRuleSet(
+                    time_for_each_player=timedelta(minutes=10),
+                ),
+            ),
+            InvalidLobbyRuleSetError,
+        ],
+    ],
+)
+async def test_enter_matchmaking_processor_errors(
+    lobbies: list[ConnectFourLobby],
+    command: EnterMatchmakingCommand,
+    expected_error: type[Exception],
+):
+    matchmaking_queue = FakeMatchmakingQueue()
+    command_processor = EnterMatchmakingProcessor(
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=FakeLobbyGateway(lobbies),
+            game_gateway=FakeGameGateway(),
+        ),
+        matchmaking_queue=matchmaking_queue,
+        transaction_manager=AsyncMock(),
+        identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
+    )
+
+    with pytest.raises(expected_error):
+        await command_processor.process(command)
+
+    assert not matchmaking_queue.tickets
@@ -0,0 +1,171 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    UserRole,
+    PlayerStatus,
+    LobbyId,
+    GameId,
+    UserId,
+    PlayerStateId,
+    PlayerState,
+    ConnectFourLobby,
+    ConnectFourGame,
+)
+from connection_hub.application import (
+    RemoveFromLobbyCommand,
+    DisconnectFromGameCommand,
+    TimeoutPolicy,
+    EvictAbsentUsersCommand,
+    EvictAbsentUsersProcessor,
+)
+from .fakes import FakeLobbyGateway, FakeGameGateway, FakePresenceTracker
+
+
+_PRESENCE_WINDOW: Final = timedelta(seconds=15)
+_CLAIM_EXPIRES_IN: Final = timedelta(seconds=30)
+_TIME_FOR_EACH_PLAYER: Final = timedelta(minutes=1)
+
+_ABSENT_LOBBY_USER_ID: Final = UserId(uuid7())
+_PRESENT_LOBBY_USER_ID: Final = UserId(uuid7())
+_ABSENT_PLAYER_ID: Final = UserId(uuid7())
+_DISCONNECTED_PLAYER_ID: Final = UserId(uuid7())
+_ABSENT_IDLE_USER_ID: Final = UserId(uuid7())
+
+_LOBBY_ID: Final = LobbyId(uuid7())
+_GAME_ID: Final = GameId(uuid7())
+
+
+async def test_evict_absent_users_processor():
+    now = datetime.now(timezone.utc)
+    absent_since = now - _PRESENCE_WINDOW * 2
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="Connect Four for money!!",
+        users={
+            _ABSENT_LOBBY_USER_ID: UserRole.ADMIN,
+            _PRESENT_LOBBY_USER_ID: UserRole.REGULAR_MEMBER,
+        },
+        admin_role_transfer_queue=[_PRESENT_LOBBY_USER_ID],
+        password=None,
+        time_for_each_player=_TIME_FOR_EACH_PLAYER,
+    )
+    game = ConnectFourGame(
+        id=_GAME_ID,
+        players={
+            _ABSENT_PLAYER_ID: PlayerState(
+                id=PlayerStateId(uuid7()),
+                status=PlayerStatus.CONNECTED,
+                time_left=_TIME_FOR_EACH_PLAYER,
+            ),
+            _DISCONNECTED_PLAYER_ID: PlayerState(
+                id=PlayerStateId(uuid7()),
+                status=PlayerStatus.DISCONNECTED,
+                time_left=_TIME_FOR_EACH_PLAYER,
+            ),
+        },
+        created_at=now,
+        time_for_each_player=_TIME_FOR_EACH_PLAYER,
+    )
+    presence_tracker = FakePresenceTracker({
+        _ABSENT_LOBBY_USER_ID: absent_since,
+        _PRESENT_LOBBY_USER_ID: now,
+        _ABSENT_PLAYER_ID: absent_since,
+        _DISCONNECTED_PLAYER_ID: absent_since,
+        _ABSENT_IDLE_USER_ID: absent_since,
+    })
+
+    processor = EvictAbsentUsersProcessor(
+        lobby_gateway=FakeLobbyGateway([lobby]),
+        game_gateway=FakeGameGateway([game]),
+        presence_tracker=presence_tracker,
+        timeout_policy=TimeoutPolicy(presence_window=_PRESENCE_WINDOW),
+    )
+
+    commands = await processor.process(
+        EvictAbsentUsersCommand(
+            max_users=10,
+            claim_expires_in=_CLAIM_EXPIRES_IN,
+        ),
+    )
+    assert commands == [
+        RemoveFromLobbyCommand(
+            lobby_id=_LOBBY_ID,
+            user_id=_ABSENT_LOBBY_USER_ID,
+        ),
+        DisconnectFromGameCommand(
+            game_id=_GAME_ID,
+            user_id=_ABSENT_PLAYER_ID,
+        ),
+    ]
+
+    # Users with commands stay claimed until they are found
+    # evicted by a later round.
+    assert presence_tracker.last_seen.keys() == {
+        _PRESENT_LOBBY_USER_ID,
+        _ABSENT_LOBBY_USER_ID,
+        _ABSENT_PLAYER_ID,
+    }
+    assert presence_tracker.last_seen[_PRESENT_LOBBY_USER_ID] == now
+
+    assert not await processor.process(
+        EvictAbsentUsersCommand(
+            max_users=10,
+            claim_expires_in=_CLAIM_EXPIRES_IN,
+        ),
+    )
+
+
+async def test_evict_absent_users_processor_retries_failed_evictions():
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="Connect Four for money!!",
+        users={
+            _ABSENT_LOBBY_USER_ID: UserRole.ADMIN,
+            _PRESENT_LOBBY_USER_ID: UserRole.REGULAR_MEMBER,
+        },
+        admin_role_transfer_queue=[_PRESENT_LOBBY_USER_ID],
+        password=None,
+        time_for_each_player=_TIME_FOR_EACH_PLAYER,
+    )
+    now = datetime.now(timezone.utc)
+    presence_tracker = FakePresenceTracker({
+        _ABSENT_LOBBY_USER_ID: now - _PRESENCE_WINDOW * 2,
+        _PRESENT_LOBBY_USER_ID: now,
+    })
+
+    processor = EvictAbsentUsersProcessor(
+        lobby_gateway=FakeLobbyGateway([lobby]),
+        game_gateway=FakeGameGateway(),
+        presence_tracker=presence_tracker,
+        timeout_policy=TimeoutPolicy(presence_window=_PRESENCE_WINDOW),
+    )
+    # Claims expire at once, so that every round takes
+    # users, who are still absent.
+    command = EvictAbsentUsersCommand(
+        max_users=10,
+        claim_expires_in=timedelta(0),
+    )
+    remove_from_lobby_command = RemoveFromLobbyCommand(
+        lobby_id=_LOBBY_ID,
+        user_id=_ABSENT_LOBBY_USER_ID,
+    )
+
+    # Eviction fails, so the user is still in the lobby.
+    assert await processor.process(command) == [remove_from_lobby_command]
+    assert _ABSENT_LOBBY_USER_ID in presence_tracker.last_seen
+
+    # User is taken again by a later round, and is evicted.
+    assert await processor.process(command) == [remove_from_lobby_command]
+    del lobby.users[_ABSENT_LOBBY_USER_ID]
+
+    # Evicted user is forgotten.
+    assert not await processor.process(command)
+    assert presence_tracker.last_seen.keys() == {_PRESENT_LOBBY_USER_ID}
@@ -28,7 +28,6 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     UserJoinedLobbyEvent,
-    RemoveFromLobbyTask,
     JoinLobbyCommand,
     JoinLobbyProcessor,
     CurrentUserInLobbyError,
@@ -36,11 +35,11 @@ from connection_hub.application import (
     LobbyDoesNotExistError,
 )
 from .fakes import (
-    ANY_DATETIME,
     FakeLobbyGateway,
     FakeGameGateway,
+    FakeMembershipGateway,
     FakeEventPublisher,
-    FakeTaskScheduler,
+    FakePresenceTracker,
     FakeCentrifugoClient,
     FakeIdentityProvider,
 )
@@ -74,7 +73,7 @@ async def test_join_lobby_processor():
 
     lobby_gateway = FakeLobbyGateway([lobby])
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
+    presence_tracker = FakePresenceTracker()
     centrifugo_client = FakeCentrifugoClient()
 
     command = JoinLobbyCommand(
@@ -84,9 +83,12 @@ async def test_join_lobby_processor():
     command_processor = JoinLobbyProcessor(
         join_lobby=JoinLobby(),
         lobby_gateway=lobby_gateway,
-        game_gateway=FakeGameGateway(),
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=lobby_gateway,
+            game_gateway=FakeGameGateway(),
+        ),
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -107,13 +109,7 @@ async def test_join_lobby_processor():
     )
     assert expected_lobby == lobby
 
-    expected_task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_CURRENT_USER_ID.hex}",
-        execute_at=ANY_DATETIME,
-        lobby_id=_LOBBY_ID,
-        user_id=_CURRENT_USER_ID,
-    )
-    assert expected_task in task_scheduler.tasks
+    assert _CURRENT_USER_ID in presence_tracker.last_seen
 
     expected_event = UserJoinedLobbyEvent(
         lobby_id=_LOBBY_ID,
@@ -265,15 +261,18 @@ async def test_join_lobby_processor_errors(
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     game_gateway = FakeGameGateway([game] if game else None)
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
+    presence_tracker = FakePresenceTracker()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = JoinLobbyProcessor(
         join_lobby=JoinLobby(),
         lobby_gateway=lobby_gateway,
-        game_gateway=game_gateway,
+        membership_gateway=FakeMembershipGateway(
+            lobby_gateway=lobby_gateway,
+            game_gateway=game_gateway,
+        ),
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -283,5 +282,5 @@ async def test_join_lobby_processor_errors(
         await command_processor.process(command)
 
     assert not event_publisher.events
-    assert not task_scheduler.tasks
+    assert not presence_tracker.last_seen
     assert not centrifugo_client.publications
@@ -3,7 +3,7 @@
 # Licensed under the Personal Use License (see LICENSE).
 
 from unittest.mock import AsyncMock
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Final
 
 import pytest
@@ -21,7 +21,6 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     UserKickedFromLobbyEvent,
-    RemoveFromLobbyTask,
     KickFromLobbyCommand,
     KickFromLobbyProcessor,
     LobbyDoesNotExistError,
@@ -30,7 +29,6 @@ from connection_hub.application import (
 from .fakes import (
     FakeLobbyGateway,
     FakeEventPublisher,
-    FakeTaskScheduler,
     FakeCentrifugoClient,
     FakeIdentityProvider,
 )
@@ -58,14 +56,6 @@ async def test_kick_from_lobby_processor():
         time_for_each_player=_TIME_FOR_EACH_PLAYER,
     )
 
-    task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_CURRENT_USER_ID.hex}",
-        execute_at=datetime.now(timezone.utc) + timedelta(seconds=15),
-        lobby_id=_LOBBY_ID,
-        user_id=_CURRENT_USER_ID,
-    )
-    task_scheduler = FakeTaskScheduler([task])
-
     lobby_gateway = FakeLobbyGateway([lobby])
     event_publisher = FakeEventPublisher()
     centrifugo_client = FakeCentrifugoClient(
@@ -77,7 +67,6 @@ async def test_kick_from_lobby_processor():
         kick_from_lobby=KickFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         tranaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -101,8 +90,6 @@ async def test_kick_from_lobby_processor():
     )
     assert expected_event in event_publisher.events
 
-    assert task not in task_scheduler.tasks
-
     expected_centrifugo_publication = {
         "type": "user_kicked",
         "lobby_id": _LOBBY_ID.hex,
@@ -178,14 +165,12 @@ async def test_kick_from_lobby_processor_errors(
 ):
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = KickFromLobbyProcessor(
         kick_from_lobby=KickFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         tranaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -195,5 +180,4 @@ async def test_kick_from_lobby_processor_errors(
         await command_processor.process(command)
 
     assert not event_publisher.events
-    assert not task_scheduler.tasks
     assert not centrifugo_client.publications
@@ -3,7 +3,7 @@
 # Licensed under the Personal Use License (see LICENSE).
 
 from unittest.mock import AsyncMock
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Final
 
 import pytest
@@ -19,7 +19,6 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     UserLeftLobbyEvent,
-    RemoveFromLobbyTask,
     LeaveLobbyCommand,
     LeaveLobbyProcessor,
     LobbyDoesNotExistError,
@@ -28,7 +27,6 @@ from connection_hub.application import (
 from .fakes import (
     FakeLobbyGateway,
     FakeEventPublisher,
-    FakeTaskScheduler,
     FakeCentrifugoClient,
     FakeIdentityProvider,
 )
@@ -62,20 +60,11 @@ async def test_leave_lobby_processor():
         subscriptons={_CURRENT_USER_ID.hex: [f"lobbies:{_LOBBY_ID.hex}"]},
     )
 
-    task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_CURRENT_USER_ID.hex}",
-        execute_at=datetime.now(timezone.utc) + timedelta(seconds=15),
-        lobby_id=_LOBBY_ID,
-        user_id=_CURRENT_USER_ID,
-    )
-    task_scheduler = FakeTaskScheduler([task])
-
     command = LeaveLobbyCommand(lobby_id=_LOBBY_ID)
     command_processor = LeaveLobbyProcessor(
         remove_from_lobby=RemoveFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -100,8 +89,6 @@ async def test_leave_lobby_processor():
     )
     assert expected_event in event_publisher.events
 
-    assert task not in task_scheduler.tasks
-
     expected_centrifugo_publication = {
         "type": "user_left",
         "user_id": _CURRENT_USER_ID.hex,
@@ -147,14 +134,12 @@ async def test_leave_lobby_processor_errors(
 ):
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = LeaveLobbyProcessor(
         remove_from_lobby=RemoveFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
         identity_provider=FakeIdentityProvider(_CURRENT_USER_ID),
@@ -164,5 +149,4 @@ async def test_leave_lobby_processor_errors(
         await command_processor.process(command)
 
     assert not event_publisher.events
-    assert not task_scheduler.tasks
     assert not centrifugo_client.publications
@@ -0,0 +1,93 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import timedelta
+from typing import Final
+
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    UserRole,
+    LobbyId,
+    UserId,
+    ConnectFourLobby,
+)
+from connection_hub.application import (
+    ListOpenLobbiesQuery,
+    ListOpenLobbiesProcessor,
+)
+from .fakes import FakeLobbyGateway
+
+
+_TIME_FOR_EACH_PLAYER: Final = timedelta(minutes=1)
+
+
+def _lobby(password: str | None) -> ConnectFourLobby:
+    return ConnectFourLobby(
+        id=LobbyId(uuid7()),
+        name="Connect Four for money!!",
+        users={UserId(uuid7()): UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=password,
+        time_for_each_player=_TIME_FOR_EACH_PLAYER,
+    )
+
+
+async def test_list_open_lobbies_processor():
+    oldest_lobby = _lobby(password=None)
+    private_lobby = _lobby(password="12345")
+    newest_lobby = _lobby(password=None)
+
+    processor = ListOpenLobbiesProcessor(
+        lobby_gateway=FakeLobbyGateway(
+            [oldest_lobby, private_lobby, newest_lobby],
+        ),
+    )
+
+    first_page = await processor.process(ListOpenLobbiesQuery(limit=2))
+    assert first_page == {
+        "lobbies": [
+            {
+                "lobby_id": newest_lobby.id.hex,
+                "name": newest_lobby.name,
+                "has_password": False,
+                "rule_set": {
+                    "type": "connect_four",
+                    "time_for_each_player": (
+                        _TIME_FOR_EACH_PLAYER.total_seconds()
+                    ),
+                },
+            },
+            {
+                "lobby_id": private_lobby.id.hex,
+                "name": private_lobby.name,
+                "has_password": True,
+                "rule_set": {
+                    "type": "connect_four",
+                    "time_for_each_player": (
+                        _TIME_FOR_EACH_PLAYER.total_seconds()
+                    ),
+                },
+            },
+        ],
+        "next_cursor": private_lobby.id.hex,
+    }
+
+    second_page = await processor.process(
+        ListOpenLobbiesQuery(cursor=private_lobby.id, limit=2),
+    )
+    assert isinstance(second_page, dict)
+    assert [lobby["lobby_id"] for lobby in second_page["lobbies"]] == [  # type: ignore
+        oldest_lobby.id.hex,
+    ]
+    assert second_page["next_cursor"] is None
+
+    public_lobbies_page = await processor.process(
+        ListOpenLobbiesQuery(has_password=False),
+    )
+    assert isinstance(public_lobbies_page, dict)
+    assert [
+        lobby["lobby_id"]  # type: ignore
+        for lobby in public_lobbies_page["lobbies"]  # type: ignore
+    ] == [newest_lobby.id.hex, oldest_lobby.id.hex]
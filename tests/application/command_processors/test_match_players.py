@@ -0,0 +1,165 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from unittest.mock import AsyncMock
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    UserRole,
+    LobbyId,
+    UserId,
+    ConnectFourRuleSet,
+    ConnectFourLobby,
+    CreateLobby,
+    JoinLobby,
+)
+from connection_hub.application import (
+    LobbyCreatedEvent,
+    UserJoinedLobbyEvent,
+    MatchmakingTicket,
+    MatchPlayersCommand,
+    MatchPlayersProcessor,
+)
+from .fakes import (
+    FakeLobbyGateway,
+    FakeGameGateway,
+    FakeMatchmakingQueue,
+    FakeEventPublisher,
+    FakePresenceTracker,
+    FakeCentrifugoClient,
+)
+
+
+_FIRST_USER_ID: Final = UserId(uuid7())
+_SECOND_USER_ID: Final = UserId(uuid7())
+_THIRD_USER_ID: Final = UserId(uuid7())
+_BUSY_USER_ID: Final = UserId(uuid7())
+_LONELY_USER_ID: Final = UserId(uuid7())
+
+_RULE_SET: Final = ConnectFourRuleSet(
+    time_for_each_player=timedelta(minutes=1),
+)
+_OTHER_RULE_SET: Final = ConnectFourRuleSet(
+    time_for_each_player=timedelta(minutes=3),
+)
+
+_ENQUEUED_AT: Final = datetime.now(timezone.utc)
+
+
+def _ticket(
+    user_id: UserId,
+    rule_set: ConnectFourRuleSet,
+    waiting_for: timedelta,
+) -> MatchmakingTicket:
+    return MatchmakingTicket(
+        user_id=user_id,
+        rule_set=rule_set,
+        enqueued_at=_ENQUEUED_AT - waiting_for,
+    )
+
+
+async def test_match_players_processor():
+    busy_user_lobby = ConnectFourLobby(
+        id=LobbyId(uuid7()),
+        name="Connect Four for money!!",
+        users={_BUSY_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=1),
+    )
+    third_user_ticket = _ticket(
+        _THIRD_USER_ID,
+        _RULE_SET,
+        timedelta(seconds=1),
+    )
+    lonely_user_ticket = _ticket(
+        _LONELY_USER_ID,
+        _OTHER_RULE_SET,
+        timedelta(seconds=10),
+    )
+    matchmaking_queue = FakeMatchmakingQueue([
+        _ticket(_SECOND_USER_ID, _RULE_SET, timedelta(seconds=5)),
+        third_user_ticket,
+        _ticket(_BUSY_USER_ID, _RULE_SET, timedelta(seconds=20)),
+        _ticket(_FIRST_USER_ID, _RULE_SET, timedelta(seconds=10)),
+        lonely_user_ticket,
+    ])
+    lobby_gateway = FakeLobbyGateway([busy_user_lobby])
+    event_publisher = FakeEventPublisher()
+    presence_tracker = FakePresenceTracker()
+    centrifugo_client = FakeCentrifugoClient()
+
+    command_processor = MatchPlayersProcessor(
+        create_lobby=CreateLobby(),
+        join_lobby=JoinLobby(),
+        matchmaking_queue=matchmaking_queue,
+        lobby_gateway=lobby_gateway,
+        game_gateway=FakeGameGateway(),
+        event_publisher=event_publisher,
+        presence_tracker=presence_tracker,
+        centrifugo_client=centrifugo_client,
+        transaction_manager=AsyncMock(),
+    )
+
+    matched_pairs = await command_processor.process(
+        MatchPlayersCommand(max_pairs_per_rule_set=10),
+    )
+    assert matched_pairs == 1
+
+    assert matchmaking_queue.tickets == [
+        third_user_ticket,
+        lonely_user_ticket,
+    ]
+
+    new_lobby = next(
+        lobby
+        for lobby in lobby_gateway.lobbies
+        if lobby.id != busy_user_lobby.id
+    )
+    assert new_lobby.users == {
+        _FIRST_USER_ID: UserRole.ADMIN,
+        _SECOND_USER_ID: UserRole.REGULAR_MEMBER,
+    }
+    assert new_lobby.password is None
+
+    assert presence_tracker.last_seen.keys() == {
+        _FIRST_USER_ID,
+        _SECOND_USER_ID,
+    }
+
+    expected_events = [
+        LobbyCreatedEvent(
+            lobby_id=new_lobby.id,
+            name=new_lobby.name,
+            admin_id=_FIRST_USER_ID,
+            has_password=False,
+            rule_set=_RULE_SET,
+        ),
+        UserJoinedLobbyEvent(
+            lobby_id=new_lobby.id,
+            user_id=_SECOND_USER_ID,
+        ),
+    ]
+    assert event_publisher.events == expected_events
+
+    expected_centrifugo_publication = {
+        "type": "matched",
+        "lobby_id": new_lobby.id.hex,
+        "name": new_lobby.name,
+        "users": {
+            _FIRST_USER_ID.hex: UserRole.ADMIN,
+            _SECOND_USER_ID.hex: UserRole.REGULAR_MEMBER,
+        },
+        "rule_set": {
+            "type": "connect_four",
+            "time_for_each_player": 60,
+        },
+    }
+    assert centrifugo_client.publications == {
+        f"#{_FIRST_USER_ID.hex}": expected_centrifugo_publication,
+        f"#{_SECOND_USER_ID.hex}": expected_centrifugo_publication,
+    }
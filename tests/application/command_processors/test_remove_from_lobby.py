@@ -3,7 +3,7 @@
 # Licensed under the Personal Use License (see LICENSE).
 
 from unittest.mock import AsyncMock
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Final
 
 import pytest
@@ -19,7 +19,6 @@ from connection_hub.domain import (
 )
 from connection_hub.application import (
     UserRemovedFromLobbyEvent,
-    RemoveFromLobbyTask,
     RemoveFromLobbyCommand,
     RemoveFromLobbyProcessor,
     LobbyDoesNotExistError,
@@ -28,7 +27,6 @@ from connection_hub.application import (
 from .fakes import (
     FakeLobbyGateway,
     FakeEventPublisher,
-    FakeTaskScheduler,
     FakeCentrifugoClient,
 )
 
@@ -56,14 +54,6 @@ async def test_remove_from_lobby():
         time_for_each_player=_TIME_FOR_EACH_PLAYER,
     )
 
-    task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_FIRST_USER_ID.hex}",
-        execute_at=datetime.now(timezone.utc),
-        lobby_id=_LOBBY_ID,
-        user_id=_FIRST_USER_ID,
-    )
-    task_scheduler = FakeTaskScheduler([task])
-
     lobby_gateway = FakeLobbyGateway([lobby])
     event_publisher = FakeEventPublisher()
     centrifugo_client = FakeCentrifugoClient(
@@ -78,7 +68,6 @@ async def test_remove_from_lobby():
         remove_from_lobby=RemoveFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
     )
@@ -102,8 +91,6 @@ async def test_remove_from_lobby():
     )
     assert expected_event in event_publisher.events
 
-    assert task not in task_scheduler.tasks
-
     expected_centrifugo_publication = {
         "type": "user_removed",
         "user_id": _FIRST_USER_ID.hex,
@@ -158,14 +145,12 @@ async def test_remove_from_lobby_errors(
 ):
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     event_publisher = FakeEventPublisher()
-    task_scheduler = FakeTaskScheduler()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = RemoveFromLobbyProcessor(
         remove_from_lobby=RemoveFromLobby(),
         lobby_gateway=lobby_gateway,
         event_publisher=event_publisher,
-        task_scheduler=task_scheduler,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
     )
@@ -174,5 +159,4 @@ async def test_remove_from_lobby_errors(
         await command_processor.process(command)
 
     assert not event_publisher.events
-    assert not task_scheduler.tasks
     assert not centrifugo_client.publications
@@ -24,17 +24,14 @@ from connection_hub.domain import (
     Game,
 )
 from connection_hub.application import (
-    RemoveFromLobbyTask,
-    DisconnectFromGameTask,
     StartGameCommand,
     StartGameProcessor,
     LobbyDoesNotExistError,
 )
 from .fakes import (
-    ANY_DATETIME,
     FakeLobbyGateway,
     FakeGameGateway,
-    FakeTaskScheduler,
+    FakePresenceTracker,
     FakeCentrifugoClient,
 )
 
@@ -83,19 +80,7 @@ async def test_start_game_processor():
         time_for_each_player=_TIME_FOR_EACH_PLAYER,
     )
 
-    first_task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_FIRST_USER_ID.hex}",
-        execute_at=datetime.now(timezone.utc) + timedelta(seconds=15),
-        lobby_id=_LOBBY_ID,
-        user_id=_FIRST_USER_ID,
-    )
-    second_task = RemoveFromLobbyTask(
-        id=f"remove_from_lobby:{_LOBBY_ID.hex}:{_SECOND_USER_ID.hex}",
-        execute_at=datetime.now(timezone.utc) + timedelta(seconds=15),
-        lobby_id=_LOBBY_ID,
-        user_id=_SECOND_USER_ID,
-    )
-    task_scheduler = FakeTaskScheduler([first_task, second_task])
+    presence_tracker = FakePresenceTracker()
 
     lobby_gateway = FakeLobbyGateway([lobby])
     game_gateway = FakeGameGateway([game])
@@ -108,7 +93,7 @@ async def test_start_game_processor():
     command_processor = StartGameProcessor(
         lobby_gateway=lobby_gateway,
         game_gateway=game_gateway,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
     )
@@ -117,24 +102,10 @@ async def test_start_game_processor():
 
     assert lobby not in lobby_gateway.lobbies
 
-    assert first_task not in task_scheduler.tasks
-    assert second_task not in task_scheduler.tasks
-
-    first_expected_task = DisconnectFromGameTask(
-        id=f"disconnect_from_game:{_GAME_ID.hex}:{_FIRST_USER_ID.hex}",
-        execute_at=ANY_DATETIME,
-        game_id=_GAME_ID,
-        player_id=_FIRST_USER_ID,
-    )
-    assert first_expected_task in task_scheduler.tasks
-
-    second_expected_task = DisconnectFromGameTask(
-        id=f"disconnect_from_game:{_GAME_ID.hex}:{_SECOND_USER_ID.hex}",
-        execute_at=ANY_DATETIME,
-        game_id=_GAME_ID,
-        player_id=_SECOND_USER_ID,
-    )
-    assert second_expected_task in task_scheduler.tasks
+    assert presence_tracker.last_seen.keys() == {
+        _FIRST_USER_ID,
+        _SECOND_USER_ID,
+    }
 
     expected_centrifugo_publication = {
         "type": "lobby_removed",
@@ -181,13 +152,13 @@ async def test_start_game_processor_errors(
 ):
     lobby_gateway = FakeLobbyGateway([lobby] if lobby else None)
     game_gateway = FakeGameGateway([game] if game else None)
-    task_scheduler = FakeTaskScheduler()
+    presence_tracker = FakePresenceTracker()
     centrifugo_client = FakeCentrifugoClient()
 
     command_processor = StartGameProcessor(
         lobby_gateway=lobby_gateway,
         game_gateway=game_gateway,
-        task_scheduler=task_scheduler,
+        presence_tracker=presence_tracker,
         centrifugo_client=centrifugo_client,
         transaction_manager=AsyncMock(),
     )
@@ -195,5 +166,5 @@ async def test_start_game_processor_errors(
     with pytest.raises(expected_error):
         await command_processor.process(command)
 
-    assert not task_scheduler.tasks
+    assert not presence_tracker.last_seen
     assert not centrifugo_client.publications
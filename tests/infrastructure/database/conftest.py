@@ -6,17 +6,31 @@ from typing import AsyncGenerator
 
 import pytest
 from redis.asyncio.client import Redis, Pipeline
+from redis.asyncio.connection import BlockingConnectionPool
 
 from connection_hub.infrastructure import (
     RedisConfig,
+    redis_connection_pool_factory,
     redis_factory,
     redis_pipeline_factory,
+    LockReleaseListener,
+    lock_release_listener_factory,
 )
 
 
 @pytest.fixture(scope="function")
-async def redis(redis_config: RedisConfig) -> AsyncGenerator[Redis, None]:
-    async for redis in redis_factory(redis_config):
+async def connection_pool(
+    redis_config: RedisConfig,
+) -> AsyncGenerator[BlockingConnectionPool, None]:
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        yield connection_pool
+
+
+@pytest.fixture(scope="function")
+async def redis(
+    connection_pool: BlockingConnectionPool,
+) -> AsyncGenerator[Redis, None]:
+    async for redis in redis_factory(connection_pool):
         yield redis
 
 
@@ -26,6 +40,14 @@ async def redis_pipeline(redis: Redis) -> AsyncGenerator[Pipeline, None]:
         yield redis_pipeline
 
 
+@pytest.fixture(scope="function")
+async def lock_release_listener(
+    redis: Redis,
+) -> AsyncGenerator[LockReleaseListener, None]:
+    async for release_listener in lock_release_listener_factory(redis):
+        yield release_listener
+
+
 @pytest.fixture(scope="function")
 async def clear_redis(redis: Redis) -> None:
     await redis.flushall()
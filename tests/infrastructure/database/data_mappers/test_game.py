@@ -19,10 +19,18 @@ from connection_hub.domain import (
 )
 from connection_hub.infrastructure import (
     common_retort_factory,
+    converters_factory,
+    NearCacheConfig,
+    NearCache,
     LockManagerConfig,
+    LockReleaseListener,
     LockManager,
+    StorageFormat,
+    EntityCodecConfig,
+    EntityCodec,
     GameMapperConfig,
     GameMapper,
+    VersionTracker,
     RedisTransactionManager,
 )
 
@@ -33,29 +41,46 @@ _FIRST_PLAYER_ID: Final = UserId(uuid7())
 _SECOND_PLAYER_ID: Final = UserId(uuid7())
 
 
+@pytest.mark.parametrize(
+    "storage_format",
+    [StorageFormat.JSON, StorageFormat.BINARY],
+)
+@pytest.mark.parametrize("hash_storage_enabled", [False, True])
 @pytest.mark.usefixtures("clear_redis")
 async def test_game_mapper(
     redis: Redis,
     redis_pipeline: Pipeline,
+    storage_format: StorageFormat,
+    hash_storage_enabled: bool,
 ):
     lock_manager_config = LockManagerConfig(timedelta(seconds=3))
     lock_manager = LockManager(
         redis=redis,
+        release_listener=LockReleaseListener(redis),
         config=lock_manager_config,
     )
+    version_tracker = VersionTracker()
 
-    game_mapper_config = GameMapperConfig(timedelta(days=1))
+    game_mapper_config = GameMapperConfig(
+        game_expires_in=timedelta(days=1),
+        hash_storage_enabled=hash_storage_enabled,
+    )
     game_mapper = GameMapper(
         redis=redis,
         redis_pipeline=redis_pipeline,
-        common_retort=common_retort_factory(),
+        near_cache=NearCache(redis, NearCacheConfig()),
+        converters=converters_factory(common_retort_factory()),
+        codec=EntityCodec(EntityCodecConfig(storage_format)),
         lock_manager=lock_manager,
+        version_tracker=version_tracker,
         config=game_mapper_config,
     )
 
     transaction_manager = RedisTransactionManager(
+        redis=redis,
         redis_pipeline=redis_pipeline,
         lock_manager=lock_manager,
+        version_tracker=version_tracker,
     )
 
     game = await game_mapper.by_id(_GAME_ID)
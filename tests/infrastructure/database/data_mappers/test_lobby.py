@@ -6,6 +6,7 @@ from datetime import timedelta
 from typing import Final
 
 import pytest
+from redis.asyncio import ConnectionPool
 from redis.asyncio.client import Redis, Pipeline
 from uuid_extensions import uuid7
 
@@ -14,13 +15,24 @@ from connection_hub.domain import (
     UserId,
     UserRole,
     ConnectFourLobby,
+    Lobby,
 )
+from connection_hub.application import OpenLobbyFilters
 from connection_hub.infrastructure import (
     common_retort_factory,
+    converters_factory,
+    ReplicaRouter,
+    NearCacheConfig,
+    NearCache,
     LockManagerConfig,
+    LockReleaseListener,
     LockManager,
+    StorageFormat,
+    EntityCodecConfig,
+    EntityCodec,
     LobbyMapperConfig,
     LobbyMapper,
+    VersionTracker,
     RedisTransactionManager,
 )
 
@@ -31,29 +43,63 @@ _FIRST_USER_ID: Final = UserId(uuid7())
 _SECOND_USER_ID: Final = UserId(uuid7())
 
 
+class _StaleReplicaRouter(ReplicaRouter):
+    """
+    Routes every read to a replica, which has not received
+    anything from the primary.
+    """
+
+    __slots__ = ("_stale_replica",)
+
+    def __init__(self, primary: Redis, stale_replica: Redis):
+        super().__init__(primary)
+        self._stale_replica = stale_replica
+
+    def reader(self) -> Redis:
+        return self._stale_replica
+
+
+@pytest.mark.parametrize(
+    "storage_format",
+    [StorageFormat.JSON, StorageFormat.BINARY],
+)
+@pytest.mark.parametrize("hash_storage_enabled", [False, True])
 @pytest.mark.usefixtures("clear_redis")
 async def test_lobby_mapper(
     redis: Redis,
     redis_pipeline: Pipeline,
+    storage_format: StorageFormat,
+    hash_storage_enabled: bool,
 ):
     lock_manager_config = LockManagerConfig(timedelta(seconds=3))
     lock_manager = LockManager(
         redis=redis,
+        release_listener=LockReleaseListener(redis),
         config=lock_manager_config,
     )
+    version_tracker = VersionTracker()
 
-    lobby_mapper_config = LobbyMapperConfig(timedelta(days=1))
+    lobby_mapper_config = LobbyMapperConfig(
+        lobby_expires_in=timedelta(days=1),
+        hash_storage_enabled=hash_storage_enabled,
+    )
     lobby_mapper = LobbyMapper(
         redis=redis,
         redis_pipeline=redis_pipeline,
-        common_retort=common_retort_factory(),
+        replica_router=ReplicaRouter(redis),
+        near_cache=NearCache(redis, NearCacheConfig()),
+        converters=converters_factory(common_retort_factory()),
+        codec=EntityCodec(EntityCodecConfig(storage_format)),
         lock_manager=lock_manager,
+        version_tracker=version_tracker,
         config=lobby_mapper_config,
     )
 
     transaction_manager = RedisTransactionManager(
+        redis=redis,
         redis_pipeline=redis_pipeline,
         lock_manager=lock_manager,
+        version_tracker=version_tracker,
     )
 
     lobby = await lobby_mapper.by_id(_LOBBY_ID)
@@ -79,12 +125,18 @@ async def test_lobby_mapper(
     )
     assert lobby_from_database == new_lobby
 
+    # Expiration time is refreshed on update.
+    lobby_key = f"lobbies:{_LOBBY_ID.hex}"
+    await redis.expire(lobby_key, timedelta(minutes=1))
+
     updated_lobby = new_lobby
     updated_lobby.users.pop(_SECOND_USER_ID)
     updated_lobby.admin_role_transfer_queue.pop()
     await lobby_mapper.update(updated_lobby)
     await transaction_manager.commit()
 
+    assert await redis.ttl(lobby_key) > timedelta(minutes=1).total_seconds()
+
     lobby_from_database = await lobby_mapper.by_user_id(
         user_id=_FIRST_USER_ID,
         acquire=True,
@@ -105,3 +157,380 @@ async def test_lobby_mapper(
         acquire=True,
     )
     assert lobby_from_database is None
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_identity_map(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    lobby_mapper = LobbyMapper(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        replica_router=ReplicaRouter(redis),
+        near_cache=NearCache(redis, NearCacheConfig()),
+        converters=converters_factory(common_retort_factory()),
+        codec=EntityCodec(EntityCodecConfig()),
+        lock_manager=LockManager(
+            redis=redis,
+            release_listener=LockReleaseListener(redis),
+            config=LockManagerConfig(timedelta(seconds=3)),
+        ),
+        version_tracker=VersionTracker(),
+        config=LobbyMapperConfig(timedelta(days=1)),
+    )
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="fake_lobby",
+        users={_FIRST_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    await lobby_mapper.save(lobby)
+    await redis_pipeline.execute()
+
+    assert await lobby_mapper.by_user_id(_SECOND_USER_ID) is None
+
+    # Changes made by someone else within the same request
+    # are not visible, since lookups are served from
+    # the identity map.
+    await redis.flushall()
+    await redis.set(f"lobby_by_user:{_SECOND_USER_ID.hex}", _LOBBY_ID.hex)
+
+    assert await lobby_mapper.by_id(_LOBBY_ID) is lobby
+    assert await lobby_mapper.by_user_id(_FIRST_USER_ID) is lobby
+    assert await lobby_mapper.by_user_id(_SECOND_USER_ID) is None
+
+    await lobby_mapper.delete(lobby)
+    assert await lobby_mapper.by_id(_LOBBY_ID) is None
+    assert await lobby_mapper.by_user_id(_FIRST_USER_ID) is None
+
+
+@pytest.mark.parametrize("hash_storage_enabled", [False, True])
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_bulk_operations(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+    hash_storage_enabled: bool,
+):
+    def lobby_mapper_factory() -> LobbyMapper:
+        return LobbyMapper(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            replica_router=ReplicaRouter(redis),
+            near_cache=NearCache(redis, NearCacheConfig()),
+            converters=converters_factory(common_retort_factory()),
+            codec=EntityCodec(EntityCodecConfig()),
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=3)),
+            ),
+            version_tracker=VersionTracker(),
+            config=LobbyMapperConfig(
+                lobby_expires_in=timedelta(days=1),
+                hash_storage_enabled=hash_storage_enabled,
+            ),
+        )
+
+    first_lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="fake_lobby",
+        users={_FIRST_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    second_lobby = ConnectFourLobby(
+        id=LobbyId(uuid7()),
+        name="fake_lobby",
+        users={_SECOND_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    await lobby_mapper_factory().save_many([first_lobby, second_lobby])
+
+    # Each sorted set of open lobbies gets both lobbies
+    # with a single command.
+    commands = [args[0] for args, _ in redis_pipeline.command_stack]
+    assert commands.count("ZADD") == 4
+    await redis_pipeline.execute()
+
+    lobby_mapper = lobby_mapper_factory()
+    lobbies = await lobby_mapper.by_ids(
+        [second_lobby.id, LobbyId(uuid7()), first_lobby.id],
+    )
+    assert lobbies == [second_lobby, first_lobby]
+
+    lobby_mapper = lobby_mapper_factory()
+    lobbies = await lobby_mapper.by_user_ids(
+        [_FIRST_USER_ID, UserId(uuid7()), _SECOND_USER_ID],
+    )
+    assert lobbies == [first_lobby, second_lobby]
+
+    await lobby_mapper_factory().delete_many([first_lobby, second_lobby])
+
+    # Lobbies and their index entries are deleted with
+    # a single command.
+    commands = [args[0] for args, _ in redis_pipeline.command_stack]
+    assert commands.count("DEL") == 1
+    await redis_pipeline.execute()
+
+    assert not await redis.keys()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_list_open(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    def lobby_mapper_factory() -> LobbyMapper:
+        return LobbyMapper(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            replica_router=ReplicaRouter(redis),
+            near_cache=NearCache(redis, NearCacheConfig()),
+            converters=converters_factory(common_retort_factory()),
+            codec=EntityCodec(EntityCodecConfig()),
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=3)),
+            ),
+            version_tracker=VersionTracker(),
+            config=LobbyMapperConfig(lobby_expires_in=timedelta(days=1)),
+        )
+
+    lobbies = [
+        ConnectFourLobby(
+            id=LobbyId(uuid7()),
+            name="fake_lobby",
+            users={UserId(uuid7()): UserRole.ADMIN},
+            admin_role_transfer_queue=[],
+            password=password,
+            time_for_each_player=timedelta(minutes=3),
+        )
+        for password in [None, "fake_password", None]
+    ]
+    oldest_lobby, private_lobby, newest_lobby = lobbies
+    await lobby_mapper_factory().save_many(lobbies)
+    await redis_pipeline.execute()
+
+    page = await lobby_mapper_factory().list_open(
+        cursor=None,
+        limit=2,
+        filters=OpenLobbyFilters(),
+    )
+    assert page.lobbies == [newest_lobby, private_lobby]
+    assert page.next_cursor == private_lobby.id
+
+    page = await lobby_mapper_factory().list_open(
+        cursor=page.next_cursor,
+        limit=2,
+        filters=OpenLobbyFilters(),
+    )
+    assert page.lobbies == [oldest_lobby]
+    assert page.next_cursor is None
+
+    page = await lobby_mapper_factory().list_open(
+        cursor=None,
+        limit=2,
+        filters=OpenLobbyFilters(has_password=True),
+    )
+    assert page.lobbies == [private_lobby]
+
+    await lobby_mapper_factory().delete(newest_lobby)
+    await redis_pipeline.execute()
+
+    # Entry of an expired lobby is removed while listing.
+    await redis.delete(f"lobbies:{oldest_lobby.id.hex}")
+
+    page = await lobby_mapper_factory().list_open(
+        cursor=None,
+        limit=2,
+        filters=OpenLobbyFilters(has_password=False),
+    )
+    assert page.lobbies == []
+    assert not await redis.exists("open_lobbies:connect_four:without_password")
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_does_not_list_full_lobbies(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    def lobby_mapper_factory() -> LobbyMapper:
+        return LobbyMapper(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            replica_router=ReplicaRouter(redis),
+            near_cache=NearCache(redis, NearCacheConfig()),
+            converters=converters_factory(common_retort_factory()),
+            codec=EntityCodec(EntityCodecConfig()),
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=3)),
+            ),
+            version_tracker=VersionTracker(),
+            config=LobbyMapperConfig(lobby_expires_in=timedelta(days=1)),
+        )
+
+    async def list_open() -> list[Lobby]:
+        page = await lobby_mapper_factory().list_open(
+            cursor=None,
+            limit=10,
+            filters=OpenLobbyFilters(),
+        )
+        return page.lobbies
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="fake_lobby",
+        users={_FIRST_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    await lobby_mapper_factory().save(lobby)
+    await redis_pipeline.execute()
+
+    assert await list_open() == [lobby]
+
+    lobby.users[_SECOND_USER_ID] = UserRole.REGULAR_MEMBER
+    lobby.admin_role_transfer_queue.append(_SECOND_USER_ID)
+    await lobby_mapper_factory().update(lobby)
+    await redis_pipeline.execute()
+
+    assert await list_open() == []
+    assert not await redis.exists("open_lobbies")
+
+    del lobby.users[_SECOND_USER_ID]
+    lobby.admin_role_transfer_queue.remove(_SECOND_USER_ID)
+    await lobby_mapper_factory().update(lobby)
+    await redis_pipeline.execute()
+
+    assert await list_open() == [lobby]
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_reads_from_primary_what_decides_writes(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    connection_pool = redis.connection_pool
+    stale_replica = Redis(
+        connection_pool=ConnectionPool(
+            connection_class=connection_pool.connection_class,
+            **{**connection_pool.connection_kwargs, "db": 1},
+        ),
+    )
+    await stale_replica.flushdb()
+
+    def lobby_mapper_factory() -> LobbyMapper:
+        return LobbyMapper(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            replica_router=_StaleReplicaRouter(redis, stale_replica),
+            near_cache=NearCache(redis, NearCacheConfig()),
+            converters=converters_factory(common_retort_factory()),
+            codec=EntityCodec(EntityCodecConfig()),
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=3)),
+            ),
+            version_tracker=VersionTracker(),
+            config=LobbyMapperConfig(lobby_expires_in=timedelta(days=1)),
+        )
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="fake_lobby",
+        users={_FIRST_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    await lobby_mapper_factory().save(lobby)
+    await redis_pipeline.execute()
+
+    lobby_mapper = lobby_mapper_factory()
+    assert await lobby_mapper.by_id(_LOBBY_ID) == lobby
+    assert await lobby_mapper.by_user_id(_FIRST_USER_ID) == lobby
+    assert await lobby_mapper.by_ids([_LOBBY_ID]) == [lobby]
+
+    # Pages of the lobby browser are only displayed, so
+    # they are read from the replica.
+    page = await lobby_mapper.list_open(
+        cursor=None,
+        limit=10,
+        filters=OpenLobbyFilters(),
+    )
+    assert page.lobbies == []
+
+    await stale_replica.aclose()
+    await stale_replica.connection_pool.aclose()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lobby_mapper_keeps_index_entries_of_users_who_moved(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    def lobby_mapper_factory() -> LobbyMapper:
+        return LobbyMapper(
+            redis=redis,
+            redis_pipeline=redis_pipeline,
+            replica_router=ReplicaRouter(redis),
+            near_cache=NearCache(redis, NearCacheConfig()),
+            converters=converters_factory(common_retort_factory()),
+            codec=EntityCodec(EntityCodecConfig()),
+            lock_manager=LockManager(
+                redis=redis,
+                release_listener=LockReleaseListener(redis),
+                config=LockManagerConfig(timedelta(seconds=3)),
+            ),
+            version_tracker=VersionTracker(),
+            config=LobbyMapperConfig(lobby_expires_in=timedelta(days=1)),
+        )
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="fake_lobby",
+        users={
+            _FIRST_USER_ID: UserRole.ADMIN,
+            _SECOND_USER_ID: UserRole.REGULAR_MEMBER,
+        },
+        admin_role_transfer_queue=[_SECOND_USER_ID],
+        password=None,
+        time_for_each_player=timedelta(minutes=3),
+    )
+    await lobby_mapper_factory().save(lobby)
+    await redis_pipeline.execute()
+
+    lobby_mapper = lobby_mapper_factory()
+    lobby_from_database = await lobby_mapper.by_id(_LOBBY_ID)
+    assert lobby_from_database
+
+    # Second user moves to another lobby after the lobby
+    # has been loaded.
+    other_lobby_id = LobbyId(uuid7())
+    second_index_key = f"lobby_by_user:{_SECOND_USER_ID.hex}"
+    await redis.set(second_index_key, other_lobby_id.hex)
+
+    del lobby_from_database.users[_SECOND_USER_ID]
+    lobby_from_database.admin_role_transfer_queue.clear()
+    await lobby_mapper.update(lobby_from_database)
+    await redis_pipeline.execute()
+
+    assert await redis.get(second_index_key) == other_lobby_id.hex
+
+    await lobby_mapper_factory().delete(lobby)
+    await redis_pipeline.execute()
+
+    assert not await redis.exists(f"lobby_by_user:{_FIRST_USER_ID.hex}")
+    assert await redis.get(second_index_key) == other_lobby_id.hex
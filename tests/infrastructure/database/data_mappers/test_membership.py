@@ -0,0 +1,123 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import timedelta
+from typing import Final
+
+import pytest
+from redis.asyncio.client import Redis, Pipeline
+from uuid_extensions import uuid7
+
+from connection_hub.domain import (
+    LobbyId,
+    UserId,
+    UserRole,
+    ConnectFourLobby,
+)
+from connection_hub.application import Membership
+from connection_hub.infrastructure import (
+    common_retort_factory,
+    converters_factory,
+    ReplicaRouter,
+    NearCacheConfig,
+    NearCache,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    EntityCodecConfig,
+    EntityCodec,
+    LobbyMapperConfig,
+    LobbyMapper,
+    GameMapperConfig,
+    GameMapper,
+    MembershipMapper,
+    VersionTracker,
+    RedisTransactionManager,
+)
+
+
+_LOBBY_ID: Final = LobbyId(uuid7())
+
+_USER_ID: Final = UserId(uuid7())
+_OTHER_USER_ID: Final = UserId(uuid7())
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_membership_mapper(redis: Redis, redis_pipeline: Pipeline):
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=LockReleaseListener(redis),
+        config=LockManagerConfig(timedelta(seconds=3)),
+    )
+    version_tracker = VersionTracker()
+    converters = converters_factory(common_retort_factory())
+    codec = EntityCodec(EntityCodecConfig())
+
+    lobby_mapper_config = LobbyMapperConfig(
+        lobby_expires_in=timedelta(days=1),
+    )
+    lobby_mapper = LobbyMapper(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        replica_router=ReplicaRouter(redis),
+        near_cache=NearCache(redis, NearCacheConfig()),
+        converters=converters,
+        codec=codec,
+        lock_manager=lock_manager,
+        version_tracker=version_tracker,
+        config=lobby_mapper_config,
+    )
+    game_mapper_config = GameMapperConfig(
+        game_expires_in=timedelta(days=1),
+    )
+    game_mapper = GameMapper(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        near_cache=NearCache(redis, NearCacheConfig()),
+        converters=converters,
+        codec=codec,
+        lock_manager=lock_manager,
+        version_tracker=version_tracker,
+        config=game_mapper_config,
+    )
+    membership_mapper = MembershipMapper(
+        redis=redis,
+        lobby_gateway=lobby_mapper,
+        game_gateway=game_mapper,
+        lobby_mapper_config=lobby_mapper_config,
+        game_mapper_config=game_mapper_config,
+    )
+
+    transaction_manager = RedisTransactionManager(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        lock_manager=lock_manager,
+        version_tracker=version_tracker,
+    )
+
+    membership = await membership_mapper.membership(_USER_ID)
+    assert membership == Membership()
+
+    lobby = ConnectFourLobby(
+        id=_LOBBY_ID,
+        name="Connect Four for money!!",
+        users={_USER_ID: UserRole.ADMIN},
+        admin_role_transfer_queue=[],
+        password=None,
+        time_for_each_player=timedelta(minutes=1),
+    )
+    await lobby_mapper.save(lobby)
+    await transaction_manager.commit()
+
+    membership = await membership_mapper.membership(_USER_ID)
+    assert membership == Membership(lobby_id=_LOBBY_ID)
+
+    membership = await membership_mapper.membership(_OTHER_USER_ID)
+    assert membership == Membership()
+
+    # Index entries, whose lobbies do not exist, are ignored.
+    await redis.delete(f"lobbies:{_LOBBY_ID.hex}")
+
+    membership = await membership_mapper.membership(_USER_ID)
+    assert membership == Membership()
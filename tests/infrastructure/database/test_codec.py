@@ -0,0 +1,95 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import json
+from enum import StrEnum
+from typing import Final
+
+import pytest
+from uuid_extensions import uuid7
+
+from connection_hub.infrastructure import (
+    StorageFormat,
+    EntityCodecConfig,
+    EntityCodec,
+)
+
+
+_ENTITY_ID: Final = str(uuid7())
+_USER_ID: Final = str(uuid7())
+
+_ENTITY: Final = {
+    "id": _ENTITY_ID,
+    "users": {_USER_ID: "admin"},
+    "queue": [_USER_ID],
+    "name": "fake_name",
+    "time_for_each_player": 60.0,
+}
+
+
+@pytest.mark.parametrize(
+    "storage_format",
+    [StorageFormat.JSON, StorageFormat.BINARY],
+)
+def test_entity_codec(storage_format: StorageFormat):
+    codec = EntityCodec(EntityCodecConfig(storage_format))
+
+    encoded_entity = codec.encode(_ENTITY, version=3)
+    assert codec.decode(encoded_entity) == (_ENTITY, 3)
+
+    # Both formats are read regardless of the configured one.
+    other_codec = EntityCodec(
+        EntityCodecConfig(
+            StorageFormat.JSON
+            if storage_format == StorageFormat.BINARY
+            else StorageFormat.BINARY,
+        ),
+    )
+    assert other_codec.decode(encoded_entity) == (_ENTITY, 3)
+
+
+def test_entity_codec_with_unversioned_json():
+    codec = EntityCodec(EntityCodecConfig(StorageFormat.BINARY))
+    assert codec.decode(json.dumps(_ENTITY)) == (_ENTITY, 0)
+
+
+def test_entity_codec_with_surrogate_escaped_value():
+    codec = EntityCodec(EntityCodecConfig(StorageFormat.BINARY))
+
+    encoded_entity = codec.encode(_ENTITY, version=1)
+    assert isinstance(encoded_entity, bytes)
+
+    # Redis client decodes responses with `surrogateescape`.
+    decoded_response = encoded_entity.decode("utf-8", "surrogateescape")
+    assert codec.decode(decoded_response) == (_ENTITY, 1)
+
+
+@pytest.mark.parametrize(
+    "storage_format",
+    [StorageFormat.JSON, StorageFormat.BINARY],
+)
+def test_entity_codec_fields(storage_format: StorageFormat):
+    codec = EntityCodec(EntityCodecConfig(storage_format))
+
+    for value in ("admin", {"id": _USER_ID, "time_left": 60.0}):
+        encoded_value = codec.encode_field(value)
+        assert codec.decode_field(encoded_value) == value
+
+
+def test_entity_codec_with_binary_values():
+    class _Role(StrEnum):
+        ADMIN = "admin"
+
+    entity = {
+        **_ENTITY,
+        "role": _Role.ADMIN,
+        "description": "x" * 300,
+        "password": None,
+        "is_private": True,
+        "rounds": -3,
+    }
+    codec = EntityCodec(EntityCodecConfig(StorageFormat.BINARY))
+
+    encoded_entity = codec.encode(entity, version=2)
+    assert codec.decode(encoded_entity) == (entity, 2)
@@ -0,0 +1,180 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from redis.asyncio.client import Redis
+from redis.asyncio.connection import BlockingConnectionPool
+
+from connection_hub.infrastructure import (
+    LockWaitMode,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    connection_pool_usage,
+)
+
+
+@pytest.mark.parametrize(
+    "wait_mode",
+    [LockWaitMode.POLLING, LockWaitMode.NOTIFICATION],
+)
+@pytest.mark.usefixtures("clear_redis")
+async def test_lock_manager(
+    redis: Redis,
+    lock_release_listener: LockReleaseListener,
+    wait_mode: LockWaitMode,
+):
+    config = LockManagerConfig(
+        lock_expires_in=timedelta(seconds=3),
+        wait_mode=wait_mode,
+        poll_interval=timedelta(milliseconds=100),
+        notification_timeout=timedelta(seconds=3),
+    )
+    first_lock_manager = LockManager(
+        redis=redis,
+        release_listener=lock_release_listener,
+        config=config,
+    )
+    second_lock_manager = LockManager(
+        redis=redis,
+        release_listener=lock_release_listener,
+        config=config,
+    )
+
+    await first_lock_manager.acquire("fake_lock")
+
+    second_acquisition = asyncio.create_task(
+        second_lock_manager.acquire("fake_lock"),
+    )
+    await asyncio.sleep(0.2)
+    assert not second_acquisition.done()
+
+    await first_lock_manager.release_all()
+    await asyncio.wait_for(second_acquisition, timeout=1)
+
+    await second_lock_manager.release_all()
+
+
+class _UnavailableReleaseListener(LockReleaseListener):
+    async def subscribe(
+        self,
+        channel: str,
+        *,
+        confirmation_timeout: timedelta,
+    ) -> asyncio.Event:
+        raise ConnectionError("Pub/sub is unavailable.")
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lock_manager_polls_without_pubsub(redis: Redis):
+    config = LockManagerConfig(
+        lock_expires_in=timedelta(seconds=3),
+        wait_mode=LockWaitMode.NOTIFICATION,
+        poll_interval=timedelta(milliseconds=100),
+        notification_timeout=timedelta(seconds=3),
+    )
+    first_lock_manager = LockManager(
+        redis=redis,
+        release_listener=_UnavailableReleaseListener(redis),
+        config=config,
+    )
+    second_lock_manager = LockManager(
+        redis=redis,
+        release_listener=_UnavailableReleaseListener(redis),
+        config=config,
+    )
+
+    await first_lock_manager.acquire("fake_lock")
+
+    second_acquisition = asyncio.create_task(
+        second_lock_manager.acquire("fake_lock"),
+    )
+    await asyncio.sleep(0.2)
+    assert not second_acquisition.done()
+
+    # Lock is acquired within a poll interval rather than
+    # a notification timeout.
+    await first_lock_manager.release_all()
+    await asyncio.wait_for(second_acquisition, timeout=0.5)
+
+    await second_lock_manager.release_all()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lock_waiters_share_one_connection(
+    connection_pool: BlockingConnectionPool,
+    redis: Redis,
+    lock_release_listener: LockReleaseListener,
+):
+    config = LockManagerConfig(
+        lock_expires_in=timedelta(seconds=3),
+        wait_mode=LockWaitMode.NOTIFICATION,
+        notification_timeout=timedelta(seconds=3),
+    )
+    holder = LockManager(
+        redis=redis,
+        release_listener=lock_release_listener,
+        config=config,
+    )
+    waiters = [
+        LockManager(
+            redis=redis,
+            release_listener=lock_release_listener,
+            config=config,
+        )
+        for _ in range(10)
+    ]
+
+    await holder.acquire("first_lock")
+    await holder.acquire("second_lock")
+
+    async def acquire_and_release(waiter: LockManager, lock_id: str) -> None:
+        await waiter.acquire(lock_id)
+        await waiter.release_all()
+
+    acquisitions = asyncio.gather(
+        *(
+            acquire_and_release(waiter, lock_id)
+            for waiter, lock_id in zip(
+                waiters,
+                ["first_lock", "second_lock"] * 5,
+                strict=True,
+            )
+        ),
+    )
+    await asyncio.sleep(0.2)
+
+    # Only the pubsub connection is held while waiting.
+    assert connection_pool_usage(connection_pool).in_use_connections == 1
+
+    # Each release wakes the following waiter long before
+    # its notification timeout.
+    await holder.release_all()
+    await asyncio.wait_for(acquisitions, timeout=1)
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_lock_manager_renews_locks(
+    redis: Redis,
+    lock_release_listener: LockReleaseListener,
+):
+    config = LockManagerConfig(
+        lock_expires_in=timedelta(milliseconds=300),
+        renewal_enabled=True,
+    )
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=lock_release_listener,
+        config=config,
+    )
+
+    await lock_manager.acquire("fake_lock")
+    await asyncio.sleep(1)
+    assert await redis.exists("locks:fake_lock")
+
+    await lock_manager.release_all()
+    assert not await redis.exists("locks:fake_lock")
@@ -0,0 +1,90 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+import pytest
+from redis.asyncio.client import Redis, Pipeline
+from uuid_extensions import uuid7
+
+from connection_hub.domain import UserId, ConnectFourRuleSet
+from connection_hub.application import MatchmakingTicket
+from connection_hub.infrastructure import (
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    MatchmakingQueueConfig,
+    RedisMatchmakingQueue,
+)
+
+
+_RULE_SET: Final = ConnectFourRuleSet(
+    time_for_each_player=timedelta(minutes=1),
+)
+_TICKET_EXPIRES_IN: Final = timedelta(minutes=1)
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_redis_matchmaking_queue(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=LockReleaseListener(redis),
+        config=LockManagerConfig(timedelta(seconds=3)),
+    )
+    matchmaking_queue = RedisMatchmakingQueue(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        lock_manager=lock_manager,
+        config=MatchmakingQueueConfig(ticket_expires_in=_TICKET_EXPIRES_IN),
+    )
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    expired_ticket = MatchmakingTicket(
+        user_id=UserId(uuid7()),
+        rule_set=_RULE_SET,
+        enqueued_at=now - _TICKET_EXPIRES_IN * 2,
+    )
+    first_ticket = MatchmakingTicket(
+        user_id=UserId(uuid7()),
+        rule_set=_RULE_SET,
+        enqueued_at=now - timedelta(seconds=10),
+    )
+    second_ticket = MatchmakingTicket(
+        user_id=UserId(uuid7()),
+        rule_set=_RULE_SET,
+        enqueued_at=now,
+    )
+    for ticket in [second_ticket, expired_ticket, first_ticket]:
+        await matchmaking_queue.add(ticket)
+
+    # User entering the queue again keeps their place in it.
+    await matchmaking_queue.add(
+        MatchmakingTicket(
+            user_id=first_ticket.user_id,
+            rule_set=_RULE_SET,
+            enqueued_at=now + timedelta(seconds=10),
+        ),
+    )
+    await redis_pipeline.execute()
+
+    assert await matchmaking_queue.rule_sets() == [_RULE_SET]
+
+    tickets = await matchmaking_queue.oldest(
+        rule_set=_RULE_SET,
+        limit=10,
+        acquire=True,
+    )
+    assert tickets == [first_ticket, second_ticket]
+    assert lock_manager.acquired_locks
+
+    await matchmaking_queue.remove_many(tickets)
+    await redis_pipeline.execute()
+    await lock_manager.release_all()
+
+    assert not await matchmaking_queue.oldest(rule_set=_RULE_SET, limit=10)
+    assert await matchmaking_queue.rule_sets() == []
@@ -0,0 +1,88 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from redis.asyncio.client import Redis
+
+from connection_hub.infrastructure import NearCacheConfig, NearCache
+
+
+_CONFIG = NearCacheConfig(
+    enabled=True,
+    max_size=2,
+    check_interval=timedelta(milliseconds=50),
+    metrics_interval=timedelta(),
+)
+
+
+async def _started_near_cache(redis: Redis) -> NearCache:
+    near_cache = NearCache(redis=redis, config=_CONFIG)
+    await near_cache.start()
+
+    for _ in range(20):
+        if near_cache.active:
+            break
+        await asyncio.sleep(0.05)
+
+    assert near_cache.active
+    return near_cache
+
+
+async def test_near_cache_disabled(redis: Redis):
+    near_cache = NearCache(redis=redis, config=NearCacheConfig())
+    await near_cache.start()
+
+    near_cache.put("lobbies:{fake}", "fake", epoch=near_cache.epoch())
+    assert not near_cache.active
+    assert near_cache.get("lobbies:{fake}") is None
+
+    await near_cache.stop()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_near_cache_invalidates_changed_keys(redis: Redis):
+    near_cache = await _started_near_cache(redis)
+
+    await redis.set("lobbies:{fake}", "fake")
+    near_cache.put("lobbies:{fake}", "fake", epoch=near_cache.epoch())
+    assert near_cache.get("lobbies:{fake}") == "fake"
+
+    await redis.set("lobbies:{fake}", "changed_fake")
+    await asyncio.sleep(0.2)
+    assert near_cache.get("lobbies:{fake}") is None
+
+    await near_cache.stop()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_near_cache_skips_values_read_before_invalidation(redis: Redis):
+    near_cache = await _started_near_cache(redis)
+
+    epoch = near_cache.epoch()
+    await redis.set("games:{fake}", "changed_fake")
+    await asyncio.sleep(0.2)
+
+    near_cache.put("games:{fake}", "fake", epoch=epoch)
+    assert near_cache.get("games:{fake}") is None
+
+    await near_cache.stop()
+
+
+async def test_near_cache_evicts_least_recently_used_keys(redis: Redis):
+    near_cache = await _started_near_cache(redis)
+
+    for key in ("lobbies:{first}", "lobbies:{second}"):
+        near_cache.put(key, key, epoch=near_cache.epoch())
+
+    near_cache.get("lobbies:{first}")
+    near_cache.put("lobbies:{third}", "third", epoch=near_cache.epoch())
+
+    assert near_cache.get("lobbies:{first}") == "lobbies:{first}"
+    assert near_cache.get("lobbies:{second}") is None
+    assert near_cache.get("lobbies:{third}") == "third"
+
+    await near_cache.stop()
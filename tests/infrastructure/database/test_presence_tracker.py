@@ -0,0 +1,100 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import UserId
+from connection_hub.application import (
+    IdentityProvider,
+    AcknowledgePresenceProcessor,
+)
+from connection_hub.infrastructure import RedisPresenceTracker
+
+
+class _FakeIdentityProvider(IdentityProvider):
+    __slots__ = ("_user_id",)
+
+    def __init__(self, user_id: UserId):
+        self._user_id = user_id
+
+    async def user_id(self) -> UserId:
+        return self._user_id
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_redis_presence_tracker(redis: Redis):
+    presence_tracker = RedisPresenceTracker(redis)
+
+    now = datetime.now(timezone.utc)
+    absent_user_id = UserId(uuid7())
+    returned_user_id = UserId(uuid7())
+    present_user_id = UserId(uuid7())
+
+    await presence_tracker.acknowledge_many(
+        [absent_user_id, returned_user_id],
+        at=now - timedelta(seconds=30),
+    )
+    await presence_tracker.acknowledge(present_user_id, at=now)
+    await presence_tracker.acknowledge(returned_user_id, at=now)
+
+    # Late acknowledgement does not move the time back.
+    await presence_tracker.acknowledge(
+        present_user_id,
+        at=now - timedelta(minutes=1),
+    )
+
+    seen_before = now - timedelta(seconds=15)
+    claimed_until = now + timedelta(seconds=15)
+    assert await presence_tracker.claim_absent(
+        seen_before=seen_before,
+        limit=10,
+        claimed_until=claimed_until,
+    ) == [absent_user_id]
+    assert not await presence_tracker.claim_absent(
+        seen_before=seen_before,
+        limit=10,
+        claimed_until=claimed_until,
+    )
+
+    # Claimed user is taken again once the claim expires.
+    next_claimed_until = claimed_until + timedelta(seconds=30)
+    assert set(
+        await presence_tracker.claim_absent(
+            seen_before=claimed_until + timedelta(seconds=1),
+            limit=10,
+            claimed_until=next_claimed_until,
+        ),
+    ) == {absent_user_id, returned_user_id, present_user_id}
+
+    # User, who has been seen after the claim, is not
+    # forgotten.
+    await presence_tracker.acknowledge(
+        returned_user_id,
+        at=next_claimed_until + timedelta(seconds=1),
+    )
+    await presence_tracker.forget(
+        [absent_user_id, returned_user_id],
+        claimed_until=next_claimed_until,
+    )
+    assert await redis.zscore("presence", absent_user_id.hex) is None
+    assert await redis.zscore("presence", returned_user_id.hex) is not None
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_acknowledged_presence_is_stored_without_commit(redis: Redis):
+    user_id = UserId(uuid7())
+    processor = AcknowledgePresenceProcessor(
+        presence_tracker=RedisPresenceTracker(redis),
+        identity_provider=_FakeIdentityProvider(user_id),
+    )
+
+    # Processor does not commit the transaction, so presence
+    # must be written as soon as it is acknowledged.
+    await processor.process()
+
+    assert await redis.zscore("presence", user_id.hex) is not None
@@ -0,0 +1,61 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import timedelta
+from typing import Final
+
+import pytest
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import LobbyId, GameId, UserId
+from connection_hub.infrastructure import RedisReaper
+
+
+_LOBBY_ID: Final = LobbyId(uuid7())
+_GAME_ID: Final = GameId(uuid7())
+
+_FIRST_USER_ID: Final = UserId(uuid7())
+_SECOND_USER_ID: Final = UserId(uuid7())
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_redis_reaper(redis: Redis):
+    lobby_key = f"lobbies:{_LOBBY_ID.hex}"
+    await redis.set(lobby_key, "{}")
+
+    game_key = f"games:{_GAME_ID.hex}"
+    await redis.set(game_key, "{}", ex=timedelta(minutes=1))
+
+    lobby_index_key = f"lobby_by_user:{_FIRST_USER_ID.hex}"
+    await redis.set(lobby_index_key, _LOBBY_ID.hex)
+
+    # Index entry of a game, which no longer exists.
+    orphaned_game_index_key = f"game_by_player:{_SECOND_USER_ID.hex}"
+    await redis.set(orphaned_game_index_key, GameId(uuid7()).hex)
+
+    lock_key = f"locks:{lobby_key}"
+    await redis.set(lock_key, "fake_owner_token:1")
+
+    reaper = RedisReaper(
+        redis,
+        lobby_expires_in=timedelta(days=1),
+        game_expires_in=timedelta(days=1),
+    )
+    reaped_keys_list = await reaper.reap()
+
+    assert await redis.ttl(lobby_key) > timedelta(hours=23).total_seconds()
+    assert await redis.ttl(game_key) <= timedelta(minutes=1).total_seconds()
+    assert await redis.ttl(lobby_index_key) > 0
+    assert not await redis.exists(orphaned_game_index_key)
+    assert not await redis.exists(lock_key)
+
+    reaped_keys_by_kind = {
+        reaped_keys.kind: reaped_keys for reaped_keys in reaped_keys_list
+    }
+    assert reaped_keys_by_kind["lobbies"].bounded == 1
+    assert reaped_keys_by_kind["games"].keys == 1
+    assert reaped_keys_by_kind["games"].bounded == 0
+    assert reaped_keys_by_kind["game_index"].deleted == 1
+    assert reaped_keys_by_kind["locks"].deleted == 1
@@ -0,0 +1,30 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from redis.asyncio.client import Redis
+from redis.asyncio.connection import BlockingConnectionPool
+
+from connection_hub.infrastructure import connection_pool_usage
+
+
+async def test_connection_pool_usage(
+    redis: Redis,
+    connection_pool: BlockingConnectionPool,
+):
+    await redis.ping()
+
+    usage = connection_pool_usage(connection_pool)
+    assert usage.in_use_connections == 0
+    assert usage.idle_connections == 1
+
+    async with redis.pipeline() as pipeline:
+        pipeline.ping()
+        pipeline.ping()
+        await pipeline.execute()
+
+    # Pipeline is served by the same pool and reuses
+    # the idle connection.
+    usage = connection_pool_usage(connection_pool)
+    assert usage.in_use_connections == 0
+    assert usage.idle_connections == 1
@@ -0,0 +1,36 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import asyncio
+from datetime import timedelta
+
+from redis.asyncio.client import Redis
+
+from connection_hub.infrastructure import ReplicaRouter
+
+
+async def test_replica_router_without_replicas(redis: Redis):
+    replica_router = ReplicaRouter(redis)
+    await replica_router.start()
+
+    assert replica_router.reader() is redis
+
+    await replica_router.stop()
+
+
+async def test_replica_router_skips_instances_not_replicating(redis: Redis):
+    # Test redis is not a replica, so it has no link to the
+    # primary and must never be read from.
+    not_replica = Redis(connection_pool=redis.connection_pool)
+    replica_router = ReplicaRouter(
+        primary=redis,
+        replicas=[not_replica],
+        max_lag=timedelta(milliseconds=50),
+    )
+    await replica_router.start()
+    await asyncio.sleep(0.2)
+
+    assert replica_router.reader() is redis
+
+    await replica_router.stop()
@@ -0,0 +1,48 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import json
+from datetime import timedelta
+from typing import Final
+
+import pytest
+from redis.asyncio.client import Redis
+from uuid_extensions import uuid7
+
+from connection_hub.domain import LobbyId, UserId
+from connection_hub.infrastructure import RedisStorageMigrator
+
+
+_LOBBY_ID: Final = LobbyId(uuid7())
+
+_FIRST_USER_ID: Final = UserId(uuid7())
+_SECOND_USER_ID: Final = UserId(uuid7())
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_redis_storage_migrator(redis: Redis):
+    sorted_user_ids = sorted([_FIRST_USER_ID, _SECOND_USER_ID])
+    legacy_lobby_key = (
+        f"lobbies:id:{_LOBBY_ID.hex}:user_ids:"
+        f"{':'.join(user_id.hex for user_id in sorted_user_ids)}"
+    )
+    lobby_as_json = json.dumps({"type": "connect_four"})
+    await redis.set(
+        name=legacy_lobby_key,
+        value=lobby_as_json,
+        ex=timedelta(days=1),
+    )
+
+    storage_migrator = RedisStorageMigrator(redis)
+    await storage_migrator.migrate()
+
+    lobby_key = f"lobbies:{_LOBBY_ID.hex}"
+    assert await redis.get(lobby_key) == lobby_as_json
+    assert await redis.ttl(lobby_key) > 0
+    assert not await redis.exists(legacy_lobby_key)
+
+    for user_id in (_FIRST_USER_ID, _SECOND_USER_ID):
+        index_key = f"lobby_by_user:{user_id.hex}"
+        assert await redis.get(index_key) == _LOBBY_ID.hex
+        assert await redis.ttl(index_key) > 0
@@ -0,0 +1,121 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import json
+from datetime import timedelta
+
+import pytest
+from redis.asyncio.client import Redis, Pipeline
+
+from connection_hub.infrastructure import (
+    TransactionConflictError,
+    LockLostError,
+    LockManagerConfig,
+    LockReleaseListener,
+    LockManager,
+    VersionTracker,
+    RedisTransactionManager,
+)
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_transaction_manager_with_lost_lock(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=LockReleaseListener(redis),
+        config=LockManagerConfig(timedelta(seconds=3)),
+    )
+    version_tracker = VersionTracker()
+    transaction_manager = RedisTransactionManager(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        lock_manager=lock_manager,
+        version_tracker=version_tracker,
+    )
+
+    await lock_manager.acquire("fake_lock")
+    assert lock_manager.fence_tokens == {"lock_fences:locks:fake_lock": 1}
+
+    # Lock expires and is acquired by someone else.
+    await redis.set("locks:fake_lock", "other_owner:2")
+
+    redis_pipeline.set("fake_key", "fake_value")
+    with pytest.raises(LockLostError):
+        await transaction_manager.commit()
+
+    assert await redis.get("fake_key") is None
+    assert await redis.get("locks:fake_lock") == "other_owner:2"
+
+    await lock_manager.release_all()
+    assert await redis.get("locks:fake_lock") == "other_owner:2"
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_transaction_manager_with_outfenced_lock(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    lock_manager = LockManager(
+        redis=redis,
+        release_listener=LockReleaseListener(redis),
+        config=LockManagerConfig(timedelta(seconds=3)),
+    )
+    transaction_manager = RedisTransactionManager(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        lock_manager=lock_manager,
+        version_tracker=VersionTracker(),
+    )
+
+    await lock_manager.acquire("fake_lock")
+
+    # Lock is acquired by someone else, who is given
+    # a newer fence token, while its value stays the same.
+    await redis.incr("lock_fences:locks:fake_lock")
+
+    redis_pipeline.set("fake_key", "fake_value")
+    with pytest.raises(LockLostError):
+        await transaction_manager.commit()
+
+    assert await redis.get("fake_key") is None
+
+    await lock_manager.release_all()
+
+
+@pytest.mark.usefixtures("clear_redis")
+async def test_transaction_manager_with_changed_version(
+    redis: Redis,
+    redis_pipeline: Pipeline,
+):
+    version_tracker = VersionTracker()
+    transaction_manager = RedisTransactionManager(
+        redis=redis,
+        redis_pipeline=redis_pipeline,
+        lock_manager=LockManager(
+            redis=redis,
+            release_listener=LockReleaseListener(redis),
+            config=LockManagerConfig(timedelta(seconds=3)),
+        ),
+        version_tracker=version_tracker,
+    )
+
+    await redis.set("fake_entity", json.dumps({"version": 1}))
+
+    version_tracker.expect("fake_entity", 1)
+    redis_pipeline.set("fake_entity", json.dumps({"version": 2}))
+    await transaction_manager.commit()
+
+    assert json.loads(await redis.get("fake_entity")) == {"version": 2}
+
+    # Entity is changed by someone else since it was loaded.
+    version_tracker.expect("fake_entity", 1)
+    redis_pipeline.set("fake_entity", json.dumps({"version": 2}))
+    redis_pipeline.set("fake_key", "fake_value")
+    with pytest.raises(TransactionConflictError):
+        await transaction_manager.commit()
+
+    assert await redis.get("fake_key") is None
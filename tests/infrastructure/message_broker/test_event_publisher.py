@@ -24,6 +24,7 @@ from connection_hub.application import (
 from connection_hub.infrastructure import (
     OperationId,
     common_retort_factory,
+    converters_factory,
     NATSConfig,
     nats_client_factory,
     nats_jetstream_factory,
@@ -92,7 +93,7 @@ async def test_nats_event_publihser(
 ):
     event_publisher = NATSEventPublisher(
         jetstream=nats_jetstream,
-        common_retort=common_retort_factory(),
+        converters=converters_factory(common_retort_factory()),
         operation_id=OperationId(uuid7()),
     )
     await event_publisher.publish(event)
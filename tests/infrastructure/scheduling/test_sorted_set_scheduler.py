@@ -0,0 +1,220 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from taskiq import BrokerMessage, InMemoryBroker, ScheduledTask
+from uuid_extensions import uuid7
+
+from connection_hub.infrastructure import (
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    taskiq_redis_schedule_source_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    schedules_by_time_key_factory,
+    RedisPipelineScheduleSource,
+    SortedSetSchedulerConfig,
+    SortedSetScheduler,
+)
+
+
+class _RecordingBroker(InMemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.messages: list[BrokerMessage] = []
+
+    async def kick(self, message: BrokerMessage) -> None:
+        self.messages.append(message)
+
+
+def _schedule(time: datetime) -> ScheduledTask:
+    return ScheduledTask(
+        task_name="disconnect_from_game",
+        labels={},
+        args=[],
+        kwargs={"game_id": uuid7().hex},
+        schedule_id=f"disconnect_from_game:{uuid7().hex}",
+        time=time,
+    )
+
+
+async def test_sorted_set_scheduler(redis_config: RedisConfig):
+    now = datetime.now(timezone.utc)
+    due_schedule = _schedule(now - timedelta(seconds=1))
+    future_schedule = _schedule(now + timedelta(minutes=1))
+
+    broker = _RecordingBroker()
+    schedulers = [
+        SortedSetScheduler(
+            broker=broker,
+            schedule_source=taskiq_redis_schedule_source_factory(
+                redis_config,
+            ),
+            config=SortedSetSchedulerConfig(),
+        )
+        for _ in range(2)
+    ]
+
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            schedule_source = shared_taskiq_redis_schedule_source_factory(
+                redis_config=redis_config,
+                connection_pool=connection_pool,
+            )
+            async for redis_pipeline in redis_pipeline_factory(redis):
+                await RedisPipelineScheduleSource(
+                    schedule_source=schedule_source,
+                    redis_pipeline=redis_pipeline,
+                ).add_schedules([due_schedule, future_schedule])
+                await redis_pipeline.execute()
+
+            # Both schedulers look for due schedules at once,
+            # but the task is sent only once.
+            await asyncio.gather(
+                *(scheduler.dispatch_due() for scheduler in schedulers),
+            )
+            sent_schedule_ids = [
+                message.labels["schedule_id"]
+                for message in broker.messages
+                if message.labels["schedule_id"]
+                in (due_schedule.schedule_id, future_schedule.schedule_id)
+            ]
+            assert sent_schedule_ids == [due_schedule.schedule_id]
+
+            schedules_by_time_key = schedules_by_time_key_factory(
+                schedule_source.prefix,
+            )
+            assert not await redis.exists(
+                f"{schedule_source.prefix}:{due_schedule.schedule_id}",
+            )
+            assert (
+                await redis.zscore(
+                    schedules_by_time_key,
+                    due_schedule.schedule_id,
+                )
+                is None
+            )
+            assert await redis.exists(
+                f"{schedule_source.prefix}:{future_schedule.schedule_id}",
+            )
+
+            await redis.delete(
+                f"{schedule_source.prefix}:{future_schedule.schedule_id}",
+            )
+            await redis.zrem(
+                schedules_by_time_key,
+                future_schedule.schedule_id,
+            )
+
+    for scheduler in schedulers:
+        await scheduler.shutdown()
+
+
+async def test_sorted_set_scheduler_with_undecodable_schedule(
+    redis_config: RedisConfig,
+):
+    now = datetime.now(timezone.utc)
+    due_schedule = _schedule(now - timedelta(seconds=1))
+    undecodable_schedule_id = f"disconnect_from_game:{uuid7().hex}"
+
+    broker = _RecordingBroker()
+    scheduler = SortedSetScheduler(
+        broker=broker,
+        schedule_source=taskiq_redis_schedule_source_factory(redis_config),
+        config=SortedSetSchedulerConfig(),
+    )
+
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            schedule_source = shared_taskiq_redis_schedule_source_factory(
+                redis_config=redis_config,
+                connection_pool=connection_pool,
+            )
+            async for redis_pipeline in redis_pipeline_factory(redis):
+                await RedisPipelineScheduleSource(
+                    schedule_source=schedule_source,
+                    redis_pipeline=redis_pipeline,
+                ).add_schedules([due_schedule])
+                await redis_pipeline.execute()
+
+            schedules_by_time_key = schedules_by_time_key_factory(
+                schedule_source.prefix,
+            )
+            undecodable_schedule_key = (
+                f"{schedule_source.prefix}:{undecodable_schedule_id}"
+            )
+            await redis.set(undecodable_schedule_key, "not a schedule")
+            await redis.zadd(
+                schedules_by_time_key,
+                {undecodable_schedule_id: 0},
+            )
+
+            # Undecodable schedule does not keep the due one
+            # from being sent.
+            await scheduler.dispatch_due()
+            sent_schedule_ids = [
+                message.labels["schedule_id"]
+                for message in broker.messages
+                if message.labels["schedule_id"]
+                in (due_schedule.schedule_id, undecodable_schedule_id)
+            ]
+            assert sent_schedule_ids == [due_schedule.schedule_id]
+
+            assert not await redis.exists(undecodable_schedule_key)
+            assert (
+                await redis.zscore(
+                    schedules_by_time_key,
+                    undecodable_schedule_id,
+                )
+                is None
+            )
+
+    await scheduler.shutdown()
+
+
+async def test_sorted_set_scheduler_indexes_schedules(
+    redis_config: RedisConfig,
+):
+    now = datetime.now(timezone.utc)
+    time = now + timedelta(minutes=1)
+    schedules = [_schedule(time) for _ in range(3)]
+
+    scheduler = SortedSetScheduler(
+        broker=_RecordingBroker(),
+        schedule_source=taskiq_redis_schedule_source_factory(redis_config),
+        config=SortedSetSchedulerConfig(batch_size=2),
+    )
+
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            schedule_source = shared_taskiq_redis_schedule_source_factory(
+                redis_config=redis_config,
+                connection_pool=connection_pool,
+            )
+            schedules_by_time_key = schedules_by_time_key_factory(
+                schedule_source.prefix,
+            )
+
+            # Schedules written before they were indexed by time.
+            for schedule in schedules:
+                await schedule_source.add_schedule(schedule)
+                await redis.zrem(schedules_by_time_key, schedule.schedule_id)
+
+            assert await scheduler.index_schedules() >= len(schedules)
+            for schedule in schedules:
+                assert await redis.zscore(
+                    schedules_by_time_key,
+                    schedule.schedule_id,
+                ) == int(time.timestamp() * 1000)
+
+            for schedule in schedules:
+                await redis.delete(
+                    f"{schedule_source.prefix}:{schedule.schedule_id}",
+                )
+                await redis.zrem(schedules_by_time_key, schedule.schedule_id)
+
+    await scheduler.shutdown()
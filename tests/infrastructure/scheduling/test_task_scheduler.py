@@ -0,0 +1,100 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+from datetime import datetime, timedelta, timezone
+from typing import Final
+
+from taskiq_redis import RedisScheduleSource
+from uuid_extensions import uuid7
+
+from connection_hub.domain import GameId, UserId, PlayerStateId
+from connection_hub.application import (
+    DisconnectFromGameTask,
+    TryToDisqualifyPlayerTask,
+    Task,
+)
+from connection_hub.infrastructure import (
+    RedisConfig,
+    redis_connection_pool_factory,
+    redis_factory,
+    redis_pipeline_factory,
+    taskiq_redis_schedule_source_factory,
+    shared_taskiq_redis_schedule_source_factory,
+    RedisPipelineScheduleSource,
+    TaskiqTaskScheduler,
+    default_operation_id_factory,
+)
+
+
+_GAME_ID: Final = GameId(uuid7())
+_PLAYER_ID: Final = UserId(uuid7())
+
+
+async def test_taskiq_task_scheduler(
+    redis_config: RedisConfig,
+):
+    execute_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+    tasks: list[Task] = [
+        DisconnectFromGameTask(
+            id=f"disconnect_from_game:{_GAME_ID.hex}:{_PLAYER_ID.hex}",
+            execute_at=execute_at,
+            game_id=_GAME_ID,
+            player_id=_PLAYER_ID,
+        ),
+        TryToDisqualifyPlayerTask(
+            id=f"try_to_disqualify_player:{uuid7().hex}",
+            execute_at=execute_at,
+            game_id=_GAME_ID,
+            player_id=_PLAYER_ID,
+            player_state_id=PlayerStateId(uuid7()),
+        ),
+    ]
+
+    # Schedules are read with a source of its own, since
+    # responses of the shared pool are decoded.
+    reading_schedule_source = taskiq_redis_schedule_source_factory(
+        redis_config,
+    )
+
+    async for connection_pool in redis_connection_pool_factory(redis_config):
+        async for redis in redis_factory(connection_pool):
+            async for redis_pipeline in redis_pipeline_factory(redis):
+                task_scheduler = TaskiqTaskScheduler(
+                    schedule_source=RedisPipelineScheduleSource(
+                        schedule_source=(
+                            shared_taskiq_redis_schedule_source_factory(
+                                redis_config=redis_config,
+                                connection_pool=connection_pool,
+                            )
+                        ),
+                        redis_pipeline=redis_pipeline,
+                    ),
+                    operation_id=default_operation_id_factory(),
+                )
+                task_ids = {task.id for task in tasks}
+
+                # Schedules are not written until the
+                # transaction is committed.
+                await task_scheduler.schedule_many(tasks)
+                assert task_ids.isdisjoint(
+                    await _schedule_ids(reading_schedule_source),
+                )
+
+                await redis_pipeline.execute()
+                assert task_ids <= await _schedule_ids(
+                    reading_schedule_source,
+                )
+
+                await task_scheduler.unschedule_many(task_ids)
+                await redis_pipeline.execute()
+                assert task_ids.isdisjoint(
+                    await _schedule_ids(reading_schedule_source),
+                )
+
+    await reading_schedule_source.shutdown()
+
+
+async def _schedule_ids(schedule_source: RedisScheduleSource) -> set[str]:
+    schedules = await schedule_source.get_schedules()
+    return {schedule.schedule_id for schedule in schedules}
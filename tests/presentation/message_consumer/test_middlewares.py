@@ -0,0 +1,69 @@
+# Copyright (c) 2024, Egor Romanov.
+# All rights reserved.
+# Licensed under the Personal Use License (see LICENSE).
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from faststream.nats import TestNatsBroker, TestApp
+from dishka import Provider, Scope, make_async_container
+from dishka.integrations.faststream import FastStreamProvider
+from uuid_extensions import uuid7
+
+from connection_hub.application import JoinLobbyProcessor
+from connection_hub.infrastructure import NATSConfig, TransactionConflictError
+from connection_hub.presentation.message_consumer import (
+    join_lobby,
+    create_broker,
+)
+from connection_hub.main.message_consumer import create_message_consumer_app
+
+
+async def test_transaction_conflict_retry_middleware(nats_config: NATSConfig):
+    processors: list[AsyncMock] = []
+    processed = asyncio.Event()
+
+    def processor_factory() -> AsyncMock:
+        processor = AsyncMock()
+        if processors:
+            processor.process.side_effect = lambda _: processed.set()
+        else:
+            processor.process.side_effect = TransactionConflictError()
+
+        processors.append(processor)
+        return processor
+
+    provider = Provider()
+    provider.provide(
+        processor_factory,
+        scope=Scope.REQUEST,
+        provides=JoinLobbyProcessor,
+    )
+
+    broker = create_broker(nats_config.url)
+    app = create_message_consumer_app(
+        broker=broker,
+        ioc_container=make_async_container(provider, FastStreamProvider()),
+    )
+
+    async with (
+        TestApp(app),
+        TestNatsBroker(broker, with_real=True) as test_broker,
+    ):
+        await test_broker.publish(
+            message={
+                "current_user_id": uuid7().hex,
+                "lobby_id": uuid7().hex,
+                "password": None,
+            },
+            subject="gaems12.api_gateway.lobby.user_joined",
+            stream="games",
+        )
+        await join_lobby.wait_call(1)
+        await asyncio.wait_for(processed.wait(), timeout=1)
+
+    # Message is processed again with a processor created
+    # within a new request scope.
+    assert len(processors) == 2
+    for processor in processors:
+        processor.process.assert_awaited_once()
@@ -4,6 +4,7 @@
 
 from datetime import timedelta
 
+from connection_hub.application import TimeoutPolicy
 from connection_hub.infrastructure import (
     CentrifugoConfig,
     RedisConfig,
@@ -34,5 +35,6 @@ async def test_ioc_container(
         GameMapperConfig: game_mapper_config,
         LockManagerConfig: lock_manager_config,
         NATSConfig: nats_config,
+        TimeoutPolicy: TimeoutPolicy(),
     }
     ioc_container_factory(context)